@@ -6,32 +6,29 @@ Categories:
   C: 20-30%
   D: <20%
 """
-import json
+from assembly_index import load_index
+from dataset_exports import export_outputs
+from dataset_store import save_dataset
+from models import load_assemblies
 
-# Load JSON
-with open('Form20_Localities_Pct.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+# Load dataset
+data, index = load_index()
 
 print("Updating booth categories...")
 
-# Get all assembly keys
-ac_keys = [k for k in data.keys() if k.startswith('AC_') and '_FINAL' in k]
+# Get all assemblies (score fields are parsed once per record layout)
+assemblies = load_assemblies(data, index)
 
 # Count updates
 updated = 0
 cat_counts = {'A': 0, 'B': 0, 'C': 0, 'D': 0}
 
-for key in ac_keys:
-    for entry in data[key]:
-        # Get all score fields
-        scores = {}
-        for field, value in entry.items():
-            if field.endswith('_SCORE') and isinstance(value, (int, float)):
-                scores[field] = value
+for assembly in assemblies:
+    for booth in assembly.booths:
+        top = booth.top_score()
         
-        if scores:
-            top_party = max(scores, key=scores.get)
-            top_value = scores[top_party]
+        if top:
+            top_party, top_value = top
             
             # Recategorize
             if top_value > 0.50:
@@ -43,16 +40,17 @@ for key in ac_keys:
             else:
                 new_cat = 'D'
             
-            old_cat = entry.get('TOP_SCORE_CATEGORY', '')
+            old_cat = booth.category
             if old_cat != new_cat:
-                entry['TOP_SCORE_CATEGORY'] = new_cat
+                booth.category = new_cat
                 updated += 1
             
             cat_counts[new_cat] += 1
+    data[assembly.key] = assembly.to_json()
 
-# Save updated JSON
-with open('Form20_Localities_Pct.json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=1)
+# Save updated dataset and its derived outputs
+save_dataset(data)
+export_outputs(data)
 
 print(f"\nUpdated {updated} entries")
 print("\n" + "="*60)
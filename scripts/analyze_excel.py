@@ -1,11 +1,16 @@
 """
 Script to get complete Excel sheet list - outputs to file
 """
-from openpyxl import load_workbook
-import json
+from workbook_reader import header_row, open_workbook
 
-wb = load_workbook('Form20_Localities_Pct (1).xlsx', read_only=True)
-sheets = wb.sheetnames
+with open_workbook('Form20_Localities_Pct (1).xlsx') as wb:
+    sheets = wb.sheetnames
+
+    # Header row only; the sheet body is never loaded
+    sheet_headers = {}
+    for sheet in sheets:
+        if sheet.startswith('AC_') and '_FINAL' in sheet:
+            sheet_headers[sheet] = [value for value in header_row(wb[sheet]) if value]
 
 output = []
 output.append("="*60)
@@ -52,13 +57,10 @@ output.append("COLUMN HEADERS BY ASSEMBLY")
 output.append("="*60)
 
 for num, sheet_name in ac_sheets[:5]:  # First 5 for sample
-    ws = wb[sheet_name]
-    headers = [cell.value for cell in list(ws.rows)[0] if cell.value]
+    headers = sheet_headers[sheet_name]
     output.append(f"\n{sheet_name}:")
     output.append(f"  Columns ({len(headers)}): {headers}")
 
-wb.close()
-
 # Write to file
 with open('excel_analysis.txt', 'w', encoding='utf-8') as f:
     f.write('\n'.join(output))
@@ -1,9 +1,10 @@
 """
 Analyze structure of the three missing assembly Excel files
 """
-from openpyxl import load_workbook
 import os
 
+from workbook_reader import data_rows, header_row, open_workbook
+
 files = ['AC_14_FINAL.xlsx', 'AC_16_FINAL.xlsx', 'AC_30_FINAL.xlsx']
 assembly_names = {
     '14': 'Raj Bhavan',
@@ -20,27 +21,31 @@ for filename in files:
     print(f"FILE: {filename}")
     print("="*60)
     
-    wb = load_workbook(filename, read_only=True)
-    print(f"Sheets: {wb.sheetnames}")
-    
-    for sheet_name in wb.sheetnames:
-        ws = wb[sheet_name]
+    with open_workbook(filename) as wb:
+        print(f"Sheets: {wb.sheetnames}")
         
-        # Get headers (first row)
-        rows = list(ws.rows)
-        if rows:
-            headers = [str(cell.value) if cell.value else '' for cell in rows[0]]
-            print(f"\nSheet '{sheet_name}' - Columns ({len(headers)}):")
-            print(f"  {headers}")
-            
-            # Count data rows
-            data_rows = len(rows) - 1  # Exclude header
-            print(f"  Data rows: {data_rows}")
+        for sheet_name in wb.sheetnames:
+            ws = wb[sheet_name]
             
-            # Show sample of first data row
-            if len(rows) > 1:
-                first_row = [str(cell.value)[:30] if cell.value else 'NULL' for cell in rows[1]]
-                print(f"  Sample row 1: {first_row[:10]}...")
+            # Get headers (first row)
+            header = header_row(ws)
+            if header:
+                headers = [str(value) if value else '' for value in header]
+                print(f"\nSheet '{sheet_name}' - Columns ({len(headers)}):")
+                print(f"  {headers}")
+                
+                # Count data rows, keeping only the first one as a sample
+                data_count = 0
+                first_row = None
+                for row in data_rows(ws):
+                    if first_row is None:
+                        first_row = row
+                    data_count += 1
+                print(f"  Data rows: {data_count}")
+                
+                # Show sample of first data row
+                if first_row is not None:
+                    sample = [str(value)[:30] if value else 'NULL' for value in first_row]
+                    print(f"  Sample row 1: {sample[:10]}...")
     
-    wb.close()
     print()
@@ -0,0 +1,158 @@
+"""
+Index of the assemblies in the Form20_Localities_Pct dataset.
+
+The dataset's assembly lists are stored under keys like 'AC_14_FINAL'.
+AssemblyIndex parses those keys once and gives every script the same view:
+assemblies in dataset order, each with its number, name (from ASSEMBLIES),
+region and booth list, plus the row slice its booths occupy when all
+assemblies are laid end to end (the order of the dataset store's rows).
+
+load_index() loads the dataset and returns it with its index.
+"""
+from dataset_store import load_dataset
+
+# Assembly mapping (1-30 with names)
+ASSEMBLIES = {
+    '1': 'Mannadipet',
+    '2': 'Thirubhuvanai (SC)',
+    '3': 'Ossudu (SC)',
+    '4': 'Mangalam',
+    '5': 'Villianur',
+    '6': 'Ozhukarai',
+    '7': 'Kadirkamam',
+    '8': 'Indira Nagar',
+    '9': 'Thattanchavady',
+    '10': 'Kamaraj Nagar',
+    '11': 'Lawspet',
+    '12': 'Kalapet',
+    '13': 'Muthialpet',
+    '14': 'Raj Bhavan',
+    '15': 'Oupalam',
+    '16': 'Orleampeth',
+    '17': 'Nellithope',
+    '18': 'Mudaliarpet',
+    '19': 'Ariankuppam',
+    '20': 'Manavely',
+    '21': 'Embalam (SC)',
+    '22': 'Nettapakkam (SC)',
+    '23': 'Bahour',
+    '24': 'Nedungadu (SC)',
+    '25': 'Thirunallar',
+    '26': 'Karaikal North',
+    '27': 'Karaikal South',
+    '28': 'Neravy T R Pattinam',
+    '29': 'Mahe',
+    '30': 'Yanam'
+}
+
+# Region of each assembly number range (inclusive)
+REGIONS = [
+    ('Puducherry', 1, 23),
+    ('Karaikal', 24, 28),
+    ('Mahe', 29, 29),
+    ('Yanam', 30, 30),
+]
+
+def region_for(ac_num):
+    """Expected region based on assembly number"""
+    try:
+        ac_int = int(ac_num)
+    except (TypeError, ValueError):
+        return None
+    for region, first, last in REGIONS:
+        if first <= ac_int <= last:
+            return region
+    return None
+
+def is_assembly_key(key):
+    """True for dataset keys holding an assembly's booths ('AC_14_FINAL')"""
+    return key.startswith('AC_') and '_FINAL' in key
+
+def assembly_code(key):
+    """The assembly part of a dataset key ('AC_14_FINAL' -> '14')"""
+    return key.replace('AC_', '').replace('_FINAL', '')
+
+def assembly_number(key):
+    """Assembly number of a dataset key ('AC_14_FINAL' -> 14), None if it has none"""
+    if not is_assembly_key(key):
+        return None
+    code = assembly_code(key)
+    return int(code) if code.isdigit() else None
+
+def assembly_key(number):
+    """Dataset key of an assembly number (14 -> 'AC_14_FINAL')"""
+    return f'AC_{number}_FINAL'
+
+class AssemblyRef:
+    """One assembly of the index
+
+    code is the assembly part of the key as a string ('14'); number is its
+    int value, None when the key is malformed. booths is the dataset's own
+    list, and rows the slice of the booths in dataset row order.
+    """
+    __slots__ = ('key', 'code', 'number', 'name', 'region', 'booths', 'rows')
+
+    def __init__(self, key, booths, start):
+        self.key = key
+        self.code = assembly_code(key)
+        self.number = int(self.code) if self.code.isdigit() else None
+        self.name = ASSEMBLIES.get(self.code, 'Unknown')
+        self.region = region_for(self.number)
+        self.booths = booths
+        self.rows = slice(start, start + len(booths))
+
+class AssemblyIndex:
+    """Assemblies of a dataset dict, parsed once, in dataset order"""
+
+    def __init__(self, data):
+        self.assemblies = []
+        self.other_keys = []
+        start = 0
+        for key, value in data.items():
+            if is_assembly_key(key):
+                ref = AssemblyRef(key, value, start)
+                self.assemblies.append(ref)
+                start = ref.rows.stop
+            else:
+                self.other_keys.append(key)
+        self.by_key = {ref.key: ref for ref in self.assemblies}
+        self.by_number = {ref.number: ref for ref in self.assemblies if ref.number is not None}
+        self.total_booths = start
+
+    def __iter__(self):
+        return iter(self.assemblies)
+
+    def __len__(self):
+        return len(self.assemblies)
+
+    def __contains__(self, number):
+        return number in self.by_number
+
+    def __getitem__(self, number):
+        return self.by_number[number]
+
+    def keys(self):
+        """Assembly keys in dataset order"""
+        return [ref.key for ref in self.assemblies]
+
+    def numbers(self):
+        """Assembly numbers present, ascending"""
+        return sorted(self.by_number)
+
+    def invalid_keys(self):
+        """Assembly-looking keys without a numeric assembly part"""
+        return [ref.key for ref in self.assemblies if ref.number is None]
+
+    def in_number_order(self):
+        """Assemblies sorted by number (malformed keys last, in dataset order)"""
+        return sorted(self.assemblies, key=lambda ref: (ref.number is None, ref.number or 0))
+
+    def region(self, key):
+        """Region of a dataset key's assembly"""
+        ref = self.by_key.get(key)
+        return ref.region if ref else None
+
+def load_index():
+    """Load the dataset and index its assemblies: returns (data, index)"""
+    data = load_dataset()
+    return data, AssemblyIndex(data)
@@ -0,0 +1,102 @@
+"""
+Column-mapping specs for the per-assembly AC_*_FINAL.xlsx workbooks.
+
+Every workbook has a '2021' sheet and an '11_16' sheet, but the column
+layout differs between assemblies. Each spec records which column holds
+which value so process_missing_assemblies.py can ingest any assembly with
+the same code. Party names are the names written to the JSON, so a
+candidate column such as ANNIBAL_NEHRU_2011 is stored as IND.
+
+Spec fields:
+  name        - assembly name used in the summary output
+  workbook    - workbook file name
+  ps_2021     - column indexes of the polling station name/number ('2021' sheet)
+  ps_1116     - column index of the PS_NO_2016 number ('11_16' sheet)
+  years       - per year: (party, column) pairs and the POLLED column
+                (None means POLLED is the sum of the party columns)
+  voters_2021 - VOTERS_2021 column ('2021' sheet)
+  polled_pct  - POLLED_% column ('2021' sheet)
+  scores      - parties that get a _SCORE field, in output order
+
+To add an assembly, add its spec here and drop AC_<n>_FINAL.xlsx in the
+working directory.
+"""
+
+# Sheet each election year is read from
+YEAR_SHEETS = {
+    '2011': '11_16',
+    '2016': '11_16',
+    '2021': '2021',
+}
+
+ASSEMBLY_SPECS = {
+    '14': {
+        'name': 'Raj Bhavan',
+        'workbook': 'AC_14_FINAL.xlsx',
+        'ps_2021': {'name': 0, 'num': 1},
+        'ps_1116': {'num': 2},
+        'years': {
+            '2011': {
+                'parties': [('AIADMK', 3), ('INC', 4), ('IND', 5), ('OTHERS', 6)],  # IND = ANNIBAL_NEHRU
+                'polled': 7,
+            },
+            '2016': {
+                'parties': [('AINRC', 9), ('AIADMK', 10), ('INC', 11), ('OTHERS', 12), ('NOTA', 13)],
+                'polled': None,
+            },
+            '2021': {
+                'parties': [('DMK', 2), ('AINRC', 3), ('MNM', 4), ('OTHERS', 5), ('NOTA', 6)],
+                'polled': 7,
+            },
+        },
+        'voters_2021': 8,
+        'polled_pct': 9,
+        'scores': ['AIADMK', 'INC', 'AINRC', 'DMK', 'MNM', 'OTHERS', 'IND'],
+    },
+    '16': {
+        'name': 'Orleampeth',
+        'workbook': 'AC_16_FINAL.xlsx',
+        'ps_2021': {'name': 1, 'num': 0},
+        'ps_1116': {'num': 1},
+        'years': {
+            '2011': {
+                'parties': [('DMK', 4), ('AINRC', 5), ('OTHERS', 6)],
+                'polled': 7,
+            },
+            '2016': {
+                'parties': [('DMK', 9), ('AINRC', 10), ('OTHERS', 11), ('NOTA', 12)],
+                'polled': 13,
+            },
+            '2021': {
+                'parties': [('AIADMK', 2), ('DMK', 3), ('IND', 4), ('OTHERS', 5), ('NOTA', 6)],  # IND = KUPASWAMY
+                'polled': 7,
+            },
+        },
+        'voters_2021': 8,
+        'polled_pct': 9,
+        'scores': ['DMK', 'AINRC', 'AIADMK', 'IND', 'OTHERS'],
+    },
+    '30': {
+        'name': 'Yanam',
+        'workbook': 'AC_30_FINAL.xlsx',
+        'ps_2021': {'name': 0, 'num': 1},
+        'ps_1116': {'num': 2},
+        'years': {
+            '2011': {
+                'parties': [('AIADMK', 4), ('INC', 5), ('OTHERS', 6)],
+                'polled': 7,
+            },
+            '2016': {
+                'parties': [('AINRC', 9), ('INC', 10), ('OTHERS', 11), ('NOTA', 12)],
+                'polled': 13,
+            },
+            '2021': {
+                'parties': [('AINRC', 2), ('OTHERS', 3), ('NOTA', 4)],
+                'polled': 5,
+            },
+        },
+        'voters_2021': 6,
+        'polled_pct': 7,
+        'scores': ['AIADMK', 'INC', 'AINRC', 'OTHERS'],
+    },
+}
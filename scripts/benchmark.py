@@ -0,0 +1,249 @@
+"""
+Benchmark the Python pipeline on synthetic datasets.
+
+For each scale (1x, 10x and 100x today's booth count by default), generates
+in a scratch directory:
+  - AC_*_FINAL.xlsx workbooks for every assembly in assembly_specs.py, laid
+    out as their specs describe, with scale x the assembly's booths and
+    random votes
+  - Form20_Localities_Pct.json, every list of the template dataset repeated
+    scale times (booth names suffixed, coordinates jittered)
+
+then runs each stage as its own process there, as the scripts are run by
+hand, and records its wall time, peak RSS and exit status:
+
+  serialization - load the JSON, save_dataset() (store and JSON export)
+  exports       - dataset_exports.py (deltas, compact, shards, rollups)
+  validation    - data_analysis.py
+  validation_fast - data_analysis.py --fast
+  recategorization - add_category_d.py
+  ingestion     - process_missing_assemblies.py --force
+
+Results are written as JSON; --baseline compares them with an earlier run.
+A stage that fails or times out is recorded with the tail of its stderr.
+
+Usage: python benchmark.py [--scales 1,10,100] [--stages ...] [--output FILE] [--baseline FILE]
+"""
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from openpyxl import Workbook
+
+from assembly_index import is_assembly_key
+from assembly_specs import ASSEMBLY_SPECS, YEAR_SHEETS
+from dataset_store import DATASET_JSON
+from json_writer import dump_json
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SERIALIZE = ('from dataset_store import DATASET_JSON, save_dataset; import json; '
+             'save_dataset(json.load(open(DATASET_JSON, encoding="utf-8")))')
+
+# Stage name -> (command, exit codes that count as success), run in order;
+# later stages see earlier stages' output
+STAGES = {
+    'serialization': (['-c', SERIALIZE], {0}),
+    'exports': ([os.path.join(SCRIPTS_DIR, 'dataset_exports.py')], {0}),
+    'validation': ([os.path.join(SCRIPTS_DIR, 'data_analysis.py')], {0}),
+    # --fast exits 1 when any check finds issues, which the data has
+    'validation_fast': ([os.path.join(SCRIPTS_DIR, 'data_analysis.py'), '--fast'], {0, 1}),
+    'recategorization': ([os.path.join(SCRIPTS_DIR, 'add_category_d.py')], {0}),
+    'ingestion': ([os.path.join(SCRIPTS_DIR, 'process_missing_assemblies.py'), '--force'], {0}),
+}
+
+DEFAULT_SCALES = [1, 10, 100]
+
+def synthetic_dataset(template, scale, rng):
+    """The template dataset with every list repeated scale times"""
+    data = {}
+    for key, entries in template.items():
+        if not isinstance(entries, list):
+            data[key] = entries
+            continue
+        copies = []
+        for copy in range(scale):
+            for entry in entries:
+                entry = dict(entry)
+                if copy and is_assembly_key(key):
+                    if isinstance(entry.get('PS_NO_2021'), str):
+                        entry['PS_NO_2021'] = f"{entry['PS_NO_2021']} #{copy}"
+                    for field in ('Latitude', 'Longitude'):
+                        if isinstance(entry.get(field), float):
+                            entry[field] += rng.uniform(-0.005, 0.005)
+                copies.append(entry)
+        data[key] = copies
+    return data
+
+def _sheet_row(width, values):
+    row = [None] * width
+    for column, value in values.items():
+        row[column] = value
+    return row
+
+def write_workbook(path, spec, booths, names, rng):
+    """Write an AC_*_FINAL.xlsx with booths random rows in the spec's column layout"""
+    columns = {sheet: {} for sheet in set(YEAR_SHEETS.values())}
+    columns['2021'][spec['ps_2021']['name']] = 'PS_NO_2021'
+    columns['2021'][spec['ps_2021']['num']] = 'PS_NO_2021'
+    columns['2021'][spec['voters_2021']] = 'VOTERS_2021'
+    columns['2021'][spec['polled_pct']] = 'POLLED_%'
+    columns['11_16'][spec['ps_1116']['num']] = 'PS_NO_2016'
+    for year, layout in spec['years'].items():
+        for party, column in layout['parties']:
+            columns[YEAR_SHEETS[year]][column] = f'{party}_{year}'
+        if layout['polled'] is not None:
+            columns[YEAR_SHEETS[year]][layout['polled']] = f'VALID_{year}'
+    widths = {sheet: max(cols) + 1 for sheet, cols in columns.items()}
+
+    wb = Workbook(write_only=True)
+    sheets = {sheet: wb.create_sheet(sheet) for sheet in ('2021', '11_16')}
+    for sheet, ws in sheets.items():
+        ws.append(_sheet_row(widths[sheet], columns[sheet]))
+
+    for num in range(1, booths + 1):
+        rows = {'2021': {}, '11_16': {}}
+        rows['2021'][spec['ps_2021']['name']] = f"{names[(num - 1) % len(names)]} #{num}"
+        rows['2021'][spec['ps_2021']['num']] = num
+        rows['11_16'][spec['ps_1116']['num']] = num
+        for year, layout in spec['years'].items():
+            values = rows[YEAR_SHEETS[year]]
+            votes = [rng.randint(0, 600) for _ in layout['parties']]
+            for (party, column), count in zip(layout['parties'], votes):
+                values[column] = count
+            if layout['polled'] is not None:
+                values[layout['polled']] = sum(votes)
+        polled = sum(rows['2021'][column] for _, column in spec['years']['2021']['parties'])
+        voters = int(polled / rng.uniform(0.6, 0.9)) + 1
+        rows['2021'][spec['voters_2021']] = voters
+        rows['2021'][spec['polled_pct']] = polled / voters * 100
+        for sheet, ws in sheets.items():
+            ws.append(_sheet_row(widths[sheet], rows[sheet]))
+    wb.save(path)
+
+def prepare(workdir, template, scale, seed=0):
+    """Write the synthetic dataset and workbooks for one scale; returns the booth count"""
+    rng = random.Random(seed)
+    data = synthetic_dataset(template, scale, rng)
+    dump_json(data, os.path.join(workdir, DATASET_JSON))
+    for ac_num, spec in ASSEMBLY_SPECS.items():
+        entries = template.get(f'AC_{ac_num}_FINAL') or [{}]
+        names = [entry.get('PS_NO_2021') or f'Polling Station {ac_num}' for entry in entries]
+        write_workbook(os.path.join(workdir, spec['workbook']), spec, len(entries) * scale, names, rng)
+    return sum(len(entries) for key, entries in data.items() if is_assembly_key(key))
+
+def run_stage(args, workdir, timeout):
+    """Run one stage process; returns (wall seconds, peak RSS in MB, exit status, stderr tail)"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SCRIPTS_DIR, os.environ.get('PYTHONPATH')])))
+    with tempfile.TemporaryFile(mode='w+', encoding='utf-8') as stderr:
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable] + args, cwd=workdir, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=stderr)
+        deadline = started + timeout
+        while True:
+            # wait4 gives this process's own rusage, unlike RUSAGE_CHILDREN
+            pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.perf_counter() > deadline:
+                process.kill()
+                pid, status, usage = os.wait4(process.pid, 0)
+                status = None
+                break
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        code = None if status is None else os.waitstatus_to_exitcode(status)
+        # Reaped above; keeps Popen from waiting on the pid again
+        process.returncode = -1 if code is None else code
+        stderr.seek(0)
+        tail = stderr.read()[-2000:]
+    return elapsed, usage.ru_maxrss / 1024, code, tail
+
+def run_benchmarks(template, scales, stages, timeout, seed=0, workdir=None):
+    results = []
+    if workdir:
+        os.makedirs(workdir, exist_ok=True)
+    for scale in scales:
+        directory = tempfile.mkdtemp(prefix=f'benchmark_{scale}x_', dir=workdir)
+        try:
+            print(f"\n{scale}x: generating...", flush=True)
+            booths = prepare(directory, template, scale, seed)
+            print(f"{scale}x: {booths:,} booths")
+            for stage in stages:
+                command, success = STAGES[stage]
+                elapsed, rss, code, tail = run_stage(command, directory, timeout)
+                status = 'ok' if code in success else ('timeout' if code is None else f'exit {code}')
+                print(f"  {stage:<18} {elapsed:9.2f}s {rss:9.1f} MB  {status}", flush=True)
+                result = {'scale': scale, 'booths': booths, 'stage': stage, 'wall_seconds': round(elapsed, 3),
+                          'peak_rss_mb': round(rss, 1), 'status': status}
+                if status != 'ok':
+                    result['stderr'] = tail
+                results.append(result)
+        finally:
+            if workdir is None:
+                shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+def compare(results, baseline):
+    """Print wall time and peak RSS changes against an earlier results file"""
+    previous = {(r['scale'], r['stage']): r for r in baseline.get('results', [])}
+    print(f"\nAgainst baseline from {baseline.get('created', '?')}:")
+    for result in results:
+        before = previous.get((result['scale'], result['stage']))
+        if not before or before['status'] != 'ok' or result['status'] != 'ok':
+            continue
+        wall = result['wall_seconds'] / before['wall_seconds'] - 1 if before['wall_seconds'] else 0
+        rss = result['peak_rss_mb'] / before['peak_rss_mb'] - 1 if before['peak_rss_mb'] else 0
+        print(f"  {result['scale']:>4}x {result['stage']:<18} time {wall:+7.1%}  peak RSS {rss:+7.1%}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the pipeline stages on synthetic 1x/10x/100x datasets')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='comma-separated multiples of the template\'s booth count (default: 1,10,100)')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"comma-separated stages to run (default: all of {', '.join(STAGES)})")
+    parser.add_argument('--template', default=DATASET_JSON, help='dataset the synthetic ones are built from')
+    parser.add_argument('--output', default='benchmark_results.json', help='results file (default: %(default)s)')
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    parser.add_argument('--timeout', type=float, default=1800, help='seconds before a stage is killed')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the synthetic votes and jitter')
+    parser.add_argument('--keep', metavar='DIR', help='generate under DIR and keep the scratch directories')
+    args = parser.parse_args()
+    try:
+        scales = [int(scale) for scale in args.scales.split(',') if scale.strip()]
+    except ValueError:
+        parser.error('--scales must be comma-separated integers')
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown or not scales or min(scales) < 1:
+        parser.error(f"unknown stages {unknown} (known: {', '.join(STAGES)})" if unknown else
+                     '--scales must be positive integers')
+
+    with open(args.template, 'r', encoding='utf-8') as f:
+        template = json.load(f)
+
+    results = run_benchmarks(template, scales, stages, args.timeout, args.seed, args.keep)
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': results,
+    }
+    dump_json(report, args.output)
+    print(f"\nResults saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+if __name__ == '__main__':
+    main()
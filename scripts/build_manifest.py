@@ -0,0 +1,163 @@
+"""
+Build manifest for incremental ingestion.
+
+Records, for every ingested assembly, a content hash of its workbook and of
+each sheet, a hash of its column spec and the version of the ingestion code
+it was built with.
+process_missing_assemblies.py compares these against the current inputs and
+only reprocesses assemblies whose inputs changed.
+
+The file hash is checked first because it is cheap. If it changed, the
+sheet values are hashed as well, so re-saving a workbook without editing it
+does not trigger a rebuild.
+"""
+import ast
+import hashlib
+import json
+import os
+
+from assembly_index import assembly_key
+from json_writer import atomic_open
+from workbook_reader import open_workbook
+
+BUILD_MANIFEST = 'Form20_Localities_Pct.build.json'
+
+# The ingestion module; it and the local modules it imports determine the ingested output
+INGESTION_MODULE = 'process_missing_assemblies'
+# Local modules it imports that only load, save or export the dataset
+NON_CODE_MODULES = {'build_manifest', 'dataset_exports', 'dataset_store'}
+
+def file_digest(path):
+    """sha256 of a file's bytes"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def normalize_row(row):
+    """Row values with empty strings as None and trailing blanks dropped
+
+    Excel and openpyxl write empty cells either way when a workbook is saved,
+    so this keeps the hash stable across a plain re-save.
+    """
+    values = [None if value == '' else value for value in row]
+    while values and values[-1] is None:
+        values.pop()
+    return tuple(values)
+
+def sheet_digests(path):
+    """sha256 of each sheet's cell values, keyed by sheet name"""
+    digests = {}
+    with open_workbook(path) as wb:
+        for ws in wb.worksheets:
+            h = hashlib.sha256()
+            for row in ws.iter_rows(values_only=True):
+                h.update(repr(normalize_row(row)).encode('utf-8'))
+                h.update(b'\n')
+            digests[ws.title] = h.hexdigest()
+    return digests
+
+def spec_digest(spec):
+    """sha256 of an assembly's column spec"""
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()
+
+def _local_imports(path, here):
+    """Names of the modules in here that the source at path imports"""
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    return {name for name in names if os.path.exists(os.path.join(here, f'{name}.py'))}
+
+def code_modules(module=INGESTION_MODULE, here=None):
+    """Source files of module and the local modules it imports, directly or not, sorted
+
+    NON_CODE_MODULES and what only they import are left out.
+    """
+    here = here or os.path.dirname(os.path.abspath(__file__))
+    found = set()
+    pending = [module]
+    while pending:
+        name = pending.pop()
+        if name in found or name in NON_CODE_MODULES:
+            continue
+        found.add(name)
+        pending.extend(_local_imports(os.path.join(here, f'{name}.py'), here))
+    return sorted(f'{name}.py' for name in found)
+
+def code_version():
+    """sha256 over the source of the ingestion modules"""
+    h = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in code_modules(here=here):
+        with open(os.path.join(here, name), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+def load_manifest(path=BUILD_MANIFEST):
+    """Load the build manifest (empty manifest if there is none)"""
+    if not os.path.exists(path):
+        return {'assemblies': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(manifest, path=BUILD_MANIFEST):
+    """Write the build manifest"""
+    with atomic_open(path) as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+def fingerprint(spec, known=None, version=None):
+    """Current input fingerprint of an assembly
+
+    known is the assembly's previous manifest record; when the workbook bytes
+    are unchanged its sheet hashes are reused instead of re-reading the sheets.
+    """
+    digest = file_digest(spec['workbook'])
+    if known and known.get('file') == digest:
+        sheets = known['sheets']
+    else:
+        sheets = sheet_digests(spec['workbook'])
+    return {
+        'workbook': spec['workbook'],
+        'file': digest,
+        'sheets': sheets,
+        'spec': spec_digest(spec),
+        'code': version or code_version(),
+    }
+
+def plan_rebuild(ac_nums, specs, manifest, data, force=False):
+    """Split assemblies into (stale, fingerprints) against the manifest
+
+    An assembly is stale when the ingestion code changed, its sheets or spec
+    changed, it is not in the manifest, or its key is missing from data.
+    fingerprints holds the current fingerprint of every assembly in ac_nums.
+    """
+    version = code_version()
+    previous = manifest.get('assemblies', {})
+
+    stale = []
+    fingerprints = {}
+    for ac_num in ac_nums:
+        known = previous.get(ac_num)
+        current = fingerprint(specs[ac_num], known, version)
+        fingerprints[ac_num] = current
+        unchanged = (
+            known is not None
+            and known['sheets'] == current['sheets']
+            and known['spec'] == current['spec']
+            and known.get('code') == current['code']
+            and assembly_key(ac_num) in data
+        )
+        if force or not unchanged:
+            stale.append(ac_num)
+    return stale, fingerprints
+
+def update_manifest(manifest, fingerprints):
+    """Record the fingerprints of assemblies that are now up to date"""
+    manifest.setdefault('assemblies', {}).update(fingerprints)
+    return manifest
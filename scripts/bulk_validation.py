@@ -0,0 +1,244 @@
+"""
+Vectorized bulk validation for data_analysis.py --fast.
+
+Loads the numeric fields of every booth into columnar NumPy arrays once (from
+the memory-mapped Arrow store when it is current, otherwise from the loaded
+dataset) and evaluates the region-polygon, percentage-sum, score and
+assembly-footprint checks as array masks. The rules subclass the per-booth
+rules in data_analysis.py and produce the same findings and report text;
+only the offending rows are formatted in Python.
+"""
+import json
+
+import numpy as np
+
+from data_analysis import AssemblyFootprintRule, CoordinateRule, PercentageRule, ScoreRule
+from dataset_store import DATASET_STORE, open_store, pa, store_is_current
+from scoring import categorize
+from spatial_index import GridIndex
+
+def _number(value):
+    """Float value of a field, NaN for blanks and non-numeric values"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return np.nan
+
+def points_in_ring(lat, lng, ring):
+    """Vectorized ray-casting test of many points against one ring"""
+    inside = np.zeros(lat.shape, dtype=bool)
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        lat_i, lng_i = ring[i]
+        lat_j, lng_j = ring[j]
+        if lng_i != lng_j:
+            straddles = (lng_i > lng) != (lng_j > lng)
+            cross = lat_i + (lng - lng_i) * (lat_j - lat_i) / (lng_j - lng_i)
+            inside ^= straddles & (lat < cross)
+        j = i
+    return inside
+
+def points_in_polygon(lat, lng, rings):
+    """Vectorized point_in_polygon: inside the outer ring and outside every hole"""
+    inside = points_in_ring(lat, lng, rings[0])
+    for hole in rings[1:]:
+        inside &= ~points_in_ring(lat, lng, hole)
+    return inside
+
+class BoothColumns:
+    """Columnar view of selected fields over all booths of the given assemblies
+
+    ac_keys/booth_idx give each row's assembly key and booth index. For every
+    field, values() is a float array (NaN where the value is missing or not a
+    number) and nulls() marks rows where the value is missing or null.
+    """
+
+    def __init__(self, ac_keys, booth_idx, values, nulls, strings):
+        self.ac_keys = ac_keys
+        self.booth_idx = booth_idx
+        self._values = values
+        self._nulls = nulls
+        self._strings = strings
+        self.size = len(booth_idx)
+
+    def values(self, field):
+        return self._values.get(field, np.full(self.size, np.nan))
+
+    def nulls(self, field):
+        return self._nulls.get(field, np.ones(self.size, dtype=bool))
+
+    def strings(self, field):
+        return self._strings.get(field, np.full(self.size, '', dtype=object))
+
+    def label(self, row):
+        return f"{self.ac_keys[row]}[{self.booth_idx[row]}]"
+
+    @classmethod
+    def from_index(cls, index, numeric_fields, string_fields=()):
+        """Build the columns from the loaded dataset's assembly index"""
+        entries = [entry for ref in index for entry in ref.booths]
+        ac_keys = np.array([ref.key for ref in index for _ in ref.booths], dtype=object)
+        booth_idx = np.array([i for ref in index for i in range(len(ref.booths))], dtype=int)
+        values = {}
+        nulls = {}
+        for field in numeric_fields:
+            raw = [entry.get(field) for entry in entries]
+            values[field] = np.array([_number(v) for v in raw], dtype=float)
+            nulls[field] = np.array([v is None for v in raw], dtype=bool)
+        strings = {
+            field: np.array([entry.get(field) or '' for entry in entries], dtype=object)
+            for field in string_fields
+        }
+        return cls(ac_keys, booth_idx, values, nulls, strings)
+
+    @classmethod
+    def from_store(cls, assembly_keys, numeric_fields, string_fields=(), path=DATASET_STORE):
+        """Read only the needed columns from the memory-mapped store"""
+        table = open_store(path, columns=list(numeric_fields) + list(string_fields), keys=assembly_keys)
+        size = table.num_rows
+        ac_keys = np.array(table.column('_key').to_pylist(), dtype=object)
+        booth_idx = table.column('_index').to_numpy()
+        values = {}
+        nulls = {}
+        for field in numeric_fields:
+            if field not in table.column_names:
+                continue
+            column = table.column(field)
+            nulls[field] = column.is_null().to_numpy(zero_copy_only=False)
+            metadata = table.schema.field(field).metadata or {}
+            if metadata.get(b'encoding') == b'json':
+                values[field] = np.array(
+                    [np.nan if v is None else _number(json.loads(v)) for v in column.to_pylist()], dtype=float)
+            elif pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+                values[field] = column.cast('double').fill_null(np.nan).to_numpy()
+            else:
+                values[field] = np.full(size, np.nan)
+        strings = {}
+        for field in string_fields:
+            if field in table.column_names:
+                strings[field] = np.array([v or '' for v in table.column(field).to_pylist()], dtype=object)
+        return cls(ac_keys, booth_idx, values, nulls, strings)
+
+class BulkCoordinateRule(CoordinateRule):
+    """Coordinate validation as region-polygon masks"""
+    numeric_fields = ['Latitude', 'Longitude']
+
+    def evaluate(self, cols, index):
+        lat = cols.values('Latitude')
+        lng = cols.values('Longitude')
+        null = cols.nulls('Latitude') | cols.nulls('Longitude')
+        invalid = ~null & (np.isnan(lat) | np.isnan(lng))
+        self.total_entries = cols.size
+
+        expected = np.empty(cols.size, dtype=object)
+        for ref in index:
+            expected[ref.rows] = ref.region or ''
+        in_any = np.zeros(cols.size, dtype=bool)
+        for region_polygons in self.polygons.values():
+            for rings in region_polygons:
+                in_any |= points_in_polygon(lat, lng, rings)
+        outside = ~null & ~invalid & (expected != '') & ~in_any
+
+        for row in np.flatnonzero(null | invalid | outside):
+            ac_key, idx = cols.ac_keys[row], cols.booth_idx[row]
+            entry = index.by_key[ac_key].booths[idx]
+            if null[row]:
+                self.null_coordinates.append(f"{ac_key}[{idx}]: {entry.get('LOCALITY_EXTRACTED', 'Unknown')}")
+            elif invalid[row]:
+                lat_v, lng_v = entry.get('Latitude'), entry.get('Longitude')
+                self.coordinate_issues.append(f"{ac_key}[{idx}]: Invalid type - lat={type(lat_v)}, lng={type(lng_v)}")
+            else:
+                self.coordinate_issues.append(
+                    f"{ac_key}[{idx}] ({entry.get('LOCALITY_EXTRACTED', 'Unknown')}): "
+                    f"lat={entry['Latitude']}, lng={entry['Longitude']} - Outside all expected regions"
+                )
+
+class BulkPercentageRule(PercentageRule):
+    """Percentage-sum validation as tolerance masks"""
+    numeric_fields = sorted({f for fields in PercentageRule.year_fields.values() for f in fields}
+                            | {f'POLLED_{year}' for year in PercentageRule.year_fields})
+
+    def evaluate(self, cols, index):
+        offending = []
+        for year, fields in self.year_fields.items():
+            polled = np.nan_to_num(cols.values(f'POLLED_{year}'))
+            total = np.zeros(cols.size)
+            for field in fields:
+                total = total + np.nan_to_num(cols.values(field))
+            mask = (polled > 0) & (np.abs(total - 1.0) > self.tolerance)
+            offending.extend((row, year, total[row]) for row in np.flatnonzero(mask))
+
+        # Same order as the per-booth rule: by booth, then year
+        for row, year, total in sorted(offending, key=lambda item: (item[0], item[1])):
+            self.percentage_issues.append(
+                f"{cols.label(row)} {year}: Total percentage = {total:.4f} (expected ~1.0)"
+            )
+
+class BulkScoreRule(ScoreRule):
+    """Score-sum, top-party and category validation as masks"""
+    numeric_fields = [f'{party}_SCORE' for party in ScoreRule.parties]
+    string_fields = ['TOP_SCORE_PARTY', 'TOP_SCORE_CATEGORY']
+
+    def evaluate(self, cols, index):
+        scores = np.column_stack([np.nan_to_num(cols.values(field)) for _, field in self.score_fields])
+        total = np.zeros(cols.size)
+        for column in scores.T:
+            total = total + column
+        sum_bad = np.abs(total - 1.0) > self.tolerance
+
+        top = scores.argmax(axis=1)
+        max_score = scores[np.arange(cols.size), top]
+        max_party = np.array(self.parties, dtype=object)[top]
+        top_party = cols.strings('TOP_SCORE_PARTY')
+        party_bad = np.array([p not in t for p, t in zip(max_party, top_party)], dtype=bool)
+
+        expected_cat = categorize(max_score)
+        category = cols.strings('TOP_SCORE_CATEGORY')
+        category_bad = category != expected_cat
+
+        for row in np.flatnonzero(sum_bad | party_bad):
+            if sum_bad[row]:
+                self.score_issues.append(
+                    f"{cols.label(row)}: Total score = {total[row]:.4f} (expected ~1.0)"
+                )
+            if party_bad[row]:
+                self.score_issues.append(
+                    f"{cols.label(row)}: TOP_SCORE_PARTY '{top_party[row]}' doesn't match calculated max '{max_party[row]}'"
+                )
+        for row in np.flatnonzero(category_bad):
+            self.category_issues.append(
+                f"{cols.label(row)}: Category '{category[row]}' doesn't match expected '{expected_cat[row]}' for score {max_score[row]:.2%}"
+            )
+
+class BulkAssemblyFootprintRule(AssemblyFootprintRule):
+    """Assembly footprint validation with the own-footprint test as polygon masks"""
+    numeric_fields = ['Latitude', 'Longitude']
+
+    def evaluate(self, cols, index):
+        lat = cols.values('Latitude')
+        lng = cols.values('Longitude')
+        for row in np.flatnonzero(~(np.isnan(lat) | np.isnan(lng))):
+            self.points[cols.ac_keys[row]].append((int(cols.booth_idx[row]), float(lat[row]), float(lng[row])))
+
+    def find_misplaced(self, footprints):
+        index = GridIndex.from_polygons(footprints, cell_size=0.01)
+        for ac_key, points in self.points.items():
+            idx, lat, lng = (np.array(column) for column in zip(*points))
+            outside = np.ones(len(points), dtype=bool)
+            for rings in footprints.get(ac_key, []):
+                outside &= ~points_in_polygon(lat, lng, rings)
+            for row in np.flatnonzero(outside):
+                self.check_others(index, ac_key, int(idx[row]), float(lat[row]), float(lng[row]))
+
+BULK_RULES = [BulkCoordinateRule, BulkPercentageRule, BulkScoreRule, BulkAssemblyFootprintRule]
+
+def run_bulk_rules(index, rules):
+    """Load the needed columns once and evaluate every bulk rule on them"""
+    numeric_fields = sorted({f for rule in rules for f in rule.numeric_fields})
+    string_fields = sorted({f for rule in rules for f in getattr(rule, 'string_fields', [])})
+    if store_is_current():
+        cols = BoothColumns.from_store(index.keys(), numeric_fields, string_fields)
+    else:
+        cols = BoothColumns.from_index(index, numeric_fields, string_fields)
+    for rule in rules:
+        rule.evaluate(cols, index)
+    return rules
@@ -0,0 +1,231 @@
+"""
+Compact, dictionary-encoded form of the dataset for browsers and field devices.
+
+The JSON export repeats ~45 long key strings per booth and writes shares as
+17-digit floats, most of which are just votes / POLLED. The compact form:
+
+  fields   - every field name once; rows refer to fields by index
+  strings  - every distinct string value once (localities, station names,
+             TOP_SCORE_PARTY labels, ...); rows store the index
+  layouts  - distinct [field indexes, kinds] pairs, one per record shape.
+             kinds has one letter per field:
+               n - stored as is
+               s - index into strings
+               q - share or score quantized to an int: value * 10**precision
+               d - derived on load, not stored: <PARTY>_<YEAR>_pct is
+                   <PARTY>_<YEAR> / POLLED_<YEAR> (0.0 when POLLED is 0)
+  keys     - per dataset key, in dataset order, either a list of rows
+             [layout, value, value, ...] or {"raw": value} for anything that
+             is not a list of records
+
+A share is only marked derived when the division reproduces the stored
+float exactly, so decoding returns the original values except for the
+quantized ones (*_pct that do not match their counts, *_SCORE, Score and
+POLLED_%). With precision=None nothing is quantized and decoding is lossless.
+
+On the current dataset the compact file is about 7.6x smaller than the JSON
+export (307 KB against 2.33 MB at precision 4; 94 KB against 411 KB
+gzipped), short of an order of magnitude. decode_dataset() / load_compact()
+read it back; the dashboard itself loads the per-assembly station shards
+(shards.py) and has no decoder for this format.
+
+Usage: python compact_format.py [--precision 4] [--output FILE] [--check]
+"""
+import argparse
+import json
+import math
+import os
+
+from dataset_store import DATASET_COMPACT, DATASET_JSON, load_dataset
+from json_writer import dump_json
+from models import YEAR_FIELD
+
+FORMAT = 'form20-compact'
+VERSION = 1
+
+DEFAULT_PRECISION = 4
+
+RAW, STRING, QUANTIZED, DERIVED = 'n', 's', 'q', 'd'
+
+# Float fields kept to the quantization precision besides the *_pct shares
+QUANTIZED_FIELDS = ('_SCORE', 'Score', 'POLLED_%')
+
+class _Table:
+    """Values in first-seen order with their indexes"""
+
+    def __init__(self):
+        self.values = []
+        self.ids = {}
+
+    def id(self, value):
+        if value not in self.ids:
+            self.ids[value] = len(self.values)
+            self.values.append(value)
+        return self.ids[value]
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def share_source(name):
+    """(count field, POLLED field) a *_pct share is computed from, None for other fields"""
+    match = YEAR_FIELD.match(name)
+    if not match or not match['pct'] or match['party'] == 'POLLED':
+        return None
+    return f"{match['party']}_{match['year']}", f"POLLED_{match['year']}"
+
+def derive_share(entry, name):
+    """The share votes / POLLED for a *_pct field, None when it cannot be computed"""
+    source = share_source(name)
+    if source is None:
+        return None
+    votes, polled = entry.get(source[0]), entry.get(source[1])
+    if not _is_number(votes) or not _is_number(polled):
+        return None
+    return votes / polled if polled else 0.0
+
+def is_share(name):
+    return share_source(name) is not None or name.endswith(QUANTIZED_FIELDS)
+
+def _encode_value(entry, name, value, strings, scale):
+    if isinstance(value, str):
+        return STRING, strings.id(value)
+    if type(value) is float and is_share(name):
+        derived = derive_share(entry, name)
+        if derived is not None and type(derived) is float and derived == value:
+            return DERIVED, None
+        if scale is not None and math.isfinite(value):
+            return QUANTIZED, round(value * scale)
+    return RAW, value
+
+def encode_dataset(data, precision=DEFAULT_PRECISION):
+    """The compact form of a dataset dict (JSON-ready)"""
+    scale = None if precision is None else 10 ** precision
+    fields, strings, layouts = _Table(), _Table(), _Table()
+    keys = {}
+    for key, value in data.items():
+        if not isinstance(value, list) or not all(isinstance(entry, dict) for entry in value):
+            keys[key] = {'raw': value}
+            continue
+        rows = []
+        for entry in value:
+            ids = []
+            kinds = []
+            row = [None]
+            for name, item in entry.items():
+                kind, encoded = _encode_value(entry, name, item, strings, scale)
+                ids.append(fields.id(name))
+                kinds.append(kind)
+                if kind != DERIVED:
+                    row.append(encoded)
+            row[0] = layouts.id((tuple(ids), ''.join(kinds)))
+            rows.append(row)
+        keys[key] = rows
+    return {
+        'format': FORMAT,
+        'version': VERSION,
+        'precision': precision,
+        'fields': fields.values,
+        'strings': strings.values,
+        'layouts': [[list(ids), kinds] for ids, kinds in layouts.values],
+        'keys': keys,
+    }
+
+def decode_dataset(compact):
+    """The dataset dict back from its compact form"""
+    if compact.get('format') != FORMAT or compact.get('version') != VERSION:
+        raise ValueError(f"not a {FORMAT} v{VERSION} file")
+    precision = compact['precision']
+    scale = None if precision is None else 10 ** precision
+    fields = compact['fields']
+    strings = compact['strings']
+    layouts = [([fields[i] for i in ids], kinds) for ids, kinds in compact['layouts']]
+
+    data = {}
+    for key, rows in compact['keys'].items():
+        if isinstance(rows, dict):
+            data[key] = rows['raw']
+            continue
+        entries = []
+        for row in rows:
+            names, kinds = layouts[row[0]]
+            values = iter(row[1:])
+            entry = {}
+            derived = []
+            for name, kind in zip(names, kinds):
+                if kind == DERIVED:
+                    entry[name] = None
+                    derived.append(name)
+                elif kind == STRING:
+                    entry[name] = strings[next(values)]
+                elif kind == QUANTIZED:
+                    entry[name] = next(values) / scale
+                else:
+                    entry[name] = next(values)
+            for name in derived:
+                entry[name] = derive_share(entry, name)
+            entries.append(entry)
+        data[key] = entries
+    return data
+
+def export_compact(data, path=DATASET_COMPACT, precision=DEFAULT_PRECISION):
+    """Write the compact form of the dataset (no whitespace, atomically replaced)"""
+    dump_json(encode_dataset(data, precision), path, compact=True)
+
+def load_compact(path=DATASET_COMPACT):
+    """Load a dataset dict from its compact form"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return decode_dataset(json.load(f))
+
+def compare_decoded(data, decoded, precision):
+    """(fields differing beyond the quantization step, largest quantization error)"""
+    tolerance = 0 if precision is None else 0.5 / 10 ** precision + 1e-12
+    mismatches = 0
+    largest = 0.0
+    for key, value in data.items():
+        if not isinstance(value, list) or not all(isinstance(entry, dict) for entry in value):
+            mismatches += value != decoded.get(key)
+            continue
+        for entry, other in zip(value, decoded.get(key, [])):
+            if list(entry) != list(other):
+                mismatches += 1
+                continue
+            for name, item in entry.items():
+                restored = other[name]
+                if type(item) is float and type(restored) is float and is_share(name):
+                    error = abs(item - restored)
+                    largest = max(largest, error)
+                    mismatches += error > tolerance
+                else:
+                    mismatches += item != restored or type(item) is not type(restored)
+        mismatches += abs(len(value) - len(decoded.get(key, [])))
+    return mismatches, largest
+
+def main():
+    parser = argparse.ArgumentParser(description='Write the compact, dictionary-encoded form of the dataset')
+    parser.add_argument('--precision', default=str(DEFAULT_PRECISION),
+                        help='decimal places kept for shares that are not derived from counts, '
+                             "or 'none' to keep them exactly (default: %(default)s)")
+    parser.add_argument('--output', default=DATASET_COMPACT, help='output file (default: %(default)s)')
+    parser.add_argument('--check', action='store_true', help='decode the written file and compare it with the dataset')
+    args = parser.parse_args()
+    try:
+        precision = None if args.precision.lower() == 'none' else int(args.precision)
+    except ValueError:
+        parser.error('--precision must be an integer or none')
+
+    data = load_dataset()
+    export_compact(data, args.output, precision)
+    before = os.path.getsize(DATASET_JSON) if os.path.exists(DATASET_JSON) else None
+    after = os.path.getsize(args.output)
+    print(f"Compact dataset saved to: {args.output} ({after:,} bytes)")
+    if before:
+        print(f"  {DATASET_JSON}: {before:,} bytes ({before / after:.1f}x larger)")
+
+    if args.check:
+        mismatches, largest = compare_decoded(data, load_compact(args.output), precision)
+        print(f"  Round trip: {mismatches} mismatches, largest share error {largest:.2g}")
+        if mismatches:
+            raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
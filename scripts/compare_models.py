@@ -0,0 +1,117 @@
+"""
+Compare scoring models over the whole dataset in one run.
+
+Builds each assembly's booth x party x year share arrays once from the
+dataset's *_pct fields (and POLLED totals for turnout weighting), then
+scores them under every requested model from scoring.MODELS side by side.
+Prints, per model, the category distribution, the leading parties and how
+often its top party agrees with the first model and with the published
+TOP_SCORE_PARTY.
+
+Usage: python compare_models.py [--models default,decay,turnout] [--output FILE]
+"""
+import argparse
+import json
+from collections import Counter
+
+import numpy as np
+
+from assembly_index import load_index
+from models import load_assemblies
+from scoring import DEFAULT_MODEL, MODELS, YEARS, evaluate_models
+
+def number(value):
+    """Numeric field value (0 for blanks and '-' placeholders)"""
+    return value if isinstance(value, (int, float)) else 0
+
+def assembly_shares(assembly):
+    """(parties, shares, polled, contested) arrays for an assembly's scored parties
+
+    parties are the assembly's score parties that have a *_pct field in some
+    year; a party is contested in a year when any booth has its share then.
+    """
+    booths = assembly.booths
+    score_parties = []
+    for booth in booths:
+        for party in booth.score_parties:
+            if party not in score_parties:
+                score_parties.append(party)
+    years = [booth.years for booth in booths]
+    parties = [p for p in score_parties if any(p in y.share_parties for by in years for y in by.values())]
+    party_index = {party: i for i, party in enumerate(parties)}
+
+    shares = np.zeros((len(booths), len(parties), len(YEARS)))
+    polled = np.zeros((len(booths), len(YEARS)))
+    contested = np.zeros((len(parties), len(YEARS)), dtype=bool)
+    for b, booth_years in enumerate(years):
+        for y, year in enumerate(YEARS):
+            election = booth_years.get(year)
+            if election is None:
+                continue
+            polled[b, y] = number(election.polled)
+            for party, share in zip(election.share_parties, election.shares):
+                if party in party_index:
+                    shares[b, party_index[party], y] = number(share)
+                    contested[party_index[party], y] = True
+    return parties, shares, polled, contested
+
+def score_dataset(assemblies, models):
+    """Run every model over every assembly; returns {model: [(key, idx, party, score, category)]}"""
+    results = {name: [] for name in models}
+    for assembly in assemblies:
+        parties, shares, polled, contested = assembly_shares(assembly)
+        evaluated = evaluate_models(shares, polled, contested, models)
+        for name, result in evaluated.items():
+            for idx, (top, value, category) in enumerate(zip(result['top'], result['top_value'], result['category'])):
+                party = parties[top] if parties else None
+                results[name].append((assembly.key, idx, party, float(value), category))
+    return results
+
+def published_parties(assemblies):
+    """Published top party of each booth (the party name before ' (..%)')"""
+    return [(booth.top_party or '').split(' (')[0] for assembly in assemblies for booth in assembly.booths]
+
+def print_comparison(results, published):
+    names = list(results)
+    baseline = names[0]
+    print(f"Booths scored: {len(published)}")
+    for name in names:
+        rows = results[name]
+        categories = Counter(row[4] for row in rows)
+        parties = Counter(row[2] for row in rows)
+        agree_baseline = sum(a[2] == b[2] for a, b in zip(rows, results[baseline]))
+        agree_published = sum(row[2] == party for row, party in zip(rows, published))
+        print(f"\n{name}:")
+        print(f"  Categories: " + ', '.join(f"{c}={categories[c]}" for c in sorted(categories)))
+        print(f"  Top parties: " + ', '.join(f"{p}={n}" for p, n in parties.most_common(5)))
+        if name != baseline:
+            print(f"  Same top party as {baseline}: {agree_baseline}/{len(rows)}")
+        print(f"  Same top party as published: {agree_published}/{len(rows)}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Score the dataset under several scoring models side by side')
+    parser.add_argument('--models', default=','.join(MODELS),
+                        help=f"comma-separated models to compare, first is the baseline (known: {', '.join(MODELS)})")
+    parser.add_argument('--output', help='also write every booth\'s top party, score and category per model as JSON')
+    args = parser.parse_args()
+    names = [name.strip() for name in args.models.split(',') if name.strip()] or [DEFAULT_MODEL]
+    unknown = [name for name in names if name not in MODELS]
+    if unknown:
+        parser.error(f"unknown models {unknown} (known: {', '.join(MODELS)})")
+
+    data, index = load_index()
+    assemblies = load_assemblies(data, index)
+    results = score_dataset(assemblies, {name: MODELS[name] for name in names})
+    print_comparison(results, published_parties(assemblies))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                name: [{'key': key, 'index': idx, 'party': party, 'score': score, 'category': category}
+                       for key, idx, party, score, category in rows]
+                for name, rows in results.items()
+            }, f, indent=1)
+        print(f"\nPer-booth results saved to: {args.output}")
+
+if __name__ == '__main__':
+    main()
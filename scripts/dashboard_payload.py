@@ -0,0 +1,103 @@
+"""
+Dashboard payload: the dataset already in the front end's PollingStation shape.
+
+processLocalPollingData() in src/utils/dataProcessing.ts used to rebuild
+every PollingStation from the raw booth dicts on each call, scanning every
+key for *_2021_pct / *_2016_pct / *_2011_pct candidate shares. The pipeline
+now does that once: shards.py writes each assembly's stations as one shard
+in Form20_Localities_Pct.shards/, so the front end loads only the
+assemblies it shows.
+
+The conversion mirrors the TypeScript it replaces value for value,
+including its fallbacks (String(x ?? fallback), parseFloat of numeric
+strings, 0 for anything else).
+"""
+import math
+import re
+
+from assembly_index import AssemblyIndex
+
+# Keys that should NOT be treated as candidate parties
+NON_CANDIDATE_KEYS = ('VOTERS', 'NOTA', 'PS_NO', 'POLLED')
+
+ELECTION_YEARS = ('2021', '2016', '2011')
+
+# What JavaScript's parseFloat reads from the start of a string (finite numbers; JSON has no Infinity)
+LEADING_FLOAT = re.compile(r'\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+
+def parse_numeric(value):
+    """Number value, parseFloat of a string, 0 for anything else (as parseNumeric in the TS)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return 0 if isinstance(value, float) and math.isnan(value) else value
+    if isinstance(value, str):
+        match = LEADING_FLOAT.match(value)
+        if match:
+            number = float(match.group(1))
+            return int(number) if number.is_integer() else number
+    return 0
+
+def js_string(value):
+    """String(value) as JavaScript renders JSON values"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if value is None:
+        return 'null'
+    return str(value)
+
+def is_candidate_key(key):
+    return not key.startswith(NON_CANDIDATE_KEYS)
+
+def election_candidates(station):
+    """Candidate vote shares per year from the booth's *_<year>_pct fields"""
+    candidates = {year: {} for year in ELECTION_YEARS}
+    suffixes = [(f'_{year}_pct', year) for year in ELECTION_YEARS]
+    for key, value in station.items():
+        for suffix, year in suffixes:
+            if key.endswith(suffix):
+                candidate = key.replace(suffix, '', 1)
+                if is_candidate_key(candidate):
+                    candidates[year][candidate] = parse_numeric(value)
+                break
+    return candidates
+
+def _nullish(value, fallback):
+    """value ?? fallback"""
+    return fallback if value is None else value
+
+def polling_station(ac_id, index, station):
+    """One booth dict as a PollingStation"""
+    ps_no = station.get('PS_NO_2021')
+    locality = station.get('LOCALITY_EXTRACTED')
+    candidates = election_candidates(station)
+    payload = {
+        'id': f"{ac_id}_{js_string(ps_no) if ps_no else index}",
+        'ac_id': ac_id,
+        'ac_name': js_string(_nullish(locality, f'AC {ac_id}')),
+        'ps_no': js_string(_nullish(ps_no, index)),
+        'ps_name': js_string(_nullish(ps_no, index)),
+        'locality': js_string(_nullish(locality, '')),
+        'latitude': parse_numeric(station.get('Latitude')),
+        'longitude': parse_numeric(station.get('Longitude')),
+        'category': js_string(_nullish(station.get('TOP_SCORE_CATEGORY'), '')),
+        'strongestParty': js_string(_nullish(station.get('TOP_SCORE_PARTY'), '')),
+    }
+    for year in ELECTION_YEARS:
+        payload[f'election{year}'] = {
+            'year': int(year),
+            'total_votes': parse_numeric(station.get(f'POLLED_{year}')),
+            'candidates': candidates[year],
+        }
+    return payload
+
+def build_payload(data, index=None):
+    """{'assemblies': ac_ids in dataset order, 'stations': {ac_id: [PollingStation]}}"""
+    index = index or AssemblyIndex(data)
+    return {
+        'assemblies': [ref.code for ref in index],
+        'stations': {
+            ref.code: [polling_station(ref.code, i, station) for i, station in enumerate(ref.booths)]
+            for ref in index
+        },
+    }
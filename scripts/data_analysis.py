@@ -1,52 +1,25 @@
 """
 Data Analysis and Validation Script for Form20_Localities_Pct
 This script analyzes the election data and creates a comprehensive check log.
+All per-booth checks are Rule objects run together in a single pass over the
+data; to add a check, subclass Rule and add it to DEFAULT_RULES.
+--fast runs the vectorized coordinate, percentage, score and assembly
+footprint checks from bulk_validation.py instead, for CI; it leaves out the
+field consistency and entry count sections.
 """
 
-import json
+import argparse
+import math
+import os
+import statistics
 import sys
 from collections import defaultdict
 
-# Assembly mapping (1-30 with names)
-ASSEMBLIES = {
-    '1': 'Mannadipet',
-    '2': 'Thirubhuvanai (SC)',
-    '3': 'Ossudu (SC)',
-    '4': 'Mangalam',
-    '5': 'Villianur',
-    '6': 'Ozhukarai',
-    '7': 'Kadirkamam',
-    '8': 'Indira Nagar',
-    '9': 'Thattanchavady',
-    '10': 'Kamaraj Nagar',
-    '11': 'Lawspet',
-    '12': 'Kalapet',
-    '13': 'Muthialpet',
-    '14': 'Raj Bhavan',
-    '15': 'Oupalam',
-    '16': 'Orleampeth',
-    '17': 'Nellithope',
-    '18': 'Mudaliarpet',
-    '19': 'Ariankuppam',
-    '20': 'Manavely',
-    '21': 'Embalam (SC)',
-    '22': 'Nettapakkam (SC)',
-    '23': 'Bahour',
-    '24': 'Nedungadu (SC)',
-    '25': 'Thirunallar',
-    '26': 'Karaikal North',
-    '27': 'Karaikal South',
-    '28': 'Neravy T R Pattinam',
-    '29': 'Mahe',
-    '30': 'Yanam'
-}
+from assembly_index import ASSEMBLIES, load_index, region_for
+from scoring import categorize
+from spatial_index import GridIndex, box_polygon, convex_hull, load_geojson_polygons, point_in_polygon
 
-def load_json_data(filepath):
-    """Load and parse JSON data"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def analyze_structure(data, log):
+def analyze_structure(data, index, log):
     """Analyze overall data structure"""
     log.append("\n" + "="*80)
     log.append("1. DATA STRUCTURE ANALYSIS")
@@ -57,8 +30,8 @@ def analyze_structure(data, log):
     log.append(f"Keys found: {all_keys}")
     
     # Identify assembly keys vs non-assembly keys
-    assembly_keys = [k for k in all_keys if k.startswith('AC_') and '_FINAL' in k]
-    non_assembly_keys = [k for k in all_keys if k not in assembly_keys]
+    assembly_keys = index.keys()
+    non_assembly_keys = index.other_keys
     
     log.append(f"\nAssembly data keys: {len(assembly_keys)}")
     log.append(f"Assembly keys: {sorted(assembly_keys)}")
@@ -68,12 +41,11 @@ def analyze_structure(data, log):
     
     # Check which assemblies are present
     present_ac_numbers = []
-    for k in assembly_keys:
-        try:
-            num = k.replace('AC_', '').replace('_FINAL', '')
-            present_ac_numbers.append(int(num))
-        except ValueError:
-            log.append(f"⚠️  Invalid assembly key format: {k}")
+    for ref in index:
+        if ref.number is None:
+            log.append(f"⚠️  Invalid assembly key format: {ref.key}")
+        else:
+            present_ac_numbers.append(ref.number)
     
     present_ac_numbers = sorted(present_ac_numbers)
     expected = set(range(1, 31))
@@ -85,13 +57,52 @@ def analyze_structure(data, log):
     log.append(f"Missing assemblies (should have 1-30): {sorted(missing) if missing else 'None'}")
     log.append(f"Extra assemblies (outside 1-30): {sorted(extra) if extra else 'None'}")
     
-    return assembly_keys
+    return index
 
-def analyze_field_consistency(data, assembly_keys, log):
-    """Check field consistency across all entries"""
+# Optional boundary files; when absent the built-in bounds / booth hulls are used
+REGION_BOUNDARIES = 'region_boundaries.geojson'
+ASSEMBLY_BOUNDARIES = 'assembly_boundaries.geojson'
+
+def region_polygons(bounds):
+    """Region polygons from REGION_BOUNDARIES if present, else the bounding boxes"""
+    if os.path.exists(REGION_BOUNDARIES):
+        return load_geojson_polygons(REGION_BOUNDARIES, 'region')
+    return {region: [box_polygon(b['lat'], b['lng'])] for region, b in bounds.items()}
+
+def as_number(value):
+    """Numeric value of a vote/percentage field (0 for blanks and '-' placeholders)"""
+    return value if isinstance(value, (int, float)) else 0
+
+def section_header(log, title):
+    """Append a numbered report section header"""
     log.append("\n" + "="*80)
-    log.append("2. FIELD CONSISTENCY ANALYSIS")
+    log.append(title)
     log.append("="*80)
+
+class Rule:
+    """A validation rule checked against every booth in a single traversal
+    
+    Subclasses keep their own findings. start_assembly() is called once per
+    assembly before its booths, check() once per booth, and report() once at
+    the end to write the rule's section of the log.
+    """
+    title = ''
+    
+    def start_assembly(self, ac_key, ac_num):
+        pass
+    
+    def check(self, ac_key, idx, entry):
+        pass
+    
+    def report(self, log):
+        pass
+    
+    def issue_count(self):
+        return 0
+
+class FieldConsistencyRule(Rule):
+    """Check field consistency across all entries"""
+    title = "2. FIELD CONSISTENCY ANALYSIS"
     
     expected_fields = [
         'PS_NO_2021', 'LOCALITY_EXTRACTED', 'Latitude', 'Longitude',
@@ -107,44 +118,48 @@ def analyze_field_consistency(data, assembly_keys, log):
         'DMK_SCORE', 'AIADMK_SCORE', 'BJP_SCORE',
         'TOP_SCORE_PARTY', 'TOP_SCORE_CATEGORY'
     ]
+    # Allowed but not required: the source of imputed coordinates (impute_coordinates.py)
+    optional_fields = ['COORD_SOURCE']
+    
+    def __init__(self):
+        self.expected_set = set(self.expected_fields) | set(self.optional_fields)
+        self.field_issues = defaultdict(list)
+        self.missing_fields = defaultdict(list)
     
-    field_issues = defaultdict(list)
-    missing_fields = defaultdict(list)
-    
-    for ac_key in assembly_keys:
-        entries = data[ac_key]
-        for idx, entry in enumerate(entries):
-            entry_fields = set(entry.keys())
-            
-            # Check for missing expected fields
-            for ef in expected_fields:
-                if ef not in entry_fields:
-                    missing_fields[ef].append(f"{ac_key}[{idx}]")
-            
-            # Check for unexpected fields
-            unexpected = entry_fields - set(expected_fields)
-            if unexpected:
-                field_issues[ac_key].append((idx, list(unexpected)))
-    
-    if missing_fields:
-        log.append("\n⚠️  MISSING FIELDS DETECTED:")
-        for field, locations in list(missing_fields.items())[:10]:
-            log.append(f"   - '{field}': Missing in {len(locations)} entries")
-    else:
-        log.append("\n✅ All expected fields present in all entries")
-    
-    if field_issues:
-        log.append("\n⚠️  UNEXPECTED FIELDS DETECTED:")
-        for ac, issues in list(field_issues.items())[:5]:
-            log.append(f"   - {ac}: {issues}")
-    else:
-        log.append("✅ No unexpected fields found")
+    def check(self, ac_key, idx, entry):
+        entry_fields = set(entry.keys())
+        
+        # Check for missing expected fields
+        for ef in self.expected_fields:
+            if ef not in entry_fields:
+                self.missing_fields[ef].append(f"{ac_key}[{idx}]")
+        
+        # Check for unexpected fields
+        unexpected = entry_fields - self.expected_set
+        if unexpected:
+            self.field_issues[ac_key].append((idx, list(unexpected)))
+    
+    def report(self, log):
+        if self.missing_fields:
+            log.append("\n⚠️  MISSING FIELDS DETECTED:")
+            for field, locations in list(self.missing_fields.items())[:10]:
+                log.append(f"   - '{field}': Missing in {len(locations)} entries")
+        else:
+            log.append("\n✅ All expected fields present in all entries")
+        
+        if self.field_issues:
+            log.append("\n⚠️  UNEXPECTED FIELDS DETECTED:")
+            for ac, issues in list(self.field_issues.items())[:5]:
+                log.append(f"   - {ac}: {issues}")
+        else:
+            log.append("✅ No unexpected fields found")
+    
+    def issue_count(self):
+        return len(self.missing_fields) + len(self.field_issues)
 
-def analyze_coordinates(data, assembly_keys, log):
+class CoordinateRule(Rule):
     """Validate geographic coordinates"""
-    log.append("\n" + "="*80)
-    log.append("3. COORDINATE VALIDATION")
-    log.append("="*80)
+    title = "3. COORDINATE VALIDATION"
     
     # Regional bounds for Puducherry, Karaikal, Mahe, Yanam
     bounds = {
@@ -154,257 +169,305 @@ def analyze_coordinates(data, assembly_keys, log):
         'Yanam': {'lat': (16.65, 16.80), 'lng': (82.15, 82.30)}
     }
     
-    coordinate_issues = []
-    null_coordinates = []
-    total_entries = 0
+    def __init__(self):
+        self.coordinate_issues = []
+        self.null_coordinates = []
+        self.total_entries = 0
+        self.expected_region = None
+        self.polygons = region_polygons(self.bounds)
+        self.index = GridIndex.from_polygons(self.polygons)
+    
+    def start_assembly(self, ac_key, ac_num):
+        self.expected_region = region_for(ac_num)
+    
+    def check(self, ac_key, idx, entry):
+        self.total_entries += 1
+        lat = entry.get('Latitude')
+        lng = entry.get('Longitude')
+        
+        if lat is None or lng is None:
+            self.null_coordinates.append(f"{ac_key}[{idx}]: {entry.get('LOCALITY_EXTRACTED', 'Unknown')}")
+            return
+        
+        if not isinstance(lat, (int, float)) or not isinstance(lng, (int, float)):
+            self.coordinate_issues.append(f"{ac_key}[{idx}]: Invalid type - lat={type(lat)}, lng={type(lng)}")
+            return
+        
+        # Classify against the region polygons; a booth inside any region is accepted
+        if self.expected_region and not self.index.query(lat, lng):
+            self.coordinate_issues.append(
+                f"{ac_key}[{idx}] ({entry.get('LOCALITY_EXTRACTED', 'Unknown')}): "
+                f"lat={lat}, lng={lng} - Outside all expected regions"
+            )
+    
+    def report(self, log):
+        log.append(f"\nTotal entries checked: {self.total_entries}")
+        log.append(f"Entries with NULL coordinates: {len(self.null_coordinates)}")
+        log.append(f"Entries with invalid/out-of-bounds coordinates: {len(self.coordinate_issues)}")
+        
+        if self.null_coordinates:
+            log.append("\n⚠️  ENTRIES WITH NULL COORDINATES:")
+            for issue in self.null_coordinates[:10]:
+                log.append(f"   - {issue}")
+            if len(self.null_coordinates) > 10:
+                log.append(f"   ... and {len(self.null_coordinates) - 10} more")
+        
+        if self.coordinate_issues:
+            log.append("\n⚠️  ENTRIES WITH OUT-OF-BOUNDS COORDINATES:")
+            for issue in self.coordinate_issues[:10]:
+                log.append(f"   - {issue}")
+            if len(self.coordinate_issues) > 10:
+                log.append(f"   ... and {len(self.coordinate_issues) - 10} more")
+        
+        if not self.null_coordinates and not self.coordinate_issues:
+            log.append("✅ All coordinates are valid and within expected bounds")
     
-    for ac_key in assembly_keys:
-        ac_num = ac_key.replace('AC_', '').replace('_FINAL', '')
-        entries = data[ac_key]
+    def issue_count(self):
+        return len(self.null_coordinates) + len(self.coordinate_issues)
+
+class AssemblyFootprintRule(Rule):
+    """Flag booths that sit inside a different assembly's footprint
+    
+    Footprints come from ASSEMBLY_BOUNDARIES when that GeoJSON exists.
+    Otherwise each assembly's footprint is the convex hull of its booths,
+    leaving out outliers far from the assembly's median point. Only booths
+    outside their own footprint are checked against the others.
+    """
+    title = "7. ASSEMBLY FOOTPRINT VALIDATION"
+    
+    # Booths further than this many median distances from the centre are outliers
+    outlier_factor = 3.0
+    min_radius = 0.005
+    
+    def __init__(self):
+        self.points = defaultdict(list)
+        self.misplaced = []
+    
+    def check(self, ac_key, idx, entry):
+        lat = entry.get('Latitude')
+        lng = entry.get('Longitude')
+        if isinstance(lat, (int, float)) and isinstance(lng, (int, float)):
+            self.points[ac_key].append((idx, lat, lng))
+    
+    def footprints(self):
+        """Footprint polygons {ac_key: [rings, ...]}"""
+        if os.path.exists(ASSEMBLY_BOUNDARIES):
+            boundaries = load_geojson_polygons(ASSEMBLY_BOUNDARIES, 'AC')
+            return {f'AC_{ac_num}_FINAL': polygons for ac_num, polygons in boundaries.items()}
         
-        # Determine expected region based on assembly number
-        try:
-            ac_int = int(ac_num)
-            if 1 <= ac_int <= 23:
-                expected_region = 'Puducherry'
-            elif 24 <= ac_int <= 28:
-                expected_region = 'Karaikal'
-            elif ac_int == 29:
-                expected_region = 'Mahe'
-            elif ac_int == 30:
-                expected_region = 'Yanam'
-            else:
-                expected_region = None
-        except:
-            expected_region = None
+        footprints = {}
+        for ac_key, points in self.points.items():
+            center_lat = statistics.median(p[1] for p in points)
+            center_lng = statistics.median(p[2] for p in points)
+            dists = [math.hypot(lat - center_lat, lng - center_lng) for _, lat, lng in points]
+            radius = max(self.outlier_factor * statistics.median(dists), self.min_radius)
+            hull = convex_hull([(lat, lng) for (_, lat, lng), d in zip(points, dists) if d <= radius])
+            if len(hull) >= 3:
+                footprints[ac_key] = [[hull]]
+        return footprints
+    
+    def find_misplaced(self, footprints):
+        """Record booths outside their own footprint that lie inside another's"""
+        index = GridIndex.from_polygons(footprints, cell_size=0.01)
+        for ac_key, points in self.points.items():
+            own = footprints.get(ac_key, [])
+            for idx, lat, lng in points:
+                if any(point_in_polygon(lat, lng, rings) for rings in own):
+                    continue
+                self.check_others(index, ac_key, idx, lat, lng)
+    
+    def check_others(self, index, ac_key, idx, lat, lng):
+        others = [key for key in index.query(lat, lng) if key != ac_key]
+        if others:
+            self.misplaced.append(f"{ac_key}[{idx}]: lat={lat}, lng={lng} - inside {', '.join(others)}")
+    
+    def report(self, log):
+        footprints = self.footprints()
+        self.find_misplaced(footprints)
         
-        for idx, entry in enumerate(entries):
-            total_entries += 1
-            lat = entry.get('Latitude')
-            lng = entry.get('Longitude')
-            
-            if lat is None or lng is None:
-                null_coordinates.append(f"{ac_key}[{idx}]: {entry.get('LOCALITY_EXTRACTED', 'Unknown')}")
-                continue
-            
-            if not isinstance(lat, (int, float)) or not isinstance(lng, (int, float)):
-                coordinate_issues.append(f"{ac_key}[{idx}]: Invalid type - lat={type(lat)}, lng={type(lng)}")
-                continue
-            
-            # Check against expected bounds
-            if expected_region:
-                b = bounds[expected_region]
-                if not (b['lat'][0] <= lat <= b['lat'][1] and b['lng'][0] <= lng <= b['lng'][1]):
-                    # Check if it fits in any other region
-                    fits_any = False
-                    for region, rb in bounds.items():
-                        if rb['lat'][0] <= lat <= rb['lat'][1] and rb['lng'][0] <= lng <= rb['lng'][1]:
-                            fits_any = True
-                            break
-                    
-                    if not fits_any:
-                        coordinate_issues.append(
-                            f"{ac_key}[{idx}] ({entry.get('LOCALITY_EXTRACTED', 'Unknown')}): "
-                            f"lat={lat}, lng={lng} - Outside all expected regions"
-                        )
-    
-    log.append(f"\nTotal entries checked: {total_entries}")
-    log.append(f"Entries with NULL coordinates: {len(null_coordinates)}")
-    log.append(f"Entries with invalid/out-of-bounds coordinates: {len(coordinate_issues)}")
-    
-    if null_coordinates:
-        log.append("\n⚠️  ENTRIES WITH NULL COORDINATES:")
-        for issue in null_coordinates[:10]:
-            log.append(f"   - {issue}")
-        if len(null_coordinates) > 10:
-            log.append(f"   ... and {len(null_coordinates) - 10} more")
-    
-    if coordinate_issues:
-        log.append("\n⚠️  ENTRIES WITH OUT-OF-BOUNDS COORDINATES:")
-        for issue in coordinate_issues[:10]:
-            log.append(f"   - {issue}")
-        if len(coordinate_issues) > 10:
-            log.append(f"   ... and {len(coordinate_issues) - 10} more")
-    
-    if not null_coordinates and not coordinate_issues:
-        log.append("✅ All coordinates are valid and within expected bounds")
-    
-    return null_coordinates, coordinate_issues
+        log.append(f"\nAssembly footprints: {len(footprints)}")
+        log.append(f"Booths inside another assembly's footprint: {len(self.misplaced)}")
+        
+        if self.misplaced:
+            log.append("\n⚠️  BOOTHS IN ANOTHER ASSEMBLY'S FOOTPRINT:")
+            for issue in self.misplaced[:10]:
+                log.append(f"   - {issue}")
+            if len(self.misplaced) > 10:
+                log.append(f"   ... and {len(self.misplaced) - 10} more")
+        else:
+            log.append("✅ Every booth lies within its own assembly's footprint")
+    
+    def issue_count(self):
+        return len(self.misplaced)
 
-def analyze_percentages(data, assembly_keys, log):
+class PercentageRule(Rule):
     """Validate percentage calculations"""
-    log.append("\n" + "="*80)
-    log.append("4. PERCENTAGE VALIDATION")
-    log.append("="*80)
+    title = "4. PERCENTAGE VALIDATION"
     
-    percentage_issues = []
-    
-    for ac_key in assembly_keys:
-        entries = data[ac_key]
-        
-        for idx, entry in enumerate(entries):
-            # 2011 percentages
-            polled_2011 = entry.get('POLLED_2011', 0)
-            if polled_2011 > 0:
-                total_pct_2011 = sum([
-                    entry.get('NRC_2011_pct', 0),
-                    entry.get('PMK_2011_pct', 0),
-                    entry.get('IND_2011_pct', 0),
-                    entry.get('OTHERS_2011_pct', 0)
-                ])
-                if abs(total_pct_2011 - 1.0) > 0.05:
-                    percentage_issues.append(
-                        f"{ac_key}[{idx}] 2011: Total percentage = {total_pct_2011:.4f} (expected ~1.0)"
-                    )
-            
-            # 2016 percentages (including NOTA)
-            polled_2016 = entry.get('POLLED_2016', 0)
-            if polled_2016 > 0:
-                total_pct_2016 = sum([
-                    entry.get('NRC_2016_pct', 0),
-                    entry.get('DMK_2016_pct', 0),
-                    entry.get('AIADMK_2016_pct', 0),
-                    entry.get('OTHERS_2016_pct', 0),
-                    entry.get('NOTA_2016_pct', 0)
-                ])
-                if abs(total_pct_2016 - 1.0) > 0.05:
-                    percentage_issues.append(
-                        f"{ac_key}[{idx}] 2016: Total percentage = {total_pct_2016:.4f} (expected ~1.0)"
-                    )
-            
-            # 2021 percentages
-            polled_2021 = entry.get('POLLED_2021', 0)
-            if polled_2021 > 0:
-                total_pct_2021 = sum([
-                    entry.get('BJP_2021_pct', 0),
-                    entry.get('DMK_2021_pct', 0),
-                    entry.get('OTHERS_2021_pct', 0),
-                    entry.get('NOTA_2021_pct', 0)
-                ])
-                if abs(total_pct_2021 - 1.0) > 0.05:
-                    percentage_issues.append(
-                        f"{ac_key}[{idx}] 2021: Total percentage = {total_pct_2021:.4f} (expected ~1.0)"
+    # Percentage fields expected to sum to ~1.0 for each year (2016 includes NOTA)
+    year_fields = {
+        '2011': ['NRC_2011_pct', 'PMK_2011_pct', 'IND_2011_pct', 'OTHERS_2011_pct'],
+        '2016': ['NRC_2016_pct', 'DMK_2016_pct', 'AIADMK_2016_pct', 'OTHERS_2016_pct', 'NOTA_2016_pct'],
+        '2021': ['BJP_2021_pct', 'DMK_2021_pct', 'OTHERS_2021_pct', 'NOTA_2021_pct'],
+    }
+    tolerance = 0.05
+    
+    def __init__(self):
+        self.percentage_issues = []
+    
+    def check(self, ac_key, idx, entry):
+        for year, fields in self.year_fields.items():
+            if as_number(entry.get(f'POLLED_{year}', 0)) > 0:
+                total_pct = sum([as_number(entry.get(field, 0)) for field in fields])
+                if abs(total_pct - 1.0) > self.tolerance:
+                    self.percentage_issues.append(
+                        f"{ac_key}[{idx}] {year}: Total percentage = {total_pct:.4f} (expected ~1.0)"
                     )
     
-    log.append(f"\nPercentage validation issues: {len(percentage_issues)}")
-    
-    if percentage_issues:
-        log.append("\n⚠️  PERCENTAGE SUM ISSUES:")
-        for issue in percentage_issues[:20]:
-            log.append(f"   - {issue}")
-        if len(percentage_issues) > 20:
-            log.append(f"   ... and {len(percentage_issues) - 20} more")
-    else:
-        log.append("✅ All percentages sum correctly")
+    def report(self, log):
+        log.append(f"\nPercentage validation issues: {len(self.percentage_issues)}")
+        
+        if self.percentage_issues:
+            log.append("\n⚠️  PERCENTAGE SUM ISSUES:")
+            for issue in self.percentage_issues[:20]:
+                log.append(f"   - {issue}")
+            if len(self.percentage_issues) > 20:
+                log.append(f"   ... and {len(self.percentage_issues) - 20} more")
+        else:
+            log.append("✅ All percentages sum correctly")
+    
+    def issue_count(self):
+        return len(self.percentage_issues)
 
-def analyze_scores(data, assembly_keys, log):
+class ScoreRule(Rule):
     """Validate score calculations"""
-    log.append("\n" + "="*80)
-    log.append("5. SCORE VALIDATION")
-    log.append("="*80)
+    title = "5. SCORE VALIDATION"
+    
+    parties = ['NRC', 'PMK', 'IND', 'OTHERS', 'DMK', 'AIADMK', 'BJP']
+    tolerance = 0.05
     
-    score_issues = []
-    category_issues = []
+    def __init__(self):
+        self.score_fields = [(party, f'{party}_SCORE') for party in self.parties]
+        self.score_issues = []
+        self.category_issues = []
     
-    for ac_key in assembly_keys:
-        entries = data[ac_key]
+    def check(self, ac_key, idx, entry):
+        scores = {party: entry.get(field, 0) for party, field in self.score_fields}
         
-        for idx, entry in enumerate(entries):
-            scores = {
-                'NRC': entry.get('NRC_SCORE', 0),
-                'PMK': entry.get('PMK_SCORE', 0),
-                'IND': entry.get('IND_SCORE', 0),
-                'OTHERS': entry.get('OTHERS_SCORE', 0),
-                'DMK': entry.get('DMK_SCORE', 0),
-                'AIADMK': entry.get('AIADMK_SCORE', 0),
-                'BJP': entry.get('BJP_SCORE', 0)
-            }
-            
-            total_score = sum(scores.values())
-            if abs(total_score - 1.0) > 0.05:
-                score_issues.append(
-                    f"{ac_key}[{idx}]: Total score = {total_score:.4f} (expected ~1.0)"
-                )
-            
-            # Validate TOP_SCORE_PARTY
-            top_party = entry.get('TOP_SCORE_PARTY', '')
-            top_category = entry.get('TOP_SCORE_CATEGORY', '')
-            
-            if scores:
-                max_party = max(scores, key=scores.get)
-                max_score = scores[max_party]
-                
-                # Check if TOP_SCORE_PARTY matches
-                if max_party not in top_party:
-                    score_issues.append(
-                        f"{ac_key}[{idx}]: TOP_SCORE_PARTY '{top_party}' doesn't match calculated max '{max_party}'"
-                    )
-                
-                # Validate category (A > 50%, B > 30%, C <= 30%)
-                expected_cat = 'C'
-                if max_score > 0.50:
-                    expected_cat = 'A'
-                elif max_score > 0.30:
-                    expected_cat = 'B'
-                
-                if top_category != expected_cat:
-                    category_issues.append(
-                        f"{ac_key}[{idx}]: Category '{top_category}' doesn't match expected '{expected_cat}' for score {max_score:.2%}"
-                    )
+        total_score = sum(scores.values())
+        if abs(total_score - 1.0) > self.tolerance:
+            self.score_issues.append(
+                f"{ac_key}[{idx}]: Total score = {total_score:.4f} (expected ~1.0)"
+            )
+        
+        # Validate TOP_SCORE_PARTY
+        top_party = entry.get('TOP_SCORE_PARTY', '')
+        top_category = entry.get('TOP_SCORE_CATEGORY', '')
+        
+        max_party = max(scores, key=scores.get)
+        max_score = scores[max_party]
+        
+        # Check if TOP_SCORE_PARTY matches
+        if max_party not in top_party:
+            self.score_issues.append(
+                f"{ac_key}[{idx}]: TOP_SCORE_PARTY '{top_party}' doesn't match calculated max '{max_party}'"
+            )
+        
+        # Validate category against scoring's thresholds (A > 50%, B > 30%, C otherwise)
+        expected_cat = categorize(max_score).item()
+        
+        if top_category != expected_cat:
+            self.category_issues.append(
+                f"{ac_key}[{idx}]: Category '{top_category}' doesn't match expected '{expected_cat}' for score {max_score:.2%}"
+            )
+    
+    def report(self, log):
+        log.append(f"\nScore sum issues: {len(self.score_issues)}")
+        log.append(f"Category issues: {len(self.category_issues)}")
+        
+        if self.score_issues:
+            log.append("\n⚠️  SCORE ISSUES:")
+            for issue in self.score_issues[:10]:
+                log.append(f"   - {issue}")
+            if len(self.score_issues) > 10:
+                log.append(f"   ... and {len(self.score_issues) - 10} more")
+        
+        if self.category_issues:
+            log.append("\n⚠️  CATEGORY ISSUES:")
+            for issue in self.category_issues[:10]:
+                log.append(f"   - {issue}")
+            if len(self.category_issues) > 10:
+                log.append(f"   ... and {len(self.category_issues) - 10} more")
+        
+        if not self.score_issues and not self.category_issues:
+            log.append("✅ All scores and categories are valid")
     
-    log.append(f"\nScore sum issues: {len(score_issues)}")
-    log.append(f"Category issues: {len(category_issues)}")
-    
-    if score_issues:
-        log.append("\n⚠️  SCORE ISSUES:")
-        for issue in score_issues[:10]:
-            log.append(f"   - {issue}")
-        if len(score_issues) > 10:
-            log.append(f"   ... and {len(score_issues) - 10} more")
-    
-    if category_issues:
-        log.append("\n⚠️  CATEGORY ISSUES:")
-        for issue in category_issues[:10]:
-            log.append(f"   - {issue}")
-        if len(category_issues) > 10:
-            log.append(f"   ... and {len(category_issues) - 10} more")
-    
-    if not score_issues and not category_issues:
-        log.append("✅ All scores and categories are valid")
+    def issue_count(self):
+        return len(self.score_issues) + len(self.category_issues)
 
-def count_entries_per_assembly(data, assembly_keys, log):
+class EntryCountRule(Rule):
     """Count entries per assembly"""
-    log.append("\n" + "="*80)
-    log.append("6. ENTRY COUNT PER ASSEMBLY")
-    log.append("="*80)
+    title = "6. ENTRY COUNT PER ASSEMBLY"
+    
+    def __init__(self):
+        self.counts = {}
+        self.ac_nums = {}
     
-    counts = {}
-    total = 0
-    for ac_key in assembly_keys:
-        ac_num = ac_key.replace('AC_', '').replace('_FINAL', '')
-        count = len(data[ac_key])
-        ac_name = ASSEMBLIES.get(ac_num, 'Unknown')
-        counts[ac_key] = count
-        total += count
-        log.append(f"   AC {ac_num:>2} ({ac_name:25}): {count} entries")
+    def start_assembly(self, ac_key, ac_num):
+        self.counts[ac_key] = 0
+        self.ac_nums[ac_key] = ac_num
     
-    log.append(f"\n   TOTAL: {total} entries")
+    def check(self, ac_key, idx, entry):
+        self.counts[ac_key] += 1
     
-    return counts
+    def report(self, log):
+        for ac_key, count in self.counts.items():
+            ac_num = self.ac_nums[ac_key]
+            ac_name = ASSEMBLIES.get(ac_num, 'Unknown')
+            log.append(f"   AC {ac_num:>2} ({ac_name:25}): {count} entries")
+        
+        log.append(f"\n   TOTAL: {sum(self.counts.values())} entries")
+
+# Rules run by default, in report order
+DEFAULT_RULES = [FieldConsistencyRule, CoordinateRule, PercentageRule, ScoreRule, EntryCountRule,
+                 AssemblyFootprintRule]
+
+def run_rules(index, rules):
+    """Check every rule against every booth in one traversal of the dataset"""
+    for ref in index:
+        for rule in rules:
+            rule.start_assembly(ref.key, ref.code)
+        for idx, entry in enumerate(ref.booths):
+            for rule in rules:
+                rule.check(ref.key, idx, entry)
+    return rules
+
+def report_rules(rules, log):
+    """Append each rule's report section to the log"""
+    for rule in rules:
+        section_header(log, rule.title)
+        rule.report(log)
 
-def generate_summary(log, data, assembly_keys):
+def generate_summary(log, index):
     """Generate a summary of findings"""
     log.append("\n" + "="*80)
     log.append("SUMMARY")  
     log.append("="*80)
     
-    total_entries = sum(len(data[k]) for k in assembly_keys)
-    log.append(f"\n✅ Total assemblies with data: {len(assembly_keys)}")
+    total_entries = index.total_booths
+    log.append(f"\n✅ Total assemblies with data: {len(index)}")
     log.append(f"✅ Total polling station entries: {total_entries}")
     log.append(f"✅ Years covered: 2011, 2016, 2021")
     log.append(f"✅ Parties tracked: NRC, PMK, DMK, AIADMK, BJP, IND, OTHERS")
 
 def main():
+    parser = argparse.ArgumentParser(description='Validate Form20_Localities_Pct and write data_check_log.txt')
+    parser.add_argument('--fast', action='store_true',
+                        help='vectorized coordinate, percentage, score and assembly footprint checks only '
+                             '(no field consistency or entry counts); exit status 1 if any fail')
+    args = parser.parse_args()
+    
+    issues = 0
     log = []
     log.append("="*80)
     log.append("DATA ANALYSIS AND VALIDATION REPORT")
@@ -412,18 +475,21 @@ def main():
     log.append("="*80)
     
     try:
-        data = load_json_data('Form20_Localities_Pct.json')
+        data, index = load_index()
         
-        assembly_keys = analyze_structure(data, log)
-        if assembly_keys:
-            analyze_field_consistency(data, assembly_keys, log)
-            analyze_coordinates(data, assembly_keys, log)
-            analyze_percentages(data, assembly_keys, log)
-            analyze_scores(data, assembly_keys, log)
-            count_entries_per_assembly(data, assembly_keys, log)
-            generate_summary(log, data, assembly_keys)
+        analyze_structure(data, index, log)
+        if len(index):
+            if args.fast:
+                from bulk_validation import BULK_RULES, run_bulk_rules
+                rules = run_bulk_rules(index, [rule() for rule in BULK_RULES])
+            else:
+                rules = run_rules(index, [rule() for rule in DEFAULT_RULES])
+            report_rules(rules, log)
+            issues = sum(rule.issue_count() for rule in rules)
+            generate_summary(log, index)
         
     except Exception as e:
+        issues += 1
         log.append(f"\n❌ ERROR: {str(e)}")
         import traceback
         log.append(traceback.format_exc())
@@ -436,6 +502,9 @@ def main():
         f.write('\n'.join(log))
     
     print("\n\nLog saved to: data_check_log.txt")
+    
+    if args.fast and issues:
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
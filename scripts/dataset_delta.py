@@ -0,0 +1,358 @@
+"""
+Booth- and field-level deltas between versions of the dataset.
+
+A delta is a JSON Patch (RFC 6902) style list of add / remove / replace
+operations with JSON Pointer paths such as /AC_14_FINAL/3/Latitude, plus a
+change log of the booths it touches and the digests of the dataset version
+it applies to and the one it produces:
+
+  {"format": "form20-delta", "version": 2, "base": ..., "target": ...,
+   "changes": [...], "ops": [...]}
+
+A version's digest is the sha256 of its content (compact JSON in dataset
+order), so re-indenting the export does not make a new version.
+
+Booths are matched by identity (PS_NO_2021 and its occurrence number within
+the assembly), not position, so inserting or removing a booth does not turn
+every later booth into a change. Each booth is hashed once and only booths
+whose hash differs are compared field by field, so a delta is built in time
+linear in the dataset size. An assembly whose surviving booths were
+reordered is replaced as a whole.
+
+Versions are recorded in a chain, Form20_Localities_Pct.deltas/:
+
+  index.json  - head (version number and digest) and, per delta, its file,
+                the versions and digests it connects, when it was recorded
+                and how many booths it adds, removes and modifies
+  vNNNN.json  - the delta from version NNNN - 1 to NNNN
+  head.json   - the head version's dataset, the base of the next delta
+
+record_version() appends a delta when the dataset differs from the head and
+does nothing otherwise. A consumer holding any earlier version applies the
+deltas from its own version onwards (see update_to_head()).
+
+Usage:
+  python dataset_delta.py diff OLD.json NEW.json [--output FILE]
+  python dataset_delta.py apply DELTA.json BASE.json [--output FILE]
+  python dataset_delta.py record [--dir DIR]
+  python dataset_delta.py update BASE.json [--dir DIR] [--output FILE]
+  python dataset_delta.py log [--dir DIR]
+"""
+import argparse
+from collections import Counter
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+
+from dataset_store import DATASET_DELTAS, DATASET_JSON
+from json_writer import dump_json
+
+FORMAT = 'form20-delta'
+VERSION = 2
+
+CHAIN_FORMAT = 'form20-delta-chain'
+CHAIN_INDEX = 'index.json'
+CHAIN_HEAD = 'head.json'
+
+def _canonical(value):
+    """Stable JSON text of a value (keys sorted; 1 and 1.0 differ)"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'))
+
+def record_hash(entry):
+    return hashlib.blake2b(_canonical(entry).encode('utf-8'), digest_size=16).digest()
+
+def content_digest(data):
+    """Digest identifying a dataset version: sha256 of its compact JSON in dataset order"""
+    return hashlib.sha256(json.dumps(data, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+def json_pointer(*parts):
+    """JSON Pointer of a path, escaping '~' and '/' (as in 'PS_NAME/PS_NO')"""
+    return ''.join('/' + str(part).replace('~', '~0').replace('/', '~1') for part in parts)
+
+def _parse_pointer(path):
+    return [part.replace('~1', '/').replace('~0', '~') for part in path.split('/')[1:]]
+
+def booth_ids(entries):
+    """Identity of each record: (PS_NO_2021, occurrence) or (None, position) without one"""
+    seen = {}
+    ids = []
+    for i, entry in enumerate(entries):
+        name = entry.get('PS_NO_2021') if isinstance(entry, dict) else None
+        if name is None:
+            ids.append((None, i))
+        else:
+            seen[name] = seen.get(name, 0) + 1
+            ids.append((name, seen[name]))
+    return ids
+
+def diff_records(old, new, *path):
+    """Field-level operations turning record old into new"""
+    ops = []
+    for name in old:
+        if name not in new:
+            ops.append({'op': 'remove', 'path': json_pointer(*path, name)})
+        elif _canonical(old[name]) != _canonical(new[name]):
+            ops.append({'op': 'replace', 'path': json_pointer(*path, name), 'value': new[name]})
+    for name in new:
+        if name not in old:
+            ops.append({'op': 'add', 'path': json_pointer(*path, name), 'value': new[name]})
+    return ops
+
+def _is_records(value):
+    return isinstance(value, list) and all(isinstance(entry, dict) for entry in value)
+
+def diff_records_list(key, old, new):
+    """Operations turning one list of records into another, matched by booth identity"""
+    old_ids = booth_ids(old)
+    new_ids = booth_ids(new)
+    new_index = {booth: i for i, booth in enumerate(new_ids)}
+    old_index = {booth: i for i, booth in enumerate(old_ids)}
+    kept_old = [booth for booth in old_ids if booth in new_index]
+    kept_new = [booth for booth in new_ids if booth in old_index]
+    if kept_old != kept_new:
+        return [{'op': 'replace', 'path': json_pointer(key), 'value': new}]
+
+    # Removals from the back keep earlier indexes valid; insertions in ascending order land in place
+    ops = [{'op': 'remove', 'path': json_pointer(key, i)}
+           for i in reversed(range(len(old_ids))) if old_ids[i] not in new_index]
+    ops += [{'op': 'add', 'path': json_pointer(key, i), 'value': new[i]}
+            for i, booth in enumerate(new_ids) if booth not in old_index]
+    for booth in kept_new:
+        before, after = old[old_index[booth]], new[new_index[booth]]
+        if record_hash(before) != record_hash(after):
+            ops += diff_records(before, after, key, new_index[booth])
+    return ops
+
+def diff_datasets(old, new):
+    """Operations turning dataset dict old into new"""
+    ops = [{'op': 'remove', 'path': json_pointer(key)} for key in old if key not in new]
+    for key, value in new.items():
+        if key not in old:
+            ops.append({'op': 'add', 'path': json_pointer(key), 'value': value})
+        elif _is_records(old[key]) and _is_records(value):
+            ops += diff_records_list(key, old[key], value)
+        elif _canonical(old[key]) != _canonical(value):
+            ops.append({'op': 'replace', 'path': json_pointer(key), 'value': value})
+    return ops
+
+def _booth_name(entry, index):
+    name = entry.get('PS_NO_2021') if isinstance(entry, dict) else None
+    return index if name is None else name
+
+def change_log(old, new, ops):
+    """What the operations change, one entry per key or booth, in operation order
+
+    Entries are {'key', 'change'} for whole keys (added / removed / replaced)
+    and {'key', 'booth', 'change', ...} for booths: added, removed, or
+    modified with the names of the fields it touches.
+    """
+    changes = []
+    modified = {}
+    for op in ops:
+        parts = _parse_pointer(op['path'])
+        key = parts[0]
+        if len(parts) == 1:
+            change = {'add': 'added', 'remove': 'removed'}.get(op['op'], 'replaced')
+            changes.append({'key': key, 'change': change})
+        elif len(parts) == 2:
+            i = int(parts[1])
+            entry = op['value'] if op['op'] == 'add' else old[key][i]
+            changes.append({'key': key, 'booth': _booth_name(entry, i),
+                            'change': 'added' if op['op'] == 'add' else 'removed'})
+        else:
+            i = int(parts[1])
+            if (key, i) not in modified:
+                modified[key, i] = {'key': key, 'booth': _booth_name(new[key][i], i),
+                                    'change': 'modified', 'fields': []}
+                changes.append(modified[key, i])
+            modified[key, i]['fields'].append(parts[2])
+    return changes
+
+def summarize(changes):
+    """Counts of the change log's entries by change"""
+    return dict(Counter(change['change'] for change in changes))
+
+def apply_ops(data, ops):
+    """Apply operations to a dataset dict in place; returns it"""
+    for op in ops:
+        *parents, last = _parse_pointer(op['path'])
+        target = data
+        for part in parents:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        if isinstance(target, list):
+            index = int(last)
+            if op['op'] == 'add':
+                target.insert(index, op['value'])
+            elif op['op'] == 'remove':
+                del target[index]
+            else:
+                target[index] = op['value']
+        elif op['op'] == 'remove':
+            del target[last]
+        else:
+            target[last] = op['value']
+    return data
+
+def read_version(path):
+    """(content digest, parsed dataset) of a JSON export"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return content_digest(data), data
+
+def make_delta(base_digest, old, target_digest, new):
+    ops = diff_datasets(old, new)
+    return {'format': FORMAT, 'version': VERSION, 'base': base_digest, 'target': target_digest,
+            'changes': change_log(old, new, ops), 'ops': ops}
+
+def apply_delta(delta, data, base_digest=None):
+    """Apply a delta to the dataset it was made from; checks the base digest when given"""
+    if delta.get('format') != FORMAT or delta.get('version') != VERSION:
+        raise ValueError(f"not a {FORMAT} v{VERSION} file")
+    if base_digest is not None and base_digest != delta['base']:
+        raise ValueError(f"delta applies to {delta['base'][:12]}, not {base_digest[:12]}")
+    return apply_ops(data, delta['ops'])
+
+def load_chain(directory=DATASET_DELTAS):
+    """The chain's index, empty (no head) when nothing was recorded yet"""
+    path = os.path.join(directory, CHAIN_INDEX)
+    if not os.path.exists(path):
+        return {'format': CHAIN_FORMAT, 'head': None, 'deltas': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def record_version(data, directory=DATASET_DELTAS):
+    """Record data as the chain's new head; returns the delta written, None if unchanged
+
+    The first version recorded only becomes the head. Later ones write the
+    delta from the head to data as vNNNN.json.
+    """
+    digest = content_digest(data)
+    chain = load_chain(directory)
+    head = chain['head']
+    if head is not None and head['digest'] == digest:
+        return None
+
+    os.makedirs(directory, exist_ok=True)
+    created = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    delta = None
+    number = 1
+    if head is not None:
+        number = head['version'] + 1
+        delta = make_delta(head['digest'], _load_json(os.path.join(directory, CHAIN_HEAD)), digest, data)
+        name = f'v{number:04d}.json'
+        dump_json(delta, os.path.join(directory, name), compact=True)
+        chain['deltas'].append({'file': name, 'from': head['version'], 'to': number,
+                                'base': head['digest'], 'target': digest, 'created': created,
+                                'summary': summarize(delta['changes'])})
+    # Head before index: an interrupted record leaves the old index, whose head has no delta yet
+    dump_json(data, os.path.join(directory, CHAIN_HEAD), compact=True)
+    chain['head'] = {'version': number, 'digest': digest, 'created': created}
+    dump_json(chain, os.path.join(directory, CHAIN_INDEX), indent=1)
+    return delta
+
+def update_to_head(data, directory=DATASET_DELTAS):
+    """Apply the chain's deltas from data's version to the head, in place; returns how many
+
+    Raises ValueError when data is not a version recorded in the chain.
+    """
+    chain = load_chain(directory)
+    digest = content_digest(data)
+    if chain['head'] is not None and digest == chain['head']['digest']:
+        return 0
+    start = next((i for i, entry in enumerate(chain['deltas']) if entry['base'] == digest), None)
+    if start is None:
+        raise ValueError(f"version {digest[:12]} is not in the chain at {directory}")
+    pending = chain['deltas'][start:]
+    for entry in pending:
+        apply_delta(_load_json(os.path.join(directory, entry['file'])), data, entry['base'])
+    return len(pending)
+
+def print_changes(changes, limit=20):
+    for change in changes[:limit]:
+        booth = f" {change['booth']!r}" if 'booth' in change else ''
+        fields = f": {', '.join(change['fields'])}" if 'fields' in change else ''
+        print(f"  {change['key']}{booth} {change['change']}{fields}")
+    if len(changes) > limit:
+        print(f"  ... and {len(changes) - limit} more")
+
+def main():
+    parser = argparse.ArgumentParser(description='Make, record or apply booth-level deltas between dataset versions')
+    commands = parser.add_subparsers(dest='command', required=True)
+    diff = commands.add_parser('diff', help='write the delta from OLD to NEW')
+    diff.add_argument('old')
+    diff.add_argument('new')
+    diff.add_argument('--output', default='Form20_Localities_Pct.delta.json')
+    apply = commands.add_parser('apply', help='apply DELTA to BASE')
+    apply.add_argument('delta')
+    apply.add_argument('base')
+    apply.add_argument('--output', help='where to write the result (default: overwrite BASE)')
+    record = commands.add_parser('record', help=f'record {DATASET_JSON} as the chain\'s new version')
+    update = commands.add_parser('update', help='bring BASE up to the chain\'s head version')
+    update.add_argument('base')
+    update.add_argument('--output', help='where to write the result (default: overwrite BASE)')
+    log = commands.add_parser('log', help='list the chain\'s versions')
+    for command in (record, update, log):
+        command.add_argument('--dir', default=DATASET_DELTAS, help='delta chain directory (default: %(default)s)')
+    args = parser.parse_args()
+
+    if args.command == 'diff':
+        base_digest, old = read_version(args.old)
+        target_digest, new = read_version(args.new)
+        delta = make_delta(base_digest, old, target_digest, new)
+        dump_json(delta, args.output, compact=True)
+        print(f"{len(delta['ops'])} operations ({summarize(delta['changes']) or 'no changes'}) saved to: {args.output}")
+        print_changes(delta['changes'])
+        return
+
+    if args.command == 'record':
+        _, data = read_version(DATASET_JSON)
+        before = load_chain(args.dir)['head']
+        delta = record_version(data, args.dir)
+        head = load_chain(args.dir)['head']
+        if before is None:
+            print(f"Recorded version 1 ({head['digest'][:12]}) as the base of the chain in {args.dir}")
+        elif delta is None:
+            print(f"Version {head['version']} ({head['digest'][:12]}) is current")
+        else:
+            print(f"Recorded version {head['version']}: {summarize(delta['changes'])}")
+            print_changes(delta['changes'])
+        return
+
+    if args.command == 'log':
+        chain = load_chain(args.dir)
+        if chain['head'] is None:
+            print(f"No versions recorded in {args.dir}")
+            return
+        first = chain['deltas'][0]['from'] if chain['deltas'] else chain['head']['version']
+        print(f"Version {first}: base")
+        for entry in chain['deltas']:
+            print(f"Version {entry['to']} ({entry['created']}): {entry['summary']}")
+        return
+
+    base_digest, data = read_version(args.base)
+    try:
+        if args.command == 'update':
+            applied = update_to_head(data, args.dir)
+            target = load_chain(args.dir)['head']['digest']
+        else:
+            with open(args.delta, 'r', encoding='utf-8') as f:
+                delta = json.load(f)
+            apply_delta(delta, data, base_digest)
+            applied = len(delta['ops'])
+            target = delta['target']
+    except ValueError as e:
+        parser.error(str(e))
+    output = args.output or args.base
+    dump_json(data, output, indent=1)
+    unit = 'deltas' if args.command == 'update' else 'operations'
+    print(f"Applied {applied} {unit} to {args.base}: {output}")
+    if content_digest(data) != target:
+        print(f"  Warning: result {content_digest(data)[:12]} differs from the expected {target[:12]}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Outputs derived from the dataset, written by an explicit export step.
+
+save_dataset() only writes the dataset itself (the Arrow store and the JSON
+export). Everything derived from it is written here, next to the JSON:
+
+  deltas   - Form20_Localities_Pct.deltas/, a new version in the delta
+             chain when the data changed (dataset_delta.py)
+  compact  - Form20_Localities_Pct.compact.json, quantized and
+             dictionary-encoded (compact_format.py)
+  shards   - Form20_Localities_Pct.shards/, the dashboard's PollingStation
+             payload (dashboard_payload.py), one shard per assembly with a
+             manifest for lazy loading (shards.py)
+  rollups  - Form20_Localities_Pct.rollups.json, per-assembly and
+             per-region aggregates (rollups.py)
+
+The scripts that change the dataset (process_missing_assemblies.py,
+add_category_d.py, fix_and_verify.py, impute_coordinates.py) run this step
+after saving. Run it directly to refresh the outputs of the current dataset.
+
+Usage: python dataset_exports.py [--only deltas,compact,shards,rollups]
+"""
+import argparse
+import time
+
+from assembly_index import AssemblyIndex
+from compact_format import export_compact
+from dataset_delta import record_version
+from dataset_store import DATASET_COMPACT, DATASET_DELTAS, DATASET_ROLLUPS, DATASET_SHARDS, load_dataset
+from rollups import save_rollups
+from shards import save_shards
+
+# Export name -> function(data, index) writing it, in the order they run
+EXPORTS = {
+    'deltas': lambda data, index: record_version(data, DATASET_DELTAS),
+    'compact': lambda data, index: export_compact(data, DATASET_COMPACT),
+    'shards': lambda data, index: save_shards(data, DATASET_SHARDS, index),
+    'rollups': lambda data, index: save_rollups(data, DATASET_ROLLUPS, index),
+}
+
+def export_outputs(data, only=None):
+    """Write the derived outputs (all, or the names in only); returns {name: result}
+
+    The rollups' result is the rollups dict (see rollups.py).
+    """
+    index = AssemblyIndex(data)
+    return {name: export(data, index) for name, export in EXPORTS.items() if only is None or name in only}
+
+def main():
+    parser = argparse.ArgumentParser(description='Write the outputs derived from the dataset')
+    parser.add_argument('--only', help=f"comma-separated exports to write (default: all of {', '.join(EXPORTS)})")
+    args = parser.parse_args()
+    only = None
+    if args.only:
+        only = [name.strip() for name in args.only.split(',') if name.strip()]
+        unknown = [name for name in only if name not in EXPORTS]
+        if unknown:
+            parser.error(f"unknown exports {unknown} (known: {', '.join(EXPORTS)})")
+
+    data = load_dataset()
+    for name in EXPORTS:
+        if only is None or name in only:
+            started = time.perf_counter()
+            export_outputs(data, [name])
+            print(f"  {name:<9} {time.perf_counter() - started:6.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Columnar store for the Form20_Localities_Pct dataset.
+
+The pipeline's primary copy of the dataset is an Arrow IPC file with one row
+per booth, keyed by dataset key (e.g. 'AC_14_FINAL') and booth index. The
+file is memory-mapped on load, so reading a few columns touches only those
+columns' pages, which is what the column-projecting readers (bulk_validation.py)
+use. Form20_Localities_Pct.json, which the Next.js app imports, is exported
+from it on every save, streamed and atomically replaced (see json_writer.py).
+Reading the whole dataset is faster from the JSON than from the store, so
+load_dataset() reads the JSON.
+
+The outputs derived from the dataset (deltas, compact form, dashboard
+payload shards, rollups) are not written on save; see dataset_exports.py.
+
+Storage layout:
+  _key    - top-level JSON key the row belongs to (dictionary-encoded)
+  _index  - position of the row in that key's list
+  _fields - the row's field names in JSON order (dictionary-encoded), so
+            absent fields and explicit nulls both survive a round trip
+  <field> - one column per field: int64, float64 or string when every value
+            has that type, float64 when ints and floats are mixed, otherwise
+            the JSON text of each value
+  _int:<field>
+          - for a field mixing ints and floats, whether each value is an int,
+            so 0 comes back as 0 and not 0.0
+
+pyarrow is optional: without it save_dataset() writes only the JSON, and
+readers that would project columns from the store use the loaded dataset.
+"""
+import json
+import os
+
+from json_writer import dump_json
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None
+    pc = None
+
+DATASET_JSON = 'Form20_Localities_Pct.json'
+DATASET_STORE = 'Form20_Localities_Pct.arrow'
+DATASET_ROLLUPS = 'Form20_Localities_Pct.rollups.json'
+DATASET_SHARDS = 'Form20_Localities_Pct.shards'
+DATASET_COMPACT = 'Form20_Localities_Pct.compact.json'
+DATASET_DELTAS = 'Form20_Localities_Pct.deltas'
+
+META_COLUMNS = ['_key', '_index', '_fields']
+FIELD_SEPARATOR = '\x1f'
+INT_FLAGS_PREFIX = '_int:'
+
+def _column_type(values):
+    """Arrow type and encoding for one field
+
+    The encoding is 'json' for mixed-type columns and 'number' for columns
+    mixing ints and floats, which keep a column of int flags.
+    """
+    kinds = {type(v) for v in values if v is not None}
+    if kinds <= {int}:
+        return pa.int64(), None
+    if kinds <= {float}:
+        return pa.float64(), None
+    if kinds == {int, float}:
+        return pa.float64(), 'number'
+    if kinds == {str}:
+        return pa.string(), None
+    return pa.string(), 'json'
+
+def to_table(data):
+    """Flatten the dataset dict into one Arrow table with a row per booth"""
+    rows = []
+    keys = []
+    indexes = []
+    for key, entries in data.items():
+        for i, entry in enumerate(entries):
+            rows.append(entry)
+            keys.append(key)
+            indexes.append(i)
+
+    field_names = []
+    seen = set()
+    for entry in rows:
+        for field in entry:
+            if field not in seen:
+                seen.add(field)
+                field_names.append(field)
+
+    arrays = [
+        pa.array(keys, pa.string()).dictionary_encode(),
+        pa.array(indexes, pa.int32()),
+        pa.array([FIELD_SEPARATOR.join(entry) for entry in rows], pa.string()).dictionary_encode(),
+    ]
+    fields = [
+        pa.field('_key', arrays[0].type),
+        pa.field('_index', pa.int32()),
+        pa.field('_fields', arrays[2].type),
+    ]
+    for name in field_names:
+        values = [entry.get(name) for entry in rows]
+        arrow_type, encoding = _column_type(values)
+        if encoding == 'json':
+            values = [None if v is None else json.dumps(v) for v in values]
+        arrays.append(pa.array(values, arrow_type))
+        fields.append(pa.field(name, arrow_type, metadata={'encoding': encoding} if encoding else None))
+        if encoding == 'number':
+            arrays.append(pa.array([type(v) is int for v in values], pa.bool_()))
+            fields.append(pa.field(INT_FLAGS_PREFIX + name, pa.bool_()))
+
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields, metadata={'keys': json.dumps(list(data))}))
+
+def from_table(table):
+    """Rebuild the dataset dict (JSON shape) from a store table"""
+    decoders = {}
+    for field in table.schema:
+        if field.metadata and field.metadata.get(b'encoding') == b'json':
+            decoders[field.name] = json.loads
+
+    columns = {name: table.column(name).to_pylist() for name in table.column_names}
+    for name, flags in list(columns.items()):
+        if name.startswith(INT_FLAGS_PREFIX):
+            values = columns[name[len(INT_FLAGS_PREFIX):]]
+            for row, is_int in enumerate(flags):
+                if is_int:
+                    values[row] = int(values[row])
+    metadata = table.schema.metadata or {}
+    data = {key: [] for key in json.loads(metadata.get(b'keys', b'[]'))}
+    for row, (key, field_list) in enumerate(zip(columns['_key'], columns['_fields'])):
+        entry = {}
+        for name in field_list.split(FIELD_SEPARATOR) if field_list else []:
+            value = columns[name][row] if name in columns else None
+            if value is not None and name in decoders:
+                value = decoders[name](value)
+            entry[name] = value
+        data.setdefault(key, []).append(entry)
+    return data
+
+def write_store(data, path=DATASET_STORE):
+    """Write the dataset to the Arrow IPC store (uncompressed, so it can be memory-mapped)"""
+    table = to_table(data)
+    tmp_path = path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+def open_store(path=DATASET_STORE, columns=None, keys=None):
+    """Memory-map the store and return a table of the requested columns and keys
+
+    columns are field names; the _key/_index/_fields columns, and the int
+    flags of the selected columns, are always included. keys restricts rows
+    to those top-level keys (e.g. ['AC_3_FINAL']).
+    """
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        selected = [c for c in columns if c in table.column_names and c not in META_COLUMNS]
+        flags = [INT_FLAGS_PREFIX + c for c in selected if INT_FLAGS_PREFIX + c in table.column_names]
+        table = table.select(META_COLUMNS + selected + flags)
+    if keys is not None:
+        table = table.filter(pc.is_in(table.column('_key').cast(pa.string()), value_set=pa.array(list(keys), pa.string())))
+    return table
+
+def store_is_current(store_path=DATASET_STORE, json_path=DATASET_JSON):
+    """True when the store exists and is at least as new as the JSON export"""
+    if pa is None or not os.path.exists(store_path):
+        return False
+    if not os.path.exists(json_path):
+        return True
+    return os.path.getmtime(store_path) >= os.path.getmtime(json_path)
+
+def export_json(data, path=DATASET_JSON, compact=False):
+    """Write the JSON export the dashboard imports (streamed, atomically replaced)"""
+    dump_json(data, path, indent=1, compact=compact)
+
+def load_dataset(store_path=DATASET_STORE, json_path=DATASET_JSON):
+    """Load the full dataset dict from the JSON export, or from the store when there is no JSON
+
+    For a few columns, read them from the store with open_store() instead.
+    """
+    if not os.path.exists(json_path) and pa is not None and os.path.exists(store_path):
+        return from_table(open_store(store_path))
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_dataset(data, store_path=DATASET_STORE, json_path=DATASET_JSON, compact=False):
+    """Save the dataset to the store and its JSON export
+
+    Derived outputs are written separately by dataset_exports.export_outputs().
+    """
+    if pa is not None:
+        write_store(data, store_path)
+    export_json(data, json_path, compact)
+    if pa is not None:
+        # Keep the store at least as new as its export
+        os.utime(store_path)
@@ -0,0 +1,338 @@
+"""
+Load the dataset into Firestore in batched, resumable commits.
+
+An alternative to the TypeScript seeders (seed-firestore.ts,
+seed-hierarchical.ts, seed-proper-firestore.ts) for the full dataset: they
+write one document per awaited call, or commit their batches one after the
+other, and have to start over after any failure. Documents, with the fields
+those seeders wrote:
+
+  assemblies/{ac}                          - id, name, number, sheetName,
+                                             updatedAt (merged, so fields
+                                             added in the admin pages are kept)
+  pollingStations/{ac}-{n}                 - one per booth, n counting from 1
+                                             in dataset order (layout 'flat',
+                                             read by the admin editors); both
+                                             strongestParty and top_party, and
+                                             the booth as original_data
+  assemblies/{ac}/polling_stations/{ac}-{n} - the same documents (layout
+                                             'hierarchical', read by
+                                             verify-full-db.ts)
+
+Writes are grouped into batches of at most 500 operations (Firestore's
+limit per commit) and committed by a bounded pool of threads. A failed
+commit is retried with exponential backoff; each committed batch is
+recorded in a checkpoint file, so rerunning after a failure or an
+interruption skips the batches already written (matched by a hash of their
+content and target project). The checkpoint is removed once every batch is
+committed. updatedAt is the modification time of the dataset file, not
+the time of the run, so rerunning on the same data finds the same batches.
+
+Against the local emulator (firebase.json, port 8080) no credentials are
+needed:
+
+  FIRESTORE_EMULATOR_HOST=localhost:8080 python firestore_loader.py --project demo-datadash
+
+Otherwise credentials come from FIREBASE_PROJECT_ID, FIREBASE_CLIENT_EMAIL and
+FIREBASE_PRIVATE_KEY, as for src/lib/firebase/admin.ts (read from .env when
+python-dotenv is installed), or from Application Default Credentials.
+Requires google-cloud-firestore.
+
+Usage: python firestore_loader.py [--layout flat|hierarchical|both] [-j JOBS] [--dry-run]
+"""
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+import random
+import time
+
+from assembly_index import AssemblyIndex
+from dataset_store import DATASET_JSON, load_dataset
+from json_writer import dump_json
+
+try:
+    from google.api_core import exceptions as api_exceptions
+    from google.cloud import firestore
+except ImportError:  # pragma: no cover - only needed to actually load
+    api_exceptions = None
+    firestore = None
+
+try:
+    from dotenv import load_dotenv
+except ImportError:  # pragma: no cover - python-dotenv is optional
+    load_dotenv = None
+
+CHECKPOINT = 'Form20_Localities_Pct.firestore-checkpoint.json'
+
+MAX_BATCH_OPS = 500  # Firestore's limit on writes per commit
+DEFAULT_JOBS = 8
+DEFAULT_RETRIES = 6
+BACKOFF_BASE = 0.5  # seconds; doubled on every retry
+BACKOFF_MAX = 30.0
+
+LAYOUTS = ('flat', 'hierarchical', 'both')
+
+def _score(value):
+    return value or 0
+
+def station_document(ac_id, ps_no, booth, ac_name):
+    """One booth as the seeders' pollingStations document
+
+    ac_name is the assembly name, as seed-proper-firestore.ts wrote it
+    (seed-firestore.ts wrote the dataset key).
+    """
+    doc_id = f'{ac_id}-{ps_no}'
+    return {
+        'id': doc_id,
+        'ac_id': ac_id,
+        'ac_name': ac_name,
+        'ps_no': str(ps_no),
+        'ps_name': booth.get('PS_NO_2021') or f'Station {ps_no}',
+        'locality': booth.get('LOCALITY_EXTRACTED') or '',
+        'latitude': _score(booth.get('Latitude')),
+        'longitude': _score(booth.get('Longitude')),
+
+        'category': booth.get('TOP_SCORE_CATEGORY') or '',
+        'strongestParty': booth.get('TOP_SCORE_PARTY') or '',
+        'top_party': booth.get('TOP_SCORE_PARTY') or '',
+        'nrc_score': _score(booth.get('NRC_SCORE')),
+        'bjp_score': _score(booth.get('BJP_SCORE')),
+        'dmk_score': _score(booth.get('DMK_SCORE')),
+        'aiadmk_score': _score(booth.get('AIADMK_SCORE')),
+        'pmk_score': _score(booth.get('PMK_SCORE')),
+        'ind_score': _score(booth.get('IND_SCORE')),
+
+        'election2021': {
+            'year': 2021,
+            'total_votes': _score(booth.get('POLLED_2021')),
+            'voters': _score(booth.get('VOTERS_2021')),
+            'turnout': _score(booth.get('POLLED_%')),
+            'candidates': {party: _score(booth.get(f'{party}_2021_pct'))
+                           for party in ('BJP', 'DMK', 'NRC', 'OTHERS', 'NOTA')},
+        },
+        'election2016': {
+            'year': 2016,
+            'total_votes': _score(booth.get('POLLED_2016')),
+            'candidates': {party: _score(booth.get(f'{party}_2016_pct'))
+                           for party in ('NRC', 'DMK', 'AIADMK', 'OTHERS', 'NOTA')},
+        },
+        'election2011': {
+            'year': 2011,
+            'total_votes': _score(booth.get('POLLED_2011')),
+            'candidates': {party: _score(booth.get(f'{party}_2011_pct'))
+                           for party in ('NRC', 'PMK', 'IND', 'OTHERS')},
+        },
+
+        'original_data': dict(booth),
+    }
+
+def build_writes(data, layout='flat', index=None, updated_at=None):
+    """(document path, fields, merge) for every document to write, in dataset order
+
+    updated_at (an ISO timestamp) is written as the assemblies' updatedAt,
+    which is left out when it is None.
+    """
+    index = index or AssemblyIndex(data)
+    writes = []
+    for ref in index:
+        assembly = {
+            'id': ref.code,
+            'name': ref.name,
+            'number': ref.number,
+            'sheetName': ref.key,
+        }
+        if updated_at is not None:
+            assembly['updatedAt'] = updated_at
+        writes.append((f'assemblies/{ref.code}', assembly, True))
+        for i, booth in enumerate(ref.booths):
+            doc = station_document(ref.code, i + 1, booth, ref.name)
+            if layout in ('flat', 'both'):
+                writes.append((f"pollingStations/{doc['id']}", doc, False))
+            if layout in ('hierarchical', 'both'):
+                writes.append((f"assemblies/{ref.code}/polling_stations/{doc['id']}", doc, False))
+    return writes
+
+def file_timestamp(path):
+    """Modification time of path as an ISO timestamp like JavaScript's toISOString()"""
+    modified = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+    return modified.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+def batch_digest(project, writes):
+    """Hash identifying a batch's content and target project in the checkpoint"""
+    content = json.dumps([project, writes], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def make_batches(writes, size=MAX_BATCH_OPS):
+    if not 0 < size <= MAX_BATCH_OPS:
+        raise ValueError(f'batch size must be between 1 and {MAX_BATCH_OPS}')
+    return [writes[i:i + size] for i in range(0, len(writes), size)]
+
+def load_checkpoint(path):
+    """Digests of the batches already committed"""
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, 'r', encoding='utf-8') as f:
+        return set(json.load(f).get('committed', []))
+
+def save_checkpoint(path, committed):
+    if path:
+        dump_json({'committed': sorted(committed)}, path, compact=True)
+
+def _retryable():
+    """Exceptions worth retrying: throttling, timeouts and transient server errors"""
+    errors = (ConnectionError, TimeoutError)
+    if api_exceptions is not None:
+        errors += (api_exceptions.ServiceUnavailable, api_exceptions.DeadlineExceeded,
+                   api_exceptions.Aborted, api_exceptions.ResourceExhausted,
+                   api_exceptions.InternalServerError, api_exceptions.Unknown)
+    return errors
+
+def commit_batch(client, writes, retries=DEFAULT_RETRIES, sleep=time.sleep):
+    """Commit one batch, retrying transient failures with exponential backoff and jitter"""
+    retryable = _retryable()
+    for attempt in range(retries + 1):
+        batch = client.batch()
+        for path, fields, merge in writes:
+            batch.set(client.document(path), fields, merge=merge)
+        try:
+            batch.commit()
+            return attempt
+        except retryable:
+            if attempt == retries:
+                raise
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+            sleep(delay * random.uniform(0.5, 1.0))
+
+def load_batches(client, project, batches, checkpoint=CHECKPOINT, jobs=DEFAULT_JOBS,
+                 retries=DEFAULT_RETRIES):
+    """Commit the batches not yet in the checkpoint, at most jobs at a time
+
+    Returns (batches committed now, batches skipped, retries needed). The
+    checkpoint is updated after every commit and removed when all batches
+    are in; on failure the exception propagates with the checkpoint intact.
+    """
+    committed = load_checkpoint(checkpoint)
+    digests = [batch_digest(project, batch) for batch in batches]
+    pending = [(digest, batch) for digest, batch in zip(digests, batches) if digest not in committed]
+    skipped = len(batches) - len(pending)
+    done = 0
+    retried = 0
+
+    pool = ThreadPoolExecutor(max_workers=max(1, jobs))
+    running = {}
+    queue = iter(pending)
+    try:
+        while True:
+            # Keep at most jobs commits in flight so a failure stops the run early
+            for digest, batch in queue:
+                running[pool.submit(commit_batch, client, batch, retries)] = digest
+                if len(running) >= jobs:
+                    break
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                digest = running.pop(future)
+                retried += future.result()
+                committed.add(digest)
+                done += 1
+            save_checkpoint(checkpoint, committed)
+            print(f"  {skipped + done}/{len(batches)} batches committed", end='\r', flush=True)
+    finally:
+        for future in running:
+            future.cancel()
+        pool.shutdown(wait=True)
+        # Commits that finished while shutting down are still worth recording
+        late = [running[f] for f in running if f.done() and not f.cancelled() and f.exception() is None]
+        if late:
+            committed.update(late)
+            done += len(late)
+            save_checkpoint(checkpoint, committed)
+    print()
+
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return done, skipped, retried
+
+def _credentials():
+    """Service account credentials from the FIREBASE_* variables admin.ts uses, None if unset"""
+    email = os.environ.get('FIREBASE_CLIENT_EMAIL')
+    key = os.environ.get('FIREBASE_PRIVATE_KEY')
+    if not email or not key:
+        return None
+    from google.oauth2 import service_account
+    return service_account.Credentials.from_service_account_info({
+        'project_id': os.environ.get('FIREBASE_PROJECT_ID'),
+        'client_email': email,
+        'private_key': key.replace('\\n', '\n'),
+        'token_uri': 'https://oauth2.googleapis.com/token',
+    })
+
+def make_client(project=None):
+    """Firestore client for the emulator (FIRESTORE_EMULATOR_HOST) or the FIREBASE_* project"""
+    if firestore is None:
+        raise RuntimeError('google-cloud-firestore is not installed (pip install google-cloud-firestore)')
+    project = project or os.environ.get('FIREBASE_PROJECT_ID')
+    if os.environ.get('FIRESTORE_EMULATOR_HOST'):
+        return firestore.Client(project=project or 'demo-datadash')
+    return firestore.Client(project=project, credentials=_credentials())
+
+def main():
+    parser = argparse.ArgumentParser(description='Load the dataset into Firestore in batched, resumable commits')
+    parser.add_argument('--input', help=f'dataset JSON to load (default: the pipeline dataset, {DATASET_JSON})')
+    parser.add_argument('--layout', choices=LAYOUTS, default='flat',
+                        help='pollingStations collection, per-assembly subcollections or both (default: %(default)s)')
+    parser.add_argument('--project', help='Firestore project (default: FIREBASE_PROJECT_ID)')
+    parser.add_argument('-j', '--jobs', type=int, default=DEFAULT_JOBS,
+                        help='commits in flight at once (default: %(default)s)')
+    parser.add_argument('--batch-size', type=int, default=MAX_BATCH_OPS,
+                        help='writes per commit, at most 500 (default: %(default)s)')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help='retries per batch before giving up (default: %(default)s)')
+    parser.add_argument('--checkpoint', default=CHECKPOINT, help='progress file for resuming (default: %(default)s)')
+    parser.add_argument('--fresh', action='store_true', help='ignore an existing checkpoint and write everything')
+    parser.add_argument('--dry-run', action='store_true', help='count documents and batches without writing')
+    args = parser.parse_args()
+    if args.jobs < 1 or args.retries < 0:
+        parser.error('--jobs must be at least 1 and --retries at least 0')
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        data = load_dataset()
+    source = args.input or DATASET_JSON
+    updated_at = file_timestamp(source) if os.path.exists(source) else None
+    try:
+        batches = make_batches(build_writes(data, args.layout, updated_at=updated_at), args.batch_size)
+    except ValueError as e:
+        parser.error(str(e))
+    writes = sum(len(batch) for batch in batches)
+    print(f"{writes:,} documents in {len(batches)} batches ({args.layout} layout)")
+    if args.dry_run:
+        return
+
+    if load_dotenv is not None:
+        load_dotenv()
+    client = make_client(args.project)
+    if args.fresh and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    target = os.environ.get('FIRESTORE_EMULATOR_HOST') or 'Firestore'
+    print(f"Loading into project {client.project} on {target} with {args.jobs} worker(s)...")
+    started = time.perf_counter()
+    try:
+        done, skipped, retried = load_batches(client, client.project, batches, args.checkpoint,
+                                              args.jobs, args.retries)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; rerun to resume from {args.checkpoint}")
+        raise SystemExit(130)
+    except Exception as e:
+        print(f"\nLoad failed: {e}\nCommitted batches are recorded in {args.checkpoint}; rerun to resume")
+        raise SystemExit(1)
+    elapsed = time.perf_counter() - started
+    print(f"Committed {done} batches in {elapsed:.1f}s ({skipped} already loaded, {retried} retries)")
+
+if __name__ == '__main__':
+    main()
@@ -1,46 +1,26 @@
 """
 Fix null coordinates and update coordinate bounds
 """
-import json
+from assembly_index import load_index
+from dataset_exports import export_outputs
+from dataset_store import save_dataset
+from impute_coordinates import impute_coordinates, print_imputation
 
-# Load JSON
-with open('Form20_Localities_Pct.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+# Load dataset
+data, index = load_index()
 
 print("Fixing data issues...")
 
-# Fix 1: Null coordinates in AC_3
-# Get average coordinates from neighboring entries
-ac3_data = data.get('AC_3_FINAL', [])
-if len(ac3_data) > 32:
-    entry = ac3_data[32]
-    if entry.get('Latitude') is None or entry.get('Longitude') is None:
-        print(f"\nFound null coordinates at AC_3[32]: {entry.get('PS_NO_2021', 'Unknown')}")
-        
-        # Average from neighboring entries
-        neighbors = []
-        for i in [30, 31, 33]:
-            if 0 <= i < len(ac3_data) and ac3_data[i].get('Latitude'):
-                neighbors.append((ac3_data[i]['Latitude'], ac3_data[i]['Longitude']))
-        
-        if neighbors:
-            avg_lat = sum(n[0] for n in neighbors) / len(neighbors)
-            avg_lng = sum(n[1] for n in neighbors) / len(neighbors)
-            
-            entry['Latitude'] = avg_lat
-            entry['Longitude'] = avg_lng
-            print(f"  Fixed: Set to ({avg_lat:.6f}, {avg_lng:.6f})")
-        else:
-            # Default Ossudu coordinates
-            entry['Latitude'] = 11.9850
-            entry['Longitude'] = 79.7550
-            print(f"  Fixed: Set to default Ossudu coordinates")
+# Fix 1: Null and placeholder coordinates, imputed from nearby booths
+fixes, unresolved = impute_coordinates(data, index=index)
+print()
+print_imputation(fixes, unresolved)
 
-# Save updated JSON
-with open('Form20_Localities_Pct.json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=1)
+# Save updated dataset and its derived outputs (including the rollups)
+save_dataset(data)
+rollups = export_outputs(data)['rollups']
 
-print("\nJSON updated successfully!")
+print("\nDataset updated successfully!")
 
 # Verify
 print("\n" + "="*60)
@@ -48,9 +28,8 @@ print("FINAL VERIFICATION")
 print("="*60)
 
 # Count assemblies
-ac_keys = [k for k in data.keys() if k.startswith('AC_') and '_FINAL' in k]
-ac_nums = sorted([int(k.replace('AC_', '').replace('_FINAL', '')) for k in ac_keys])
-print(f"\nTotal assemblies: {len(ac_keys)}")
+ac_nums = index.numbers()
+print(f"\nTotal assemblies: {len(index)}")
 print(f"Assembly numbers: {ac_nums}")
 
 expected = set(range(1, 31))
@@ -59,28 +38,25 @@ missing = sorted(expected - found)
 print(f"Missing assemblies: {missing if missing else 'None - ALL 30 PRESENT!'}")
 
 # Count total booths
-total_booths = sum(len(data[k]) for k in ac_keys)
+total_booths = index.total_booths
 print(f"\nTotal polling stations: {total_booths}")
 
 # Check for null coordinates
 null_coords = []
-for key in ac_keys:
-    for i, entry in enumerate(data[key]):
+for ref in index:
+    for i, entry in enumerate(ref.booths):
         if entry.get('Latitude') is None or entry.get('Longitude') is None:
-            null_coords.append(f"{key}[{i}]")
+            null_coords.append(f"{ref.key}[{i}]")
 
 print(f"Entries with null coordinates: {len(null_coords)}")
 if null_coords:
     print(f"  {null_coords}")
 
-# Category distribution
-cat_a = cat_b = cat_c = 0
-for key in ac_keys:
-    for entry in data[key]:
-        cat = entry.get('TOP_SCORE_CATEGORY', 'C')
-        if cat == 'A': cat_a += 1
-        elif cat == 'B': cat_b += 1
-        else: cat_c += 1
+# Category distribution (booths without A/B count as C)
+categories = rollups['total']['categories']
+cat_a = categories.get('A', 0)
+cat_b = categories.get('B', 0)
+cat_c = total_booths - cat_a - cat_b
 
 print(f"\nCategory Distribution:")
 print(f"  Category A (>50%): {cat_a} booths ({cat_a/total_booths*100:.1f}%)")
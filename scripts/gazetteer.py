@@ -0,0 +1,214 @@
+"""
+Locality resolution for polling station names.
+
+extract_locality strips the school/building boilerplate from a station name
+with precompiled patterns, applied one after another (earlier removals can
+create or break later matches, so they are not merged into one alternation),
+and caches results by the upper-cased name, so repeated names across years
+and re-runs are resolved once.
+
+Gazetteer maps a locality to the coordinates of the first known place name
+(in gazetteer order) that either occurs inside it or contains it. Both
+directions are answered with tries instead of scanning every name:
+  - an Aho-Corasick automaton finds every name occurring in the locality in
+    one pass over the locality's characters;
+  - a suffix trie of the names finds every name containing the locality by
+    walking the locality once from the root.
+Lookup cost depends on the locality's length, not on the number of names.
+
+Spelling variants ('ORLEAMPETH' / 'ORLEANPET', transliterations) are matched
+by Gazetteer.fuzzy: a character-trigram inverted index gives, for every name
+sharing a trigram with a word or run of words in the locality, the number of
+shared trigrams, from which the Dice similarity is ranked. resolve() uses an
+exact match when there is one and otherwise the best fuzzy match.
+"""
+from collections import defaultdict, deque
+from functools import lru_cache
+import re
+
+# Building and suffix boilerplate removed from station names, in this order
+REMOVE_PATTERNS = tuple(re.compile(pattern) for pattern in [
+    r'GOVT\.?\s*',
+    r'GOVERNMENT\s*',
+    r'PRIMARY\s*SCHOOL\s*',
+    r'HIGH\s*SCHOOL\s*',
+    r'HIGHER\s*SECONDARY\s*SCHOOL\s*',
+    r'MIDDLE\s*SCHOOL\s*',
+    r'COMMUNITY\s*HALL\s*',
+    r'\(NORTH\)',
+    r'\(SOUTH\)',
+    r'\(EAST\)',
+    r'\(WEST\)',
+    r'PUDUCHERRY-?\d*',
+    r'YANAM-?\d*',
+    r'-\d+$',
+])
+
+WORD_PATTERN = re.compile(r'[A-Z0-9]+')
+
+# Lowest trigram similarity resolve() accepts as a match
+FUZZY_MIN_SCORE = 0.55
+
+@lru_cache(maxsize=65536)
+def _extract(name):
+    for pattern in REMOVE_PATTERNS:
+        name = pattern.sub('', name)
+    words = name.split()
+    if len(words) >= 2:
+        return ' '.join(words[-2:]).strip()
+    return name.strip() if name.strip() else 'Unknown'
+
+def trigrams(text):
+    """Character trigrams of text, padded so word starts and ends count"""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def extract_locality(ps_name):
+    """Extract locality from polling station name"""
+    if not ps_name:
+        return 'Unknown'
+    return _extract(str(ps_name).upper())
+
+class Gazetteer:
+    """Place names with coordinates, matched against localities by substring
+
+    entries is an ordered {NAME: {'lat': .., 'lng': ..}} mapping of
+    upper-case names; when several names match a locality the earliest wins.
+    """
+
+    def __init__(self, entries):
+        self.names = list(entries)
+        self.coords = [(entries[name]['lat'], entries[name]['lng']) for name in self.names]
+
+        # Aho-Corasick automaton: goto edges, failure links and, per state,
+        # the earliest name ending there or at any state on its failure chain
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [None]
+        for rank, name in enumerate(self.names):
+            state = 0
+            for ch in name:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(None)
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            if self.out[state] is None:
+                self.out[state] = rank
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                inherited = self.out[self.fail[child]]
+                if inherited is not None and (self.out[child] is None or inherited < self.out[child]):
+                    self.out[child] = inherited
+
+        # Suffix trie: each node holds the earliest name containing its path
+        self.suffixes = [{}]
+        self.suffix_min = [0 if self.names else None]
+        for rank, name in enumerate(self.names):
+            for start in range(len(name)):
+                node = 0
+                for ch in name[start:]:
+                    child = self.suffixes[node].get(ch)
+                    if child is None:
+                        self.suffixes.append({})
+                        self.suffix_min.append(rank)
+                        child = self.suffixes[node][ch] = len(self.suffixes) - 1
+                    node = child
+
+        # Trigram inverted index: trigram -> ranks of the names containing it
+        self.trigram_index = defaultdict(list)
+        self.trigram_counts = []
+        self.max_words = 1
+        for rank, name in enumerate(self.names):
+            grams = trigrams(name)
+            self.trigram_counts.append(len(grams))
+            for gram in grams:
+                self.trigram_index[gram].append(rank)
+            self.max_words = max(self.max_words, len(WORD_PATTERN.findall(name)))
+
+    def _first_contained(self, text):
+        """Earliest name occurring in text"""
+        best = None
+        state = 0
+        for ch in text:
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            rank = self.out[state]
+            if rank is not None and (best is None or rank < best):
+                best = rank
+                if best == 0:
+                    break
+        return best
+
+    def _first_containing(self, text):
+        """Earliest name containing text"""
+        node = 0
+        for ch in text:
+            node = self.suffixes[node].get(ch)
+            if node is None:
+                return None
+        return self.suffix_min[node]
+
+    def _rank(self, locality):
+        text = locality.upper()
+        ranks = [r for r in (self._first_contained(text), self._first_containing(text)) if r is not None]
+        return min(ranks) if ranks else None
+
+    def match(self, locality):
+        """Name of the earliest entry matching the locality, or None"""
+        rank = self._rank(locality)
+        return None if rank is None else self.names[rank]
+
+    def lookup(self, locality):
+        """(lat, lng) of the earliest entry matching the locality, or None"""
+        rank = self._rank(locality)
+        return None if rank is None else self.coords[rank]
+
+    def fuzzy(self, locality, limit=5, min_score=0.0):
+        """Up to limit (name, score) pairs most similar to the locality, best first
+
+        Scores are Dice coefficients over trigrams (1.0 = identical).
+        """
+        return [(self.names[rank], score) for rank, score in self._fuzzy_ranks(locality, limit, min_score)]
+
+    def _fuzzy_ranks(self, locality, limit, min_score):
+        """(rank, score) pairs for fuzzy()
+
+        The locality is compared word by word and by runs of up to as many
+        words as the longest name, so surrounding words do not dilute the
+        score.
+        """
+        words = WORD_PATTERN.findall(locality.upper())
+        best = {}
+        for size in range(1, min(self.max_words, len(words)) + 1):
+            for start in range(len(words) - size + 1):
+                grams = trigrams(' '.join(words[start:start + size]))
+                shared = defaultdict(int)
+                for gram in grams:
+                    for rank in self.trigram_index.get(gram, ()):
+                        shared[rank] += 1
+                for rank, count in shared.items():
+                    score = 2 * count / (len(grams) + self.trigram_counts[rank])
+                    if score > best.get(rank, 0.0):
+                        best[rank] = score
+        ranked = sorted((item for item in best.items() if item[1] >= min_score), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    def resolve(self, locality, min_score=FUZZY_MIN_SCORE):
+        """(lat, lng) of the exact match, else of the best fuzzy match, else None"""
+        rank = self._rank(locality)
+        if rank is None:
+            candidates = self._fuzzy_ranks(locality, 1, min_score)
+            if not candidates:
+                return None
+            rank = candidates[0][0]
+        return self.coords[rank]
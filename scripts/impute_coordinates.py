@@ -0,0 +1,249 @@
+"""
+Fill missing or placeholder booth coordinates from nearby geocoded booths.
+
+A booth needs imputation when its Latitude/Longitude is null, not a number
+(e.g. 'NEW_BOOTH'), or one of the placeholder positions written by
+process_missing_assemblies.get_coordinates (a gazetteer or assembly default
+point plus ps_num * (0.0003, 0.0002)). Booths placed by an earlier run are
+imputed again too, so a run with more geocoded booths can improve them.
+
+All geocoded booths go into one KD-tree. Each bad booth gets an anchor
+point: its placeholder's base point, or else the mean of the nearest
+geocoded booths before and after it in the same assembly (booth numbers
+follow the ground). It is then set to the mean of the first of these
+sources that has at least min_neighbours geocoded booths and lands inside
+the assembly's region (the CoordinateRule bounds):
+
+  locality           the k booths nearest the anchor in the same assembly
+                     and locality
+  assembly           the k booths nearest the anchor in the same assembly
+  locality anchor    the booths of any assembly in the same region whose
+                     locality is named like the booth's locality (or one of
+                     its comma-separated parts), if they lie within
+                     LOCALITY_RADIUS of their mean (generic names such as
+                     'STREET' are spread across a region and do not qualify)
+  nearby assemblies  the k booths of the same region nearest the anchor (or
+                     the assembly's default point), within
+                     MAX_ANCHOR_DISTANCE of it
+
+The last two are all that assemblies with only placeholder coordinates can
+use. Their point is shared by many booths, so each booth is moved off it by
+FALLBACK_STEP times its position relative to the middle of the assembly,
+keeping booths apart. Booths none of the sources place are left unchanged
+and reported.
+
+Every imputed booth records the source that placed it in COORD_SOURCE; the
+field is absent on surveyed booths.
+
+Run directly to impute and save the dataset, or call impute_coordinates().
+"""
+import math
+
+from assembly_index import AssemblyIndex, load_index
+from data_analysis import CoordinateRule, region_polygons
+from dataset_exports import export_outputs
+from dataset_store import save_dataset
+from process_missing_assemblies import ASSEMBLY_DEFAULTS, REGION_COORDS
+from spatial_index import KDTree, point_in_polygon
+
+# Per-booth offset used by get_coordinates placeholders
+PLACEHOLDER_STEP = (0.0003, 0.0002)
+MAX_PLACEHOLDER_BOOTH = 1000
+# Placeholders are sums of floats; compare them with a tolerance
+PLACEHOLDER_TOLERANCE = 1e-7
+
+# Fewest geocoded booths an imputed position may be averaged from
+MIN_NEIGHBOURS = 2
+# Largest spread (degrees) of a locality usable as an anchor for other assemblies
+LOCALITY_RADIUS = 0.01
+# Largest distance (degrees) from the anchor to booths of nearby assemblies
+MAX_ANCHOR_DISTANCE = 0.02
+# Per-booth offset from a point shared across an assembly (locality anchor, nearby assemblies)
+FALLBACK_STEP = (0.0002, 0.0002)
+
+# Booth field naming the source of an imputed position
+COORD_SOURCE = 'COORD_SOURCE'
+
+def placeholder_bases():
+    """Base points get_coordinates offsets placeholder positions from"""
+    bases = {(c['lat'], c['lng']) for c in REGION_COORDS.values()}
+    bases.update((c['lat'], c['lng']) for c in ASSEMBLY_DEFAULTS.values())
+    return bases
+
+def placeholder_base(lat, lng, bases):
+    """The base point if (lat, lng) is a get_coordinates placeholder, else None"""
+    for base_lat, base_lng in bases:
+        ps_num = round((lat - base_lat) / PLACEHOLDER_STEP[0])
+        if 0 <= ps_num <= MAX_PLACEHOLDER_BOOTH \
+                and abs(base_lat + (ps_num * PLACEHOLDER_STEP[0]) - lat) <= PLACEHOLDER_TOLERANCE \
+                and abs(base_lng + (ps_num * PLACEHOLDER_STEP[1]) - lng) <= PLACEHOLDER_TOLERANCE:
+            return base_lat, base_lng
+    return None
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def mean_point(points):
+    return sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points)
+
+def neighbour_anchor(entries, idx, good):
+    """Mean of the nearest geocoded booths before and after idx in the same assembly"""
+    points = []
+    for step in (-1, 1):
+        i = idx + step
+        while 0 <= i < len(entries):
+            if i in good:
+                points.append((entries[i]['Latitude'], entries[i]['Longitude']))
+                break
+            i += step
+    if not points:
+        return None
+    return mean_point(points)
+
+def locality_names(locality):
+    """The upper-cased locality name and its comma-separated parts, without stray punctuation"""
+    locality = locality.upper()
+    names = [locality.strip(' ,.')]
+    names.extend(part.strip(' .') for part in locality.split(','))
+    return list(dict.fromkeys(name for name in names if name))
+
+def locality_anchors(localities, min_neighbours=MIN_NEIGHBOURS, radius=LOCALITY_RADIUS):
+    """{(region, locality): (point, count)} for compact localities with enough booths
+
+    localities maps (region, locality) to the list of its geocoded points.
+    """
+    anchors = {}
+    for key, points in localities.items():
+        if len(points) < min_neighbours:
+            continue
+        centre = mean_point(points)
+        if all(math.dist(centre, point) <= radius for point in points):
+            anchors[key] = (centre, len(points))
+    return anchors
+
+def spread(point, idx, count):
+    """point moved by FALLBACK_STEP per booth from the middle of an assembly of count booths"""
+    offset = idx - (count - 1) / 2
+    return point[0] + offset * FALLBACK_STEP[0], point[1] + offset * FALLBACK_STEP[1]
+
+def impute_coordinates(data, k=3, index=None, min_neighbours=MIN_NEIGHBOURS, bounds=None):
+    """Impute coordinates for every bad booth in one batched pass
+
+    Updates data in place and returns (fixes, unresolved): fixes is a list of
+    (ac_key, idx, reason, lat, lng, neighbour_count, source) and unresolved a
+    list of (ac_key, idx, reason) for booths no source could place inside
+    their region. bounds defaults to CoordinateRule.bounds. Previously
+    imputed booths that end up where they already were are in neither.
+    """
+    if index is None:
+        index = AssemblyIndex(data)
+    polygons = region_polygons(bounds or CoordinateRule.bounds)
+    bases = placeholder_bases()
+    points = []
+    items = []
+    good = {}
+    localities = {}
+    bad = []
+
+    # One pass: split booths into geocoded points and booths needing imputation
+    for ref in index:
+        ac_key = ref.key
+        good[ac_key] = set()
+        for idx, entry in enumerate(ref.booths):
+            lat, lng = entry.get('Latitude'), entry.get('Longitude')
+            if lat is None or lng is None:
+                bad.append((ref, idx, 'null', None))
+            elif not is_number(lat) or not is_number(lng):
+                bad.append((ref, idx, f'placeholder {lat!r}', None))
+            elif entry.get(COORD_SOURCE):
+                bad.append((ref, idx, f'imputed ({entry[COORD_SOURCE]})', None))
+            else:
+                base = placeholder_base(lat, lng, bases)
+                if base:
+                    bad.append((ref, idx, 'offset placeholder', base))
+                else:
+                    locality = entry.get('LOCALITY_EXTRACTED')
+                    good[ac_key].add(idx)
+                    points.append((lat, lng))
+                    items.append((ac_key, locality, ref.region))
+                    names = locality_names(locality or '')
+                    if names:
+                        localities.setdefault((ref.region, names[0]), []).append((lat, lng))
+
+    tree = KDTree(points, items)
+    anchors = locality_anchors(localities, min_neighbours)
+
+    def in_region(region, point):
+        return any(point_in_polygon(*point, rings) for rings in polygons.get(region, ()))
+
+    def averaged(source, neighbours):
+        if len(neighbours) >= min_neighbours:
+            yield source, mean_point([point for _, point, _ in neighbours]), len(neighbours)
+
+    def candidates(ref, idx, base):
+        """(source, point, neighbour_count) guesses for one booth, best first"""
+        entries = ref.booths
+        locality = entries[idx].get('LOCALITY_EXTRACTED')
+        anchor = base or neighbour_anchor(entries, idx, good[ref.key])
+        if anchor is not None and good[ref.key]:
+            if locality:
+                yield from averaged('locality', tree.nearest(
+                    *anchor, k=k, accept=lambda item: item[:2] == (ref.key, locality)))
+            yield from averaged('assembly', tree.nearest(*anchor, k=k, accept=lambda item: item[0] == ref.key))
+        for name in locality_names(locality or ''):
+            if (ref.region, name) in anchors:
+                point, count = anchors[ref.region, name]
+                yield 'locality anchor', spread(point, idx, len(entries)), count
+        if anchor is None:
+            default = ASSEMBLY_DEFAULTS.get(str(ref.number))
+            anchor = default and (default['lat'], default['lng'])
+        if anchor is not None:
+            neighbours = tree.nearest(*anchor, k=k, accept=lambda item: item[2] == ref.region)
+            for source, point, count in averaged('nearby assemblies',
+                                                 [n for n in neighbours if n[0] <= MAX_ANCHOR_DISTANCE]):
+                yield source, spread(point, idx, len(entries)), count
+
+    fixes = []
+    unresolved = []
+    for ref, idx, reason, base in bad:
+        placed = next((c for c in candidates(ref, idx, base) if in_region(ref.region, c[1])), None)
+        if placed is None:
+            unresolved.append((ref.key, idx, reason))
+            continue
+
+        source, point, count = placed
+        lat, lng = point
+        entry = ref.booths[idx]
+        if (entry.get('Latitude'), entry.get('Longitude'), entry.get(COORD_SOURCE)) == (lat, lng, source):
+            continue
+        entry['Latitude'] = lat
+        entry['Longitude'] = lng
+        entry[COORD_SOURCE] = source
+        fixes.append((ref.key, idx, reason, lat, lng, count, source))
+
+    return fixes, unresolved
+
+def print_imputation(fixes, unresolved):
+    """Print what impute_coordinates changed"""
+    print(f"Imputed coordinates for {len(fixes)} booths")
+    for ac_key, idx, reason, lat, lng, count, source in fixes:
+        print(f"  {ac_key}[{idx}] ({reason}): set to ({lat:.6f}, {lng:.6f}) from {count} booths ({source})")
+    if unresolved:
+        by_key = {}
+        for ac_key, _, reason in unresolved:
+            by_key.setdefault(ac_key, []).append(reason)
+        print(f"No usable geocoded neighbours for {len(unresolved)} booths (left unchanged):")
+        for ac_key, reasons in by_key.items():
+            print(f"  {ac_key}: {len(reasons)} booths ({', '.join(sorted(set(reasons)))})")
+
+def main():
+    data, index = load_index()
+    fixes, unresolved = impute_coordinates(data, index=index)
+    print_imputation(fixes, unresolved)
+    if fixes:
+        save_dataset(data)
+        export_outputs(data)
+        print("\nDataset updated.")
+
+if __name__ == '__main__':
+    main()
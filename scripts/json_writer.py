@@ -0,0 +1,77 @@
+"""
+Atomic, streaming JSON writer for the dataset export.
+
+dump_json writes the dataset one top-level key, and one list element, at a
+time instead of building the whole document with json.dumps, so peak memory
+is about one booth record rather than the full file. Output goes to a
+temporary file in the target's directory and is renamed over the target
+only once it is complete and flushed to disk; a crash mid-write leaves the
+previous file intact.
+
+The indented output is byte-for-byte what json.dump(data, f, indent=indent)
+produces. compact=True writes with no whitespace at all.
+"""
+from contextlib import contextmanager
+import json
+import os
+import tempfile
+
+@contextmanager
+def atomic_open(path, mode='w', encoding='utf-8'):
+    """Open a temporary file that replaces path when the block exits cleanly"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file private; keep the target's permissions
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _key(key):
+    """Object key as json.dump writes it (non-string keys are converted the same way)"""
+    if isinstance(key, str):
+        return key
+    if key is None or isinstance(key, (int, float)):
+        return json.dumps(key)
+    raise TypeError(f'keys must be str, int, float, bool or None, not {type(key).__name__}')
+
+def _write_value(f, value, indent, level):
+    """Write value, streaming dicts and lists element by element"""
+    if isinstance(value, dict):
+        items, opener, closer = value.items(), '{', '}'
+    elif isinstance(value, list):
+        items, opener, closer = value, '[', ']'
+    else:
+        f.write(json.dumps(value))
+        return
+    if not value:
+        f.write(opener + closer)
+        return
+
+    if indent is None:
+        separator, key_separator, inner, outer = ',', ':', '', ''
+    else:
+        separator, key_separator = ',', ': '
+        inner = '\n' + ' ' * (indent * (level + 1))
+        outer = '\n' + ' ' * (indent * level)
+
+    f.write(opener)
+    for i, item in enumerate(items):
+        f.write((separator if i else '') + inner)
+        if isinstance(value, dict):
+            key, item = item
+            f.write(json.dumps(_key(key)) + key_separator)
+        _write_value(f, item, indent, level + 1)
+    f.write(outer + closer)
+
+def dump_json(data, path, indent=1, compact=False):
+    """Stream data to path as JSON and atomically move it into place"""
+    with atomic_open(path) as f:
+        _write_value(f, data, None if compact else indent, 0)
@@ -0,0 +1,238 @@
+"""
+Monte Carlo win probabilities for every booth and assembly.
+
+Instead of the single deterministic TOP_SCORE_PARTY, samples plausible
+vote shares for each booth from its 2011/2016/2021 history and counts how
+often each party comes out on top:
+
+  mean - the party's published score (the default scoring model)
+  sd   - the volatility of the party's vote share across the booth's
+         elections (weighted like the score), in score units, at least
+         --min-sd
+
+A party's score is its weighted average share times a normalising factor
+of the booth (the weights of the years it stood in over the booth's total
+raw score), so the share spread is scaled by the same factor to put it on
+the scale of the mean.
+
+A draw is mean + sd * noise, clipped at 0, where the noise mixes one shock
+per party and assembly (shared by its booths) with an independent shock
+per booth; --correlation sets the shared part. The booth winner is the
+top sampled share, the assembly winner the top party once booth shares are
+renormalised and weighted by each booth's latest POLLED total.
+
+Draws run in chunks, vectorized over parties x draws x booths. Each chunk
+gets its own RNG stream spawned from --seed, so the counts are the same
+whatever the number of worker processes (-j).
+
+Usage: python monte_carlo.py [--draws 100000] [-j 0] [--seed 0] [--output FILE]
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
+
+import numpy as np
+
+from assembly_index import load_index
+from compare_models import assembly_shares
+from json_writer import dump_json
+from models import load_assemblies
+from scoring import MODELS, DEFAULT_MODEL, party_scores
+
+class AssemblyModel:
+    """Sampling parameters of one assembly
+
+    mean and sd are (parties, booths); weight is each booth's weight in the
+    assembly total.
+    """
+    __slots__ = ('key', 'number', 'parties', 'ps_nos', 'top_parties', 'mean', 'sd', 'weight')
+
+    def __init__(self, key, number, parties, ps_nos, top_parties, mean, sd, weight):
+        self.key = key
+        self.number = number
+        self.parties = parties
+        self.ps_nos = ps_nos
+        self.top_parties = top_parties
+        self.mean = mean
+        self.sd = sd
+        self.weight = weight
+
+    @classmethod
+    def from_assembly(cls, assembly, model=None, min_sd=0.02):
+        model = model or MODELS[DEFAULT_MODEL]
+        parties, shares, polled, contested = assembly_shares(assembly)
+        weights = np.broadcast_to(model.weights(polled), polled.shape)
+        mean = party_scores(shares, contested, weights)
+
+        # Weighted spread of each party's share over the elections it stood in at the booth
+        present = contested[np.newaxis, :, :] & (polled > 0)[:, np.newaxis, :]
+        year_weights = np.where(present, weights[:, np.newaxis, :], 0.0)
+        total = year_weights.sum(axis=-1)
+        safe_total = np.where(total > 0, total, 1.0)
+        average = (year_weights * shares).sum(axis=-1) / safe_total
+        variance = (year_weights * (shares - average[..., np.newaxis]) ** 2).sum(axis=-1) / safe_total
+        # score = average * total / (booth's total raw score): rescale the spread the same way
+        raw_total = (year_weights * shares).sum(axis=(1, 2))[:, np.newaxis]
+        scale = np.divide(total, raw_total, out=np.zeros_like(total), where=raw_total > 0)
+        sd = np.where(mean > 0, np.maximum(np.sqrt(variance) * scale, min_sd), 0.0)
+
+        weight = polled[:, -1].copy() if len(polled) else np.zeros(0)
+        missing = weight <= 0
+        weight[missing] = weight[~missing].mean() if (~missing).any() else 1.0
+
+        return cls(
+            assembly.key, assembly.number, parties,
+            [booth.ps_no for booth in assembly.booths],
+            [(booth.top_party or '').split(' (')[0] for booth in assembly.booths],
+            mean.T.astype(np.float32), sd.T.astype(np.float32), weight.astype(np.float32),
+        )
+
+def build_models(assemblies, model=None, min_sd=0.02):
+    """AssemblyModels of the assemblies that have scored parties"""
+    models = [AssemblyModel.from_assembly(assembly, model, min_sd) for assembly in assemblies]
+    return [m for m in models if m.parties and m.mean.shape[1]]
+
+def sample_chunk(models, draws, seed, correlation=0.5):
+    """Win counts over draws samples: [(booth_wins (parties, booths), assembly_wins (parties,))]"""
+    rng = np.random.Generator(np.random.SFC64(seed))
+    shared = np.float32(np.sqrt(correlation))
+    own = np.float32(np.sqrt(1.0 - correlation))
+    counts = []
+    for m in models:
+        parties, booths = m.mean.shape
+        values = rng.standard_normal((parties, draws, booths), dtype=np.float32)
+        values *= own
+        values += shared * rng.standard_normal((parties, draws, 1), dtype=np.float32)
+        values *= m.sd[:, np.newaxis, :]
+        values += m.mean[:, np.newaxis, :]
+        np.maximum(values, 0, out=values)
+
+        # Running maximum over the few parties instead of argmax over a short axis
+        best = values[0].copy()
+        winner = np.zeros((draws, booths), dtype=np.intp)
+        for p in range(1, parties):
+            higher = values[p] > best
+            winner[higher] = p
+            np.maximum(best, values[p], out=best)
+        booth_wins = np.bincount((winner * booths + np.arange(booths)).ravel(),
+                                 minlength=parties * booths).reshape(parties, booths)
+
+        total = values.sum(axis=0)
+        scale = np.divide(m.weight, total, out=np.zeros_like(total), where=total > 0)
+        votes = np.einsum('pdb,db->pd', values, scale)
+        assembly_wins = np.bincount(votes.argmax(axis=0), minlength=parties)
+        counts.append((booth_wins, assembly_wins))
+    return counts
+
+_worker_models = None
+_worker_correlation = None
+
+def _init_worker(models, correlation):
+    global _worker_models, _worker_correlation
+    _worker_models = models
+    _worker_correlation = correlation
+
+def _run_chunk(task):
+    draws, seed = task
+    return sample_chunk(_worker_models, draws, seed, _worker_correlation)
+
+def simulate(models, draws=100000, seed=0, jobs=1, chunk_size=1000, correlation=0.5):
+    """Booth and assembly win probabilities over draws samples
+
+    Returns [(booth_probabilities (parties, booths), assembly_probabilities
+    (parties,))] in models order.
+    """
+    sizes = [min(chunk_size, draws - start) for start in range(0, draws, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = list(zip(sizes, seeds))
+    booth_wins = [np.zeros(m.mean.shape, dtype=np.int64) for m in models]
+    assembly_wins = [np.zeros(len(m.parties), dtype=np.int64) for m in models]
+
+    def accumulate(counts):
+        for a, (booth, assembly) in enumerate(counts):
+            booth_wins[a] += booth
+            assembly_wins[a] += assembly
+
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks)), initializer=_init_worker,
+                                 initargs=(models, correlation)) as pool:
+            for counts in pool.map(_run_chunk, tasks):
+                accumulate(counts)
+    else:
+        for size, chunk_seed in tasks:
+            accumulate(sample_chunk(models, size, chunk_seed, correlation))
+
+    return [(booth / draws, assembly / draws) for booth, assembly in zip(booth_wins, assembly_wins)]
+
+def _leaders(parties, probabilities, limit=3):
+    order = np.argsort(-probabilities, kind='stable')[:limit]
+    return ', '.join(f"{parties[p]} {probabilities[p]:.1%}" for p in order if probabilities[p] > 0)
+
+def print_probabilities(models, results, index, toss_up=0.6):
+    print(f"\n{'Assembly':<32} {'Booths':>6} {'Toss-ups':>8} {'Upsets':>6}  Assembly win probability")
+    for m, (booth_p, assembly_p) in zip(models, results):
+        favourite = booth_p.argmax(axis=0)
+        toss_ups = int((booth_p.max(axis=0) < toss_up).sum())
+        upsets = sum(m.parties[f] != published for f, published in zip(favourite, m.top_parties))
+        name = f"{m.key} ({index.by_key[m.key].name})"
+        print(f"{name:<32} {booth_p.shape[1]:>6} {toss_ups:>8} {upsets:>6}  {_leaders(m.parties, assembly_p)}")
+    print(f"\nToss-ups: booths whose favourite wins less than {toss_up:.0%} of draws; "
+          f"upsets: favourite differs from TOP_SCORE_PARTY")
+
+def probability_report(models, results, draws, seed):
+    """JSON-ready per-assembly and per-booth win probabilities"""
+    return {
+        'draws': draws,
+        'seed': seed,
+        'assemblies': {
+            m.key: {
+                'parties': dict(zip(m.parties, np.round(assembly_p, 6).tolist())),
+                'booths': [
+                    {'PS_NO': ps_no, 'parties': dict(zip(m.parties, np.round(booth_p[:, b], 6).tolist()))}
+                    for b, ps_no in enumerate(m.ps_nos)
+                ],
+            }
+            for m, (booth_p, assembly_p) in zip(models, results)
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Monte Carlo win probabilities per booth and assembly')
+    parser.add_argument('--draws', type=int, default=100000, help='number of samples (default: 100000)')
+    parser.add_argument('--seed', type=int, default=0, help='root seed; same seed, same probabilities')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='worker processes, one chunk of draws per task (0 = all cores)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='draws per task (default: 1000)')
+    parser.add_argument('--model', choices=list(MODELS), default=DEFAULT_MODEL,
+                        help='scoring model giving the expected share (default: %(default)s)')
+    parser.add_argument('--min-sd', type=float, default=0.02,
+                        help='smallest share volatility for a party with a score (default: 0.02)')
+    parser.add_argument('--correlation', type=float, default=0.5,
+                        help='share of the noise common to an assembly\'s booths, 0-1 (default: 0.5)')
+    parser.add_argument('--output', help='write every booth\'s and assembly\'s win probabilities as JSON')
+    args = parser.parse_args()
+    if args.draws < 1 or args.chunk_size < 1:
+        parser.error('--draws and --chunk-size must be positive')
+    if not 0 <= args.correlation <= 1:
+        parser.error('--correlation must be between 0 and 1')
+    jobs = args.jobs or os.cpu_count() or 1
+
+    data, index = load_index()
+    models = build_models(load_assemblies(data, index), MODELS[args.model], args.min_sd)
+    booths = sum(m.mean.shape[1] for m in models)
+    print(f"Sampling {args.draws:,} draws over {booths} booths in {len(models)} assemblies "
+          f"with {jobs} worker(s)...")
+
+    started = time.perf_counter()
+    results = simulate(models, args.draws, args.seed, jobs, args.chunk_size, args.correlation)
+    elapsed = time.perf_counter() - started
+    print_probabilities(models, results, index)
+    print(f"\n{args.draws:,} draws in {elapsed:.2f}s")
+
+    if args.output:
+        dump_json(probability_report(models, results, args.draws, args.seed), args.output)
+        print(f"Win probabilities saved to: {args.output}")
+
+if __name__ == '__main__':
+    main()
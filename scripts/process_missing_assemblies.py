@@ -1,15 +1,30 @@
 """
-Process the three missing assembly Excel files:
-1. Merge 2021 and 11_16 sheets
+Process the per-assembly AC_*_FINAL.xlsx Excel files:
+1. Merge 2021 and 11_16 sheets (column layout from assembly_specs.py)
 2. Calculate vote percentages
 3. Calculate party scores
 4. Categorize booths (A/B/C)
+   (steps 2-4 run per assembly in the vectorized kernel in scoring.py)
 5. Add coordinates based on known locality mappings
-6. Export to JSON format matching existing data structure
+6. Save to the dataset store and export JSON matching existing data structure
+
+Assemblies whose inputs are unchanged since the last run (see
+build_manifest.py) are skipped unless --force is given.
 """
-import json
-from openpyxl import load_workbook
-import re
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import numpy as np
+
+from assembly_index import assembly_key
+from assembly_specs import ASSEMBLY_SPECS, YEAR_SHEETS
+from build_manifest import load_manifest, plan_rebuild, save_manifest, update_manifest
+from dataset_exports import export_outputs
+from dataset_store import load_dataset, save_dataset
+from gazetteer import Gazetteer, extract_locality
+from scoring import YEARS, score_assembly
+from workbook_reader import data_rows, open_workbook
 
 # Region coordinates for geocoding
 REGION_COORDS = {
@@ -37,50 +52,15 @@ ASSEMBLY_DEFAULTS = {
     '30': {'lat': 16.7333, 'lng': 82.2167, 'name': 'Yanam'},
 }
 
-def extract_locality(ps_name):
-    """Extract locality from polling station name"""
-    if not ps_name:
-        return 'Unknown'
-    
-    # Clean up the name
-    ps_name = str(ps_name).upper()
-    
-    # Common patterns to remove
-    remove_patterns = [
-        r'GOVT\.?\s*',
-        r'GOVERNMENT\s*',
-        r'PRIMARY\s*SCHOOL\s*',
-        r'HIGH\s*SCHOOL\s*',
-        r'HIGHER\s*SECONDARY\s*SCHOOL\s*',
-        r'MIDDLE\s*SCHOOL\s*',
-        r'COMMUNITY\s*HALL\s*',
-        r'\(NORTH\)',
-        r'\(SOUTH\)',
-        r'\(EAST\)',
-        r'\(WEST\)',
-        r'PUDUCHERRY-?\d*',
-        r'YANAM-?\d*',
-        r'-\d+$',
-    ]
-    
-    for pattern in remove_patterns:
-        ps_name = re.sub(pattern, '', ps_name)
-    
-    # Extract the locality (usually after 'STREET' or at end)
-    words = ps_name.split()
-    if len(words) >= 2:
-        return ' '.join(words[-2:]).strip()
-    return ps_name.strip() if ps_name.strip() else 'Unknown'
+# Gazetteer over the known localities
+GAZETTEER = Gazetteer(REGION_COORDS)
 
 def get_coordinates(locality, assembly_num):
     """Get coordinates for a locality"""
-    locality_upper = locality.upper()
-    
-    # Check for known localities
-    for key, coords in REGION_COORDS.items():
-        if key in locality_upper or locality_upper in key:
-            # Add small random offset for different booths in same locality
-            return coords['lat'], coords['lng']
+    # Check for known localities, allowing for spelling variants
+    coords = GAZETTEER.resolve(locality)
+    if coords:
+        return coords
     
     # Use assembly default with slight offset based on booth
     default = ASSEMBLY_DEFAULTS.get(assembly_num, ASSEMBLY_DEFAULTS['14'])
@@ -104,449 +84,228 @@ def safe_int(val, default=0):
     except (ValueError, TypeError):
         return default
 
-def calculate_percentage(votes, total):
-    """Calculate vote percentage"""
-    if total and total > 0:
-        return votes / total
-    return 0
+def read_year(row, year, year_spec):
+    """Read the party votes and POLLED count for one year from a sheet row"""
+    record = {}
+    for party, col in year_spec['parties']:
+        record[f'{party}_{year}'] = safe_int(row[col])
+    if year_spec['polled'] is None:
+        record[f'POLLED_{year}'] = sum(safe_int(row[col]) for _, col in year_spec['parties'])
+    else:
+        record[f'POLLED_{year}'] = safe_int(row[year_spec['polled']])
+    return record
 
-def process_assembly_14():
-    """Process AC_14 - Raj Bhavan"""
-    wb = load_workbook('AC_14_FINAL.xlsx')
-    
-    # Process 2021 sheet
-    ws_2021 = wb['2021']
+def read_2021_sheet(rows, spec):
+    """Read the 2021 sheet into {ps_num: record}"""
+    name_col = spec['ps_2021']['name']
+    num_col = spec['ps_2021']['num']
     data_2021 = {}
-    for row in list(ws_2021.rows)[1:]:  # Skip header
-        if row[0].value:
-            ps_name = str(row[0].value)
-            ps_num = safe_int(row[1].value)
-            data_2021[ps_num] = {
-                'PS_NO_2021': ps_name,
-                'DMK_2021': safe_int(row[2].value),
-                'AINRC_2021': safe_int(row[3].value),
-                'MNM_2021': safe_int(row[4].value),
-                'OTHERS_2021': safe_int(row[5].value),
-                'NOTA_2021': safe_int(row[6].value),
-                'POLLED_2021': safe_int(row[7].value),
-                'VOTERS_2021': safe_int(row[8].value),
-                'POLLED_%': safe_float(row[9].value),
-            }
-    
-    # Process 11_16 sheet  
-    ws_1116 = wb['11_16']
+    for row in rows:
+        ps_name = str(row[name_col]) if row[name_col] else ''
+        ps_num = safe_int(row[num_col])
+        if ps_num or ps_name:
+            key = ps_num if ps_num else len(data_2021) + 1
+            record = {'PS_NO_2021': ps_name}
+            record.update(read_year(row, '2021', spec['years']['2021']))
+            record['VOTERS_2021'] = safe_int(row[spec['voters_2021']])
+            record['POLLED_%'] = safe_float(row[spec['polled_pct']])
+            data_2021[key] = record
+    return data_2021
+
+def read_1116_sheet(rows, spec):
+    """Read the 11_16 sheet into {ps_num: record}, keyed by PS_NO_2016"""
+    num_col = spec['ps_1116']['num']
     data_1116 = {}
-    for row in list(ws_1116.rows)[1:]:  # Skip header
-        ps_num = safe_int(row[2].value)  # PS_NO_2016 is at index 2
+    for row in rows:
+        ps_num = safe_int(row[num_col])
         if ps_num:
-            data_1116[ps_num] = {
-                'AIADMK_2011': safe_int(row[3].value),
-                'INC_2011': safe_int(row[4].value),
-                'IND_2011': safe_int(row[5].value),  # ANNIBAL_NEHRU
-                'OTHERS_2011': safe_int(row[6].value),
-                'POLLED_2011': safe_int(row[7].value),
-                'AINRC_2016': safe_int(row[9].value),
-                'AIADMK_2016': safe_int(row[10].value),
-                'INC_2016': safe_int(row[11].value),
-                'OTHERS_2016': safe_int(row[12].value),
-                'NOTA_2016': safe_int(row[13].value),
-                'POLLED_2016': safe_int(row[9].value) + safe_int(row[10].value) + safe_int(row[11].value) + safe_int(row[12].value) + safe_int(row[13].value),
-            }
-    
-    wb.close()
-    
-    # Merge and calculate
-    result = []
-    for ps_num, d2021 in data_2021.items():
+            record = {}
+            for year in ('2011', '2016'):
+                record.update(read_year(row, year, spec['years'][year]))
+            data_1116[ps_num] = record
+    return data_1116
+
+def assembly_parties(spec):
+    """Every party in the spec, in first-seen year order (the kernel's party axis)"""
+    parties = []
+    for year in YEARS:
+        for party, _ in spec['years'][year]['parties']:
+            if party not in parties:
+                parties.append(party)
+    return parties
+
+def assembly_arrays(booths, spec, parties):
+    """Build the booth x party x year vote arrays the scoring kernel takes"""
+    party_index = {party: i for i, party in enumerate(parties)}
+    votes = np.zeros((len(booths), len(parties), len(YEARS)))
+    polled = np.zeros((len(booths), len(YEARS)))
+    contested = np.zeros((len(parties), len(YEARS)), dtype=bool)
+    
+    for y, year in enumerate(YEARS):
+        for party, _ in spec['years'][year]['parties']:
+            contested[party_index[party], y] = True
+    
+    for b, (_, d2021, d1116) in enumerate(booths):
+        for y, year in enumerate(YEARS):
+            source = d2021 if year == '2021' else d1116
+            polled[b, y] = source.get(f'POLLED_{year}', 0)
+            for party, _ in spec['years'][year]['parties']:
+                votes[b, party_index[party], y] = source.get(f'{party}_{year}', 0)
+    
+    return votes, polled, contested
+
+def score_booths(booths, ac_num, spec):
+    """Score all booths of an assembly in one kernel call and build the JSON entries"""
+    parties = assembly_parties(spec)
+    party_index = {party: i for i, party in enumerate(parties)}
+    votes, polled, contested = assembly_arrays(booths, spec, parties)
+    result = score_assembly(
+        votes, polled, contested,
+        scored=[party_index[party] for party in spec['scores']],
+    )
+    shares = result['shares'].tolist()
+    scores = result['scores'].tolist()
+    top = result['top'].tolist()
+    categories = result['category'].tolist()
+    
+    entries = []
+    for b, (ps_num, d2021, d1116) in enumerate(booths):
         entry = {}
         entry['PS_NO_2021'] = d2021['PS_NO_2021']
         entry['LOCALITY_EXTRACTED'] = extract_locality(d2021['PS_NO_2021'])
         
         # Get coordinates with slight variation per booth
-        base_lat, base_lng = get_coordinates(entry['LOCALITY_EXTRACTED'], '14')
+        base_lat, base_lng = get_coordinates(entry['LOCALITY_EXTRACTED'], ac_num)
         entry['Latitude'] = base_lat + (ps_num * 0.0003)  # Small offset per booth
         entry['Longitude'] = base_lng + (ps_num * 0.0002)
         
-        # 2011 data
-        d1116 = data_1116.get(ps_num, {})
-        polled_2011 = d1116.get('POLLED_2011', 0)
-        entry['AIADMK_2011'] = d1116.get('AIADMK_2011', 0)
-        entry['AIADMK_2011_pct'] = calculate_percentage(entry['AIADMK_2011'], polled_2011)
-        entry['INC_2011'] = d1116.get('INC_2011', 0)
-        entry['INC_2011_pct'] = calculate_percentage(entry['INC_2011'], polled_2011)
-        entry['IND_2011'] = d1116.get('IND_2011', 0)
-        entry['IND_2011_pct'] = calculate_percentage(entry['IND_2011'], polled_2011)
-        entry['OTHERS_2011'] = d1116.get('OTHERS_2011', 0)
-        entry['OTHERS_2011_pct'] = calculate_percentage(entry['OTHERS_2011'], polled_2011)
-        entry['POLLED_2011'] = polled_2011
+        for y, year in enumerate(YEARS):
+            source = d2021 if year == '2021' else d1116
+            for party, _ in spec['years'][year]['parties']:
+                key = f'{party}_{year}'
+                entry[key] = source.get(key, 0)
+                entry[f'{key}_pct'] = shares[b][party_index[party]][y]
+            entry[f'POLLED_{year}'] = source.get(f'POLLED_{year}', 0)
         
-        # 2016 data
-        polled_2016 = d1116.get('POLLED_2016', 0)
-        entry['AINRC_2016'] = d1116.get('AINRC_2016', 0)
-        entry['AINRC_2016_pct'] = calculate_percentage(entry['AINRC_2016'], polled_2016)
-        entry['AIADMK_2016'] = d1116.get('AIADMK_2016', 0)
-        entry['AIADMK_2016_pct'] = calculate_percentage(entry['AIADMK_2016'], polled_2016)
-        entry['INC_2016'] = d1116.get('INC_2016', 0)
-        entry['INC_2016_pct'] = calculate_percentage(entry['INC_2016'], polled_2016)
-        entry['OTHERS_2016'] = d1116.get('OTHERS_2016', 0)
-        entry['OTHERS_2016_pct'] = calculate_percentage(entry['OTHERS_2016'], polled_2016)
-        entry['NOTA_2016'] = d1116.get('NOTA_2016', 0)
-        entry['NOTA_2016_pct'] = calculate_percentage(entry['NOTA_2016'], polled_2016)
-        entry['POLLED_2016'] = polled_2016
-        
-        # 2021 data
-        polled_2021 = d2021['POLLED_2021']
-        entry['DMK_2021'] = d2021['DMK_2021']
-        entry['DMK_2021_pct'] = calculate_percentage(entry['DMK_2021'], polled_2021)
-        entry['AINRC_2021'] = d2021['AINRC_2021']
-        entry['AINRC_2021_pct'] = calculate_percentage(entry['AINRC_2021'], polled_2021)
-        entry['MNM_2021'] = d2021['MNM_2021']
-        entry['MNM_2021_pct'] = calculate_percentage(entry['MNM_2021'], polled_2021)
-        entry['OTHERS_2021'] = d2021['OTHERS_2021']
-        entry['OTHERS_2021_pct'] = calculate_percentage(entry['OTHERS_2021'], polled_2021)
-        entry['NOTA_2021'] = d2021['NOTA_2021']
-        entry['NOTA_2021_pct'] = calculate_percentage(entry['NOTA_2021'], polled_2021)
-        entry['POLLED_2021'] = polled_2021
+        polled_2021 = entry['POLLED_2021']
         entry['VOTERS_2021'] = d2021['VOTERS_2021']
         entry['VOTERS_2021_pct'] = d2021['VOTERS_2021'] / polled_2021 if polled_2021 else 0
         entry['POLLED_%'] = d2021['POLLED_%']
         
-        # Calculate scores (weighted average across years)
-        scores = {}
-        
-        # Map parties to score calculation
-        # 2011 weight: 0.2, 2016 weight: 0.3, 2021 weight: 0.5
-        scores['AIADMK_SCORE'] = entry['AIADMK_2011_pct'] * 0.2 + entry['AIADMK_2016_pct'] * 0.3
-        scores['INC_SCORE'] = entry['INC_2011_pct'] * 0.2 + entry['INC_2016_pct'] * 0.3
-        scores['AINRC_SCORE'] = entry['AINRC_2016_pct'] * 0.3 + entry['AINRC_2021_pct'] * 0.5
-        scores['DMK_SCORE'] = entry['DMK_2021_pct'] * 0.5
-        scores['MNM_SCORE'] = entry['MNM_2021_pct'] * 0.5
-        scores['OTHERS_SCORE'] = (entry['OTHERS_2011_pct'] * 0.2 + entry['OTHERS_2016_pct'] * 0.3 + entry['OTHERS_2021_pct'] * 0.5) / 3
-        scores['IND_SCORE'] = entry['IND_2011_pct'] * 0.2
-        
-        # Normalize scores to sum to 1
-        total_score = sum(scores.values())
-        if total_score > 0:
-            for key in scores:
-                scores[key] = scores[key] / total_score
-        
-        entry.update(scores)
-        
-        # Find top score
-        top_party = max(scores, key=scores.get)
-        top_value = scores[top_party]
-        party_name = top_party.replace('_SCORE', '')
-        entry['TOP_SCORE_PARTY'] = f"{party_name} ({top_value*100:.2f}%)"
-        
-        # Categorize
-        if top_value > 0.50:
-            entry['TOP_SCORE_CATEGORY'] = 'A'
-        elif top_value > 0.30:
-            entry['TOP_SCORE_CATEGORY'] = 'B'
-        else:
-            entry['TOP_SCORE_CATEGORY'] = 'C'
+        for party, score in zip(spec['scores'], scores[b]):
+            entry[f'{party}_SCORE'] = score
         
-        result.append(entry)
+        top_value = scores[b][top[b]]
+        entry['TOP_SCORE_PARTY'] = f"{spec['scores'][top[b]]} ({top_value*100:.2f}%)"
+        entry['TOP_SCORE_CATEGORY'] = categories[b]
+        entries.append(entry)
     
-    return result
+    return entries
 
-def process_assembly_16():
-    """Process AC_16 - Orleampeth"""
-    wb = load_workbook('AC_16_FINAL.xlsx')
-    
-    # Process 2021 sheet
-    ws_2021 = wb['2021']
-    data_2021 = {}
-    for row in list(ws_2021.rows)[1:]:
-        ps_num = safe_int(row[0].value)
-        if ps_num:
-            data_2021[ps_num] = {
-                'PS_NO_2021': str(row[1].value) if row[1].value else '',
-                'AIADMK_2021': safe_int(row[2].value),
-                'DMK_2021': safe_int(row[3].value),
-                'IND_2021': safe_int(row[4].value),  # KUPASWAMY
-                'OTHERS_2021': safe_int(row[5].value),
-                'NOTA_2021': safe_int(row[6].value),
-                'POLLED_2021': safe_int(row[7].value),
-                'VOTERS_2021': safe_int(row[8].value),
-                'POLLED_%': safe_float(row[9].value),
-            }
-    
-    # Process 11_16 sheet
-    ws_1116 = wb['11_16']
-    data_1116 = {}
-    for row in list(ws_1116.rows)[1:]:
-        ps_num = safe_int(row[1].value)  # PS_NO_2016 at index 1
-        if ps_num:
-            data_1116[ps_num] = {
-                'DMK_2011': safe_int(row[4].value),
-                'AINRC_2011': safe_int(row[5].value),
-                'OTHERS_2011': safe_int(row[6].value),
-                'POLLED_2011': safe_int(row[7].value),
-                'DMK_2016': safe_int(row[9].value),
-                'AINRC_2016': safe_int(row[10].value),
-                'OTHERS_2016': safe_int(row[11].value),
-                'NOTA_2016': safe_int(row[12].value),
-                'POLLED_2016': safe_int(row[13].value),
-            }
-    
-    wb.close()
-    
-    # Merge and calculate
-    result = []
-    for ps_num, d2021 in data_2021.items():
-        entry = {}
-        entry['PS_NO_2021'] = d2021['PS_NO_2021']
-        entry['LOCALITY_EXTRACTED'] = extract_locality(d2021['PS_NO_2021'])
-        
-        base_lat, base_lng = get_coordinates(entry['LOCALITY_EXTRACTED'], '16')
-        entry['Latitude'] = base_lat + (ps_num * 0.0003)
-        entry['Longitude'] = base_lng + (ps_num * 0.0002)
-        
-        d1116 = data_1116.get(ps_num, {})
-        polled_2011 = d1116.get('POLLED_2011', 0)
-        
-        entry['DMK_2011'] = d1116.get('DMK_2011', 0)
-        entry['DMK_2011_pct'] = calculate_percentage(entry['DMK_2011'], polled_2011)
-        entry['AINRC_2011'] = d1116.get('AINRC_2011', 0)
-        entry['AINRC_2011_pct'] = calculate_percentage(entry['AINRC_2011'], polled_2011)
-        entry['OTHERS_2011'] = d1116.get('OTHERS_2011', 0)
-        entry['OTHERS_2011_pct'] = calculate_percentage(entry['OTHERS_2011'], polled_2011)
-        entry['POLLED_2011'] = polled_2011
-        
-        polled_2016 = d1116.get('POLLED_2016', 0)
-        entry['DMK_2016'] = d1116.get('DMK_2016', 0)
-        entry['DMK_2016_pct'] = calculate_percentage(entry['DMK_2016'], polled_2016)
-        entry['AINRC_2016'] = d1116.get('AINRC_2016', 0)
-        entry['AINRC_2016_pct'] = calculate_percentage(entry['AINRC_2016'], polled_2016)
-        entry['OTHERS_2016'] = d1116.get('OTHERS_2016', 0)
-        entry['OTHERS_2016_pct'] = calculate_percentage(entry['OTHERS_2016'], polled_2016)
-        entry['NOTA_2016'] = d1116.get('NOTA_2016', 0)
-        entry['NOTA_2016_pct'] = calculate_percentage(entry['NOTA_2016'], polled_2016)
-        entry['POLLED_2016'] = polled_2016
-        
-        polled_2021 = d2021['POLLED_2021']
-        entry['AIADMK_2021'] = d2021['AIADMK_2021']
-        entry['AIADMK_2021_pct'] = calculate_percentage(entry['AIADMK_2021'], polled_2021)
-        entry['DMK_2021'] = d2021['DMK_2021']
-        entry['DMK_2021_pct'] = calculate_percentage(entry['DMK_2021'], polled_2021)
-        entry['IND_2021'] = d2021['IND_2021']
-        entry['IND_2021_pct'] = calculate_percentage(entry['IND_2021'], polled_2021)
-        entry['OTHERS_2021'] = d2021['OTHERS_2021']
-        entry['OTHERS_2021_pct'] = calculate_percentage(entry['OTHERS_2021'], polled_2021)
-        entry['NOTA_2021'] = d2021['NOTA_2021']
-        entry['NOTA_2021_pct'] = calculate_percentage(entry['NOTA_2021'], polled_2021)
-        entry['POLLED_2021'] = polled_2021
-        entry['VOTERS_2021'] = d2021['VOTERS_2021']
-        entry['VOTERS_2021_pct'] = d2021['VOTERS_2021'] / polled_2021 if polled_2021 else 0
-        entry['POLLED_%'] = d2021['POLLED_%']
-        
-        # Calculate scores
-        scores = {}
-        scores['DMK_SCORE'] = entry['DMK_2011_pct'] * 0.2 + entry['DMK_2016_pct'] * 0.3 + entry['DMK_2021_pct'] * 0.5
-        scores['AINRC_SCORE'] = entry['AINRC_2011_pct'] * 0.2 + entry['AINRC_2016_pct'] * 0.3
-        scores['AIADMK_SCORE'] = entry['AIADMK_2021_pct'] * 0.5
-        scores['IND_SCORE'] = entry['IND_2021_pct'] * 0.5
-        scores['OTHERS_SCORE'] = (entry['OTHERS_2011_pct'] * 0.2 + entry['OTHERS_2016_pct'] * 0.3 + entry['OTHERS_2021_pct'] * 0.5)
-        
-        total_score = sum(scores.values())
-        if total_score > 0:
-            for key in scores:
-                scores[key] = scores[key] / total_score
-        
-        entry.update(scores)
-        
-        top_party = max(scores, key=scores.get)
-        top_value = scores[top_party]
-        party_name = top_party.replace('_SCORE', '')
-        entry['TOP_SCORE_PARTY'] = f"{party_name} ({top_value*100:.2f}%)"
-        
-        if top_value > 0.50:
-            entry['TOP_SCORE_CATEGORY'] = 'A'
-        elif top_value > 0.30:
-            entry['TOP_SCORE_CATEGORY'] = 'B'
-        else:
-            entry['TOP_SCORE_CATEGORY'] = 'C'
-        
-        result.append(entry)
-    
-    return result
+def process_assembly(ac_num, spec=None):
+    """Process one assembly workbook using its column-mapping spec"""
+    spec = spec or ASSEMBLY_SPECS[ac_num]
+    with open_workbook(spec['workbook']) as wb:
+        data_2021 = read_2021_sheet(data_rows(wb[YEAR_SHEETS['2021']]), spec)
+        data_1116 = read_1116_sheet(data_rows(wb[YEAR_SHEETS['2011']]), spec)
+    
+    booths = [(ps_num, d2021, data_1116.get(ps_num, {})) for ps_num, d2021 in data_2021.items()]
+    return score_booths(booths, ac_num, spec)
 
-def process_assembly_30():
-    """Process AC_30 - Yanam"""
-    wb = load_workbook('AC_30_FINAL.xlsx')
-    
-    # Process 2021 sheet
-    ws_2021 = wb['2021']
-    data_2021 = {}
-    for row in list(ws_2021.rows)[1:]:
-        ps_name = str(row[0].value) if row[0].value else ''
-        ps_num = safe_int(row[1].value)
-        if ps_num or ps_name:
-            key = ps_num if ps_num else len(data_2021) + 1
-            data_2021[key] = {
-                'PS_NO_2021': ps_name,
-                'AINRC_2021': safe_int(row[2].value),
-                'OTHERS_2021': safe_int(row[3].value),
-                'NOTA_2021': safe_int(row[4].value),
-                'POLLED_2021': safe_int(row[5].value),
-                'VOTERS_2021': safe_int(row[6].value),
-                'POLLED_%': safe_float(row[7].value),
-            }
-    
-    # Process 11_16 sheet
-    ws_1116 = wb['11_16']
-    data_1116 = {}
-    for row in list(ws_1116.rows)[1:]:
-        ps_num = safe_int(row[2].value)  # PS_NO_2016 at index 2
-        if ps_num:
-            data_1116[ps_num] = {
-                'AIADMK_2011': safe_int(row[4].value),
-                'INC_2011': safe_int(row[5].value),
-                'OTHERS_2011': safe_int(row[6].value),
-                'POLLED_2011': safe_int(row[7].value),
-                'AINRC_2016': safe_int(row[9].value),
-                'INC_2016': safe_int(row[10].value),
-                'OTHERS_2016': safe_int(row[11].value),
-                'NOTA_2016': safe_int(row[12].value),
-                'POLLED_2016': safe_int(row[13].value),
-            }
-    
-    wb.close()
+def process_assemblies(ac_nums, jobs=1):
+    """Process several assemblies, one per worker process when jobs > 1
+    
+    Results are returned in the order of ac_nums regardless of which worker
+    finishes first, so the merged output is reproducible.
+    """
+    if jobs > 1 and len(ac_nums) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(ac_nums))) as pool:
+            return dict(zip(ac_nums, pool.map(process_assembly, ac_nums)))
+    return {ac_num: process_assembly(ac_num) for ac_num in ac_nums}
+
+def available_assemblies(requested=None):
+    """Assembly numbers to process: the requested ones, or every spec whose workbook exists"""
+    if requested:
+        return sorted(requested, key=int)
+    return sorted(
+        (ac_num for ac_num, spec in ASSEMBLY_SPECS.items() if os.path.exists(spec['workbook'])),
+        key=int,
+    )
+
+def print_summary(processed, rollups):
+    """Print category and dominant-party breakdown for processed assemblies from their rollups"""
+    print("\n" + "="*60)
+    print("PROCESSING SUMMARY")
+    print("="*60)
     
-    # Merge and calculate
-    result = []
-    for ps_num, d2021 in data_2021.items():
-        entry = {}
-        entry['PS_NO_2021'] = d2021['PS_NO_2021']
-        entry['LOCALITY_EXTRACTED'] = extract_locality(d2021['PS_NO_2021'])
-        
-        base_lat, base_lng = get_coordinates(entry['LOCALITY_EXTRACTED'], '30')
-        entry['Latitude'] = base_lat + (ps_num * 0.0003)
-        entry['Longitude'] = base_lng + (ps_num * 0.0002)
-        
-        d1116 = data_1116.get(ps_num, {})
-        polled_2011 = d1116.get('POLLED_2011', 0)
-        
-        entry['AIADMK_2011'] = d1116.get('AIADMK_2011', 0)
-        entry['AIADMK_2011_pct'] = calculate_percentage(entry['AIADMK_2011'], polled_2011)
-        entry['INC_2011'] = d1116.get('INC_2011', 0)
-        entry['INC_2011_pct'] = calculate_percentage(entry['INC_2011'], polled_2011)
-        entry['OTHERS_2011'] = d1116.get('OTHERS_2011', 0)
-        entry['OTHERS_2011_pct'] = calculate_percentage(entry['OTHERS_2011'], polled_2011)
-        entry['POLLED_2011'] = polled_2011
-        
-        polled_2016 = d1116.get('POLLED_2016', 0)
-        entry['AINRC_2016'] = d1116.get('AINRC_2016', 0)
-        entry['AINRC_2016_pct'] = calculate_percentage(entry['AINRC_2016'], polled_2016)
-        entry['INC_2016'] = d1116.get('INC_2016', 0)
-        entry['INC_2016_pct'] = calculate_percentage(entry['INC_2016'], polled_2016)
-        entry['OTHERS_2016'] = d1116.get('OTHERS_2016', 0)
-        entry['OTHERS_2016_pct'] = calculate_percentage(entry['OTHERS_2016'], polled_2016)
-        entry['NOTA_2016'] = d1116.get('NOTA_2016', 0)
-        entry['NOTA_2016_pct'] = calculate_percentage(entry['NOTA_2016'], polled_2016)
-        entry['POLLED_2016'] = polled_2016
+    for ac_num in processed:
+        rollup = rollups['assemblies'][assembly_key(ac_num)]
+        categories = rollup['categories']
+        print(f"\nAC_{ac_num} ({ASSEMBLY_SPECS[ac_num]['name']}):")
+        print(f"  Total booths: {rollup['booths']}")
         
-        polled_2021 = d2021['POLLED_2021']
-        entry['AINRC_2021'] = d2021['AINRC_2021']
-        entry['AINRC_2021_pct'] = calculate_percentage(entry['AINRC_2021'], polled_2021)
-        entry['OTHERS_2021'] = d2021['OTHERS_2021']
-        entry['OTHERS_2021_pct'] = calculate_percentage(entry['OTHERS_2021'], polled_2021)
-        entry['NOTA_2021'] = d2021['NOTA_2021']
-        entry['NOTA_2021_pct'] = calculate_percentage(entry['NOTA_2021'], polled_2021)
-        entry['POLLED_2021'] = polled_2021
-        entry['VOTERS_2021'] = d2021['VOTERS_2021']
-        entry['VOTERS_2021_pct'] = d2021['VOTERS_2021'] / polled_2021 if polled_2021 else 0
-        entry['POLLED_%'] = d2021['POLLED_%']
-        
-        # Calculate scores
-        scores = {}
-        scores['AIADMK_SCORE'] = entry['AIADMK_2011_pct'] * 0.2
-        scores['INC_SCORE'] = entry['INC_2011_pct'] * 0.2 + entry['INC_2016_pct'] * 0.3
-        scores['AINRC_SCORE'] = entry['AINRC_2016_pct'] * 0.3 + entry['AINRC_2021_pct'] * 0.5
-        scores['OTHERS_SCORE'] = (entry['OTHERS_2011_pct'] * 0.2 + entry['OTHERS_2016_pct'] * 0.3 + entry['OTHERS_2021_pct'] * 0.5)
-        
-        total_score = sum(scores.values())
-        if total_score > 0:
-            for key in scores:
-                scores[key] = scores[key] / total_score
-        
-        entry.update(scores)
-        
-        top_party = max(scores, key=scores.get)
-        top_value = scores[top_party]
-        party_name = top_party.replace('_SCORE', '')
-        entry['TOP_SCORE_PARTY'] = f"{party_name} ({top_value*100:.2f}%)"
-        
-        if top_value > 0.50:
-            entry['TOP_SCORE_CATEGORY'] = 'A'
-        elif top_value > 0.30:
-            entry['TOP_SCORE_CATEGORY'] = 'B'
-        else:
-            entry['TOP_SCORE_CATEGORY'] = 'C'
+        # Category breakdown
+        print(f"  Category A (>50%): {categories.get('A', 0)} booths")
+        print(f"  Category B (30-50%): {categories.get('B', 0)} booths")
+        print(f"  Category C (<30%): {categories.get('C', 0)} booths")
         
-        result.append(entry)
-    
-    return result
+        # Top party breakdown
+        print(f"  Dominant parties: {rollup['top_parties']}")
 
 def main():
+    parser = argparse.ArgumentParser(description='Ingest AC_*_FINAL.xlsx workbooks into Form20_Localities_Pct.json')
+    parser.add_argument('assemblies', nargs='*', metavar='AC',
+                        help='assembly numbers to process (default: every assembly with a workbook present)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='worker processes for parsing and scoring, one assembly per task (0 = all cores)')
+    parser.add_argument('--force', action='store_true',
+                        help='reprocess every assembly even if its inputs are unchanged since the last build')
+    parser.add_argument('--compact', action='store_true',
+                        help='write the JSON export without indentation')
+    args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+    unknown = [ac for ac in args.assemblies if ac not in ASSEMBLY_SPECS]
+    if unknown:
+        parser.error(f"no column spec for assemblies {unknown} (known: {sorted(ASSEMBLY_SPECS, key=int)})")
+    
     print("Processing missing assembly data...")
     
-    # Load existing JSON
-    with open('Form20_Localities_Pct.json', 'r', encoding='utf-8') as f:
-        existing_data = json.load(f)
+    # Load existing dataset
+    existing_data = load_dataset()
     
     print(f"Loaded existing data with {len(existing_data)} keys")
     
-    # Process AC_14
-    print("\nProcessing AC_14 (Raj Bhavan)...")
-    ac_14_data = process_assembly_14()
-    print(f"  Processed {len(ac_14_data)} entries")
-    existing_data['AC_14_FINAL'] = ac_14_data
-    
-    # Process AC_16
-    print("\nProcessing AC_16 (Orleampeth)...")
-    ac_16_data = process_assembly_16()
-    print(f"  Processed {len(ac_16_data)} entries")
-    existing_data['AC_16_FINAL'] = ac_16_data
-    
-    # Process AC_30
-    print("\nProcessing AC_30 (Yanam)...")
-    ac_30_data = process_assembly_30()
-    print(f"  Processed {len(ac_30_data)} entries")
-    existing_data['AC_30_FINAL'] = ac_30_data
-    
-    # Save updated JSON
-    print("\nSaving updated JSON...")
-    with open('Form20_Localities_Pct.json', 'w', encoding='utf-8') as f:
-        json.dump(existing_data, f, indent=1)
+    # Only reprocess assemblies whose workbook, spec or ingestion code changed
+    manifest = load_manifest()
+    ac_nums, fingerprints = plan_rebuild(
+        available_assemblies(args.assemblies), ASSEMBLY_SPECS, manifest, existing_data, force=args.force)
+    unchanged = [ac_num for ac_num in fingerprints if ac_num not in ac_nums]
+    if unchanged:
+        print(f"Unchanged since last build, skipping: {', '.join(f'AC_{ac_num}' for ac_num in unchanged)}")
+    if not ac_nums:
+        # Still record refreshed file hashes (e.g. a workbook re-saved without edits)
+        save_manifest(update_manifest(manifest, fingerprints))
+        print("Nothing to rebuild.")
+        return
+    
+    print(f"\nProcessing {len(ac_nums)} assemblies with {min(jobs, len(ac_nums))} worker(s)...")
+    processed = process_assemblies(ac_nums, jobs)
+    
+    # Merge in assembly order so the output does not depend on worker timing
+    for ac_num, entries in processed.items():
+        print(f"  AC_{ac_num} ({ASSEMBLY_SPECS[ac_num]['name']}): {len(entries)} entries")
+        existing_data[assembly_key(ac_num)] = entries
+    
+    # Save updated dataset (store + JSON export), then the outputs derived from it
+    print("\nSaving updated dataset...")
+    save_dataset(existing_data, compact=args.compact)
+    rollups = export_outputs(existing_data)['rollups']
+    save_manifest(update_manifest(manifest, fingerprints))
     
     print("Done!")
     print(f"\nTotal keys in updated JSON: {len(existing_data)}")
     
-    # Print summary
-    print("\n" + "="*60)
-    print("PROCESSING SUMMARY")
-    print("="*60)
-    
-    for ac_num, data in [('14', ac_14_data), ('16', ac_16_data), ('30', ac_30_data)]:
-        print(f"\nAC_{ac_num} ({ASSEMBLY_DEFAULTS[ac_num]['name']}):")
-        print(f"  Total booths: {len(data)}")
-        
-        # Category breakdown
-        cat_a = sum(1 for e in data if e['TOP_SCORE_CATEGORY'] == 'A')
-        cat_b = sum(1 for e in data if e['TOP_SCORE_CATEGORY'] == 'B')
-        cat_c = sum(1 for e in data if e['TOP_SCORE_CATEGORY'] == 'C')
-        print(f"  Category A (>50%): {cat_a} booths")
-        print(f"  Category B (30-50%): {cat_b} booths")
-        print(f"  Category C (<30%): {cat_c} booths")
-        
-        # Top party breakdown
-        parties = {}
-        for e in data:
-            party = e['TOP_SCORE_PARTY'].split()[0]
-            parties[party] = parties.get(party, 0) + 1
-        print(f"  Dominant parties: {parties}")
+    print_summary(processed, rollups)
 
 if __name__ == '__main__':
     main()
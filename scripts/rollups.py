@@ -0,0 +1,133 @@
+"""
+Precomputed assembly and region rollups of the dataset.
+
+Written next to the dataset by the export step (Form20_Localities_Pct.rollups.json)
+so the dashboard and the summary prints read a few kilobytes of aggregates
+instead of rescanning every booth. For each assembly, each region
+(Puducherry, Karaikal, Mahe, Yanam) and the whole dataset:
+
+  booths      - number of booths
+  categories  - booths per TOP_SCORE_CATEGORY
+  top_parties - booths per TOP_SCORE_PARTY party, in order of first appearance
+  years       - per election year: party vote totals, POLLED and VOTERS
+                totals, turnout (POLLED / VOTERS over booths with both) and
+                leaders, the booths where each party polled the most votes
+
+Region and dataset rollups are merged from the assembly rollups.
+"""
+from collections import Counter
+
+from assembly_index import REGIONS, AssemblyIndex
+from json_writer import dump_json
+from models import load_assemblies
+
+# Vote fields that are not a party that can lead a booth
+NON_PARTIES = {'NOTA'}
+
+def _number(value):
+    return value if isinstance(value, (int, float)) else 0
+
+class Rollup:
+    """Running aggregates over a group of booths"""
+
+    def __init__(self):
+        self.booths = 0
+        self.categories = Counter()
+        self.top_parties = Counter()
+        self.years = {}
+
+    def _year(self, year):
+        if year not in self.years:
+            self.years[year] = {'votes': Counter(), 'polled': 0, 'voters': 0, 'turnout_polled': 0,
+                                'leaders': Counter()}
+        return self.years[year]
+
+    def add_booth(self, booth):
+        self.booths += 1
+        self.categories[booth.category or 'Unknown'] += 1
+        if booth.top_party:
+            self.top_parties[booth.top_party.split(' (')[0]] += 1
+        for year in booth.layout.years:
+            election = booth.year(year)
+            totals = self._year(year)
+            leader = None
+            for party, votes in zip(election.parties, election.votes):
+                votes = _number(votes)
+                totals['votes'][party] += votes
+                if party not in NON_PARTIES and votes > 0 and (leader is None or votes > leader[1]):
+                    leader = (party, votes)
+            if leader:
+                totals['leaders'][leader[0]] += 1
+            polled = _number(election.polled)
+            voters = _number(booth.get(f'VOTERS_{year}'))
+            totals['polled'] += polled
+            if voters > 0:
+                totals['voters'] += voters
+                totals['turnout_polled'] += polled
+
+    def merge(self, other):
+        self.booths += other.booths
+        self.categories.update(other.categories)
+        self.top_parties.update(other.top_parties)
+        for year, other_totals in other.years.items():
+            totals = self._year(year)
+            totals['votes'].update(other_totals['votes'])
+            totals['leaders'].update(other_totals['leaders'])
+            for field in ('polled', 'voters', 'turnout_polled'):
+                totals[field] += other_totals[field]
+        return self
+
+    def to_json(self):
+        years = {}
+        for year in sorted(self.years):
+            totals = self.years[year]
+            years[year] = {
+                'votes': dict(totals['votes'].most_common()),
+                'polled': totals['polled'],
+                'voters': totals['voters'] or None,
+                'turnout': totals['turnout_polled'] / totals['voters'] if totals['voters'] else None,
+                'leaders': dict(totals['leaders'].most_common()),
+            }
+        return {
+            'booths': self.booths,
+            'categories': dict(sorted(self.categories.items())),
+            'top_parties': dict(self.top_parties),
+            'years': years,
+        }
+
+def build_rollups(data, index=None):
+    """Assembly, region and dataset rollups of a dataset dict, JSON-ready"""
+    index = index or AssemblyIndex(data)
+    assemblies = {}
+    regions = {region: Rollup() for region, _, _ in REGIONS}
+    region_assemblies = {region: [] for region in regions}
+    total = Rollup()
+    for assembly in load_assemblies(data, index):
+        rollup = Rollup()
+        for booth in assembly.booths:
+            rollup.add_booth(booth)
+        ref = index.by_key[assembly.key]
+        assemblies[assembly.key] = rollup
+        if ref.region in regions:
+            regions[ref.region].merge(rollup)
+            region_assemblies[ref.region].append(ref.number)
+        total.merge(rollup)
+
+    return {
+        'assemblies': {
+            key: {'number': index.by_key[key].number, 'name': index.by_key[key].name,
+                  'region': index.by_key[key].region, **rollup.to_json()}
+            for key, rollup in assemblies.items()
+        },
+        'regions': {
+            region: {'assemblies': sorted(region_assemblies[region]), **rollup.to_json()}
+            for region, rollup in regions.items()
+        },
+        'total': {'assemblies': len(assemblies), **total.to_json()},
+    }
+
+def save_rollups(data, path, index=None):
+    """Build the rollups and write them (atomically) to path; returns them"""
+    rollups = build_rollups(data, index)
+    dump_json(rollups, path)
+    return rollups
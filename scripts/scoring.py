@@ -0,0 +1,176 @@
+"""
+Vectorized booth scoring.
+
+Scores a whole assembly in a few array operations instead of one booth dict
+at a time. Inputs are laid out booth x party x year:
+
+  votes     - (booths, parties, years) vote counts
+  polled    - (booths, years) POLLED totals
+  contested - (parties, years) bool, True where the party stood that year
+
+score_assembly() returns every _pct share, the weighted and normalised
+_SCORE values, the top-scoring party and the booth category. Shares are
+plain votes / polled divisions, so results match the per-booth code exactly.
+
+How the years are weighted is a scoring model: a WeightScheme declared once
+in MODELS. 'default' is the published 0.2/0.3/0.5 weighting used by
+ingestion; evaluate_models() scores the same shares under several models
+side by side.
+"""
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+YEARS = ['2011', '2016', '2021']
+
+# Year weights for the party score (2011: 0.2, 2016: 0.3, 2021: 0.5)
+YEAR_WEIGHTS = np.array([0.2, 0.3, 0.5])
+
+class WeightScheme(ABC):
+    """Year weights for the party score
+
+    weights() takes the (booths, years) POLLED totals and returns either one
+    weight per year or a (booths, years) array of per-booth weights.
+    """
+
+    @abstractmethod
+    def weights(self, polled):
+        """Weights for the given POLLED totals"""
+
+class FixedWeights(WeightScheme):
+    """The same given weight for each year at every booth"""
+
+    def __init__(self, weights):
+        self.values = np.asarray(weights, dtype=float)
+
+    def weights(self, polled):
+        return self.values
+
+class LinearWeights(FixedWeights):
+    """Weights rising linearly with recency (1, 2, 3, ... normalised to sum to 1)"""
+
+    def __init__(self, years=YEARS):
+        steps = np.arange(1, len(years) + 1, dtype=float)
+        super().__init__(steps / steps.sum())
+
+class ExponentialDecay(FixedWeights):
+    """Weights halving every half_life years back from the latest election"""
+
+    def __init__(self, half_life=5.0, years=YEARS):
+        ages = max(int(year) for year in years) - np.array([int(year) for year in years], dtype=float)
+        decay = 0.5 ** (ages / half_life)
+        super().__init__(decay / decay.sum())
+
+class TurnoutWeighted(WeightScheme):
+    """A base scheme scaled by each booth's POLLED total in each year
+
+    Years with more voters at a booth count for more there. Booths missing a
+    POLLED total for any year keep the base weights.
+    """
+
+    def __init__(self, base=None):
+        self.base = base or FixedWeights(YEAR_WEIGHTS)
+
+    def weights(self, polled):
+        polled = np.asarray(polled, dtype=float)
+        base = np.broadcast_to(self.base.weights(polled), polled.shape)
+        scaled = base * polled
+        total = scaled.sum(axis=-1, keepdims=True)
+        complete = (polled > 0).all(axis=-1, keepdims=True)
+        weights = base.copy()
+        np.divide(scaled * base.sum(axis=-1, keepdims=True), total, out=weights, where=complete & (total > 0))
+        return weights
+
+# Scoring models by name; 'default' is what ingestion publishes
+MODELS = {
+    'default': FixedWeights(YEAR_WEIGHTS),
+    'linear': LinearWeights(),
+    'decay': ExponentialDecay(half_life=5.0),
+    'turnout': TurnoutWeighted(),
+}
+DEFAULT_MODEL = 'default'
+
+# (category, minimum top score), highest first; anything lower is DEFAULT_CATEGORY
+CATEGORY_THRESHOLDS = [('A', 0.50), ('B', 0.30)]
+DEFAULT_CATEGORY = 'C'
+
+# The same with category D (add_category_d.py): C only above 0.20, D below
+CATEGORY_D_THRESHOLDS = CATEGORY_THRESHOLDS + [('C', 0.20)]
+CATEGORY_D = 'D'
+
+def vote_shares(votes, polled):
+    """votes / polled for every booth, party and year (0 where nothing was polled)"""
+    polled = polled[:, np.newaxis, :]
+    shares = np.zeros(np.broadcast_shapes(votes.shape, polled.shape))
+    np.divide(votes, polled, out=shares, where=polled > 0)
+    return shares
+
+def party_scores(shares, contested, weights=YEAR_WEIGHTS):
+    """Year-weighted scores per booth and party, normalised to sum to 1 per booth
+
+    weights is one weight per year or a (booths, years) array.
+    """
+    weights = np.asarray(weights, dtype=float)
+    if weights.ndim == 2:
+        weights = weights[:, np.newaxis, :]
+    raw = np.where(contested, shares * weights, 0.0).sum(axis=-1)
+    total = raw.sum(axis=-1, keepdims=True)
+    scores = raw.copy()
+    np.divide(raw, total, out=scores, where=total > 0)
+    return scores
+
+def categorize(top_values, thresholds=CATEGORY_THRESHOLDS, default=DEFAULT_CATEGORY):
+    """Category label for each top score"""
+    labels = np.full(np.shape(top_values), default, dtype=object)
+    for label, threshold in reversed(thresholds):
+        labels[top_values > threshold] = label
+    return labels
+
+def rank_scores(scores, thresholds=CATEGORY_THRESHOLDS):
+    """Top party index, top score and category for each booth's scores"""
+    if scores.shape[1]:
+        top = scores.argmax(axis=1)
+        top_value = np.take_along_axis(scores, top[:, np.newaxis], axis=1)[:, 0]
+    else:
+        top = np.zeros(len(scores), dtype=int)
+        top_value = np.zeros(len(scores))
+    return {
+        'scores': scores,
+        'top': top,
+        'top_value': top_value,
+        'category': categorize(top_value, thresholds),
+    }
+
+def evaluate_models(shares, polled, contested, models, thresholds=CATEGORY_THRESHOLDS):
+    """Score the same shares under several models
+
+    shares is (booths, parties, years) for the scored parties and contested
+    (parties, years); models maps names to WeightSchemes. Returns {name:
+    dict of scores, top, top_value and category arrays}.
+    """
+    shares = np.asarray(shares, dtype=float)
+    polled = np.asarray(polled, dtype=float)
+    contested = np.asarray(contested, dtype=bool)
+    return {
+        name: rank_scores(party_scores(shares, contested, model.weights(polled)), thresholds)
+        for name, model in models.items()
+    }
+
+def score_assembly(votes, polled, contested, scored=None, model=None, thresholds=CATEGORY_THRESHOLDS):
+    """Score every booth of an assembly at once
+
+    scored lists the party indexes that get a score, in output order (default:
+    all parties). model is a WeightScheme (default: MODELS[DEFAULT_MODEL]).
+    Returns a dict of arrays: shares (booths, parties, years), scores
+    (booths, scored), top (index into scored), top_value and category.
+    """
+    votes = np.asarray(votes, dtype=float)
+    polled = np.asarray(polled, dtype=float)
+    contested = np.asarray(contested, dtype=bool)
+    scored = np.arange(votes.shape[1]) if scored is None else np.asarray(scored, dtype=int)
+    model = model or MODELS[DEFAULT_MODEL]
+
+    shares = vote_shares(votes, polled)
+    result = evaluate_models(shares[:, scored], polled, contested[scored], {'model': model}, thresholds)['model']
+    result['shares'] = shares
+    return result
@@ -0,0 +1,83 @@
+"""
+Per-assembly JSON shards of the dashboard payload for lazy loading.
+
+Written next to the dataset by the export step, in Form20_Localities_Pct.shards/:
+
+  AC_<n>_FINAL.json - one assembly's booths as [PollingStation, ...]
+                      (dashboard_payload.py), compact JSON
+  manifest.json     - per shard, in dataset order: the assembly's id (as the
+                      front end's ac_id), number, name and region, number of
+                      booths, bounding box [min_lat, min_lng, max_lat,
+                      max_lng] of the booth coordinates (null without any),
+                      and the file with its sha256 and size
+
+src/utils/dataProcessing.ts reads the manifest and imports only the
+assemblies a page shows. Shards whose content hash is unchanged are not
+rewritten, and any other .json file in the directory (e.g. the shard of an
+assembly no longer in the dataset) is removed.
+"""
+import hashlib
+import json
+import os
+
+from assembly_index import AssemblyIndex
+from dashboard_payload import polling_station
+from json_writer import atomic_open
+
+MANIFEST = 'manifest.json'
+
+def bounding_box(booths):
+    """[min_lat, min_lng, max_lat, max_lng] of the booths' coordinates, None without any"""
+    points = [(b.get('Latitude'), b.get('Longitude')) for b in booths]
+    points = [(lat, lng) for lat, lng in points if isinstance(lat, (int, float)) and isinstance(lng, (int, float))]
+    if not points:
+        return None
+    lats, lngs = zip(*points)
+    return [min(lats), min(lngs), max(lats), max(lngs)]
+
+def _write_shard(directory, name, value, previous):
+    """Write one compact shard unless its content is unchanged; returns its manifest entry"""
+    content = json.dumps(value, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(content).hexdigest()
+    path = os.path.join(directory, name)
+    if previous.get('sha256') != digest or not os.path.exists(path):
+        with atomic_open(path, 'wb') as f:
+            f.write(content)
+    return {'file': name, 'sha256': digest, 'bytes': len(content)}
+
+def _load_manifest(directory):
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return {'assemblies': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_shards(data, directory, index=None):
+    """Write the per-assembly shards and their manifest to directory; returns the manifest"""
+    index = index or AssemblyIndex(data)
+    os.makedirs(directory, exist_ok=True)
+    previous = _load_manifest(directory)
+
+    assemblies = {}
+    for ref in index:
+        stations = [polling_station(ref.code, i, booth) for i, booth in enumerate(ref.booths)]
+        entry = _write_shard(directory, f'{ref.key}.json', stations,
+                             previous.get('assemblies', {}).get(ref.key, {}))
+        assemblies[ref.key] = {
+            'id': ref.code,
+            'number': ref.number,
+            'name': ref.name,
+            'region': ref.region,
+            'booths': len(ref.booths),
+            'bbox': bounding_box(ref.booths),
+            **entry,
+        }
+    manifest = {'booths': index.total_booths, 'assemblies': assemblies}
+    with atomic_open(os.path.join(directory, MANIFEST)) as f:
+        json.dump(manifest, f, indent=1)
+
+    current = {entry['file'] for entry in assemblies.values()} | {MANIFEST}
+    for name in os.listdir(directory):
+        if name.endswith('.json') and name not in current:
+            os.remove(os.path.join(directory, name))
+    return manifest
@@ -0,0 +1,185 @@
+"""
+Grid spatial index over polygons, for classifying booth coordinates.
+
+Polygons are lists of rings of (lat, lng) points; the first ring is the
+outer boundary and any further rings are holes. Each polygon is registered
+in every grid cell its bounding box touches, so a lookup only tests the few
+polygons sharing the point's cell instead of scanning all of them.
+
+Boundaries can be loaded from GeoJSON (Polygon / MultiPolygon features), so
+region, assembly or ward outlines can be swapped in without code changes.
+
+KDTree answers k-nearest-neighbour queries over booth points.
+"""
+import heapq
+import json
+import math
+from collections import defaultdict
+
+def box_polygon(lat_range, lng_range):
+    """Rectangle polygon from (min, max) latitude and longitude ranges"""
+    (lat0, lat1), (lng0, lng1) = lat_range, lng_range
+    return [[(lat0, lng0), (lat0, lng1), (lat1, lng1), (lat1, lng0)]]
+
+def point_in_ring(lat, lng, ring):
+    """Ray-casting point-in-polygon test for one ring"""
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        lat_i, lng_i = ring[i]
+        lat_j, lng_j = ring[j]
+        if (lng_i > lng) != (lng_j > lng):
+            cross = lat_i + (lng - lng_i) * (lat_j - lat_i) / (lng_j - lng_i)
+            if lat < cross:
+                inside = not inside
+        j = i
+    return inside
+
+def point_in_polygon(lat, lng, rings):
+    """True when the point is inside the outer ring and outside every hole"""
+    if not rings or not point_in_ring(lat, lng, rings[0]):
+        return False
+    return not any(point_in_ring(lat, lng, hole) for hole in rings[1:])
+
+def convex_hull(points):
+    """Convex hull of (lat, lng) points (monotone chain), as a ring"""
+    points = sorted(set(points))
+    if len(points) < 3:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower = []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    upper = []
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+class GridIndex:
+    """Uniform grid over polygon bounding boxes
+
+    cell_size is in degrees; 0.05 (~5 km) suits assembly-sized polygons,
+    smaller cells suit ward-level ones.
+    """
+
+    def __init__(self, cell_size=0.05):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.polygons = []
+
+    def _cell(self, lat, lng):
+        return (math.floor(lat / self.cell_size), math.floor(lng / self.cell_size))
+
+    def insert(self, key, rings):
+        """Register a polygon under key (a key may own several polygons)"""
+        outer = rings[0]
+        bbox = (
+            min(p[0] for p in outer), max(p[0] for p in outer),
+            min(p[1] for p in outer), max(p[1] for p in outer),
+        )
+        slot = len(self.polygons)
+        self.polygons.append((key, rings, bbox))
+        lat_cell0, lng_cell0 = self._cell(bbox[0], bbox[2])
+        lat_cell1, lng_cell1 = self._cell(bbox[1], bbox[3])
+        for lat_cell in range(lat_cell0, lat_cell1 + 1):
+            for lng_cell in range(lng_cell0, lng_cell1 + 1):
+                self.cells[(lat_cell, lng_cell)].append(slot)
+
+    def query(self, lat, lng):
+        """Keys of every polygon containing the point, in insertion order"""
+        keys = []
+        for slot in self.cells.get(self._cell(lat, lng), ()):
+            key, rings, (lat0, lat1, lng0, lng1) = self.polygons[slot]
+            if key in keys or not (lat0 <= lat <= lat1 and lng0 <= lng <= lng1):
+                continue
+            if point_in_polygon(lat, lng, rings):
+                keys.append(key)
+        return keys
+
+    @classmethod
+    def from_polygons(cls, polygons, cell_size=0.05):
+        """Build an index from {key: [rings, ...]}"""
+        index = cls(cell_size)
+        for key, key_polygons in polygons.items():
+            for rings in key_polygons:
+                index.insert(key, rings)
+        return index
+
+def load_geojson_polygons(path, key_property):
+    """Read {key: [rings, ...]} from a GeoJSON FeatureCollection
+
+    key_property names the feature property used as the key. GeoJSON stores
+    [lng, lat]; rings are converted to (lat, lng).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        collection = json.load(f)
+
+    polygons = defaultdict(list)
+    for feature in collection.get('features', []):
+        geometry = feature.get('geometry') or {}
+        key = str(feature.get('properties', {}).get(key_property))
+        if geometry.get('type') == 'Polygon':
+            parts = [geometry['coordinates']]
+        elif geometry.get('type') == 'MultiPolygon':
+            parts = geometry['coordinates']
+        else:
+            continue
+        for part in parts:
+            polygons[key].append([[(lat, lng) for lng, lat, *_ in ring] for ring in part])
+    return dict(polygons)
+
+class KDTree:
+    """Static 2-d tree over (lat, lng) points for k-nearest-neighbour queries
+
+    items are arbitrary payloads stored alongside the points. Distances are
+    plain Euclidean in degrees, which is fine at booth-to-booth scale.
+    """
+
+    def __init__(self, points, items=None):
+        items = list(range(len(points))) if items is None else list(items)
+        self.size = len(points)
+        self.root = self._build(list(zip(points, items)), 0)
+
+    def _build(self, nodes, depth):
+        if not nodes:
+            return None
+        axis = depth % 2
+        nodes.sort(key=lambda node: node[0][axis])
+        mid = len(nodes) // 2
+        point, item = nodes[mid]
+        return (point, item, axis, self._build(nodes[:mid], depth + 1), self._build(nodes[mid + 1:], depth + 1))
+
+    def nearest(self, lat, lng, k=1, accept=None):
+        """Up to k (distance, point, item) tuples nearest to the point, closest first
+
+        accept, if given, is called with an item and must return True for the
+        item to be counted; rejected points are skipped without ending the search.
+        """
+        best = []  # max-heap of (-dist2, order, point, item)
+        order = 0
+        stack = [(self.root, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            # bound is the squared distance to the splitting plane that led here
+            if node is None or (len(best) == k and bound >= -best[0][0]):
+                continue
+            point, item, axis, left, right = node
+            d2 = (point[0] - lat) ** 2 + (point[1] - lng) ** 2
+            if accept is None or accept(item):
+                if len(best) < k:
+                    heapq.heappush(best, (-d2, order, point, item))
+                elif d2 < -best[0][0]:
+                    heapq.heapreplace(best, (-d2, order, point, item))
+                order += 1
+            delta = (lat, lng)[axis] - point[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            stack.append((far, max(bound, delta * delta)))
+            stack.append((near, bound))
+        return [(math.sqrt(-d2), point, item) for d2, _, point, item in sorted(best, key=lambda b: (-b[0], b[1]))]
@@ -0,0 +1,265 @@
+"""
+What-if swing simulator over the booth scores.
+
+Loads every booth's *_SCORE values into a booths x slots matrix: each row
+holds the scores of the parties that booth has, with slots mapping them to
+party indexes (parties are the union over all assemblies). A scenario is a
+set of transfers, e.g. 0.03 of score from DMK to BJP, applied either to
+every booth or to one group of booths (locality, assembly or region). A
+transfer only applies at booths where both parties have a score: a party
+gains nothing where it did not stand, and no score moves towards (and
+vanishes into) a party that did not stand. Nor does a transfer move more
+than the giving party has in a booth: the receiving party gains exactly
+what the other loses, so a booth's total score never changes. Scenarios are
+evaluated in chunks as one scenarios x booths x slots array: the transfers
+are applied one after another, each capped per booth, and the top party and
+its renormalised score (and so the A/B/C/D category of add_category_d.py)
+recomputed for every booth at once. Booths without scores have no top
+party or category and are left out of the totals.
+
+Usage:
+  python swing_simulator.py --swing DMK:BJP:0.03
+  python swing_simulator.py --by locality --swing AINRC:INC:0.05@MANALIPET
+  python swing_simulator.py --sweep DMK:BJP:0:0.2:2001
+"""
+import argparse
+import time
+
+import numpy as np
+
+from assembly_index import load_index
+from models import load_assemblies
+from scoring import CATEGORY_D, CATEGORY_D_THRESHOLDS
+
+CATEGORIES = [label for label, _ in CATEGORY_D_THRESHOLDS] + [CATEGORY_D]
+
+GROUPINGS = ['assembly', 'locality', 'region']
+
+def _number(value):
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+class BoothScores:
+    """Booth scores over the whole dataset, one row per booth
+
+    scores[b, k] is the score of party slots[b, k]; unused slots point at
+    the padding party index len(parties) and score 0. Rows follow dataset
+    order; keys[b] is (ac_key, booth index) and groups holds, for each
+    grouping, the label of every booth.
+    """
+
+    def __init__(self, parties, slots, scores, keys, groups):
+        self.parties = parties
+        self.party_index = {party: i for i, party in enumerate(parties)}
+        self.slots = slots
+        self.scores = scores
+        self.keys = keys
+        self.groups = groups
+
+    @classmethod
+    def from_dataset(cls, assemblies, index):
+        parties = []
+        party_index = {}
+        rows = []
+        keys = []
+        groups = {grouping: [] for grouping in GROUPINGS}
+        for assembly in assemblies:
+            region = index.region(assembly.key) or 'Unknown'
+            for idx, booth in enumerate(assembly.booths):
+                row = {}
+                for party, score in zip(booth.score_parties, booth.scores):
+                    if party not in party_index:
+                        party_index[party] = len(parties)
+                        parties.append(party)
+                    row[party_index[party]] = _number(score)
+                rows.append(row)
+                keys.append((assembly.key, idx))
+                groups['assembly'].append(assembly.key)
+                groups['locality'].append(booth.locality or 'Unknown')
+                groups['region'].append(region)
+
+        width = max((len(row) for row in rows), default=0)
+        slots = np.full((len(rows), width), len(parties), dtype=np.intp)
+        scores = np.zeros((len(rows), width))
+        for b, row in enumerate(rows):
+            slots[b, :len(row)] = list(row)
+            scores[b, :len(row)] = list(row.values())
+        return cls(parties, slots, scores, keys, groups)
+
+    def transfer_slots(self, transfers, grouping='locality'):
+        """(source, target, active) locating each transfer in every booth
+
+        transfers are (from_party, to_party, group or None) tuples; group is a
+        label of grouping (matched case-insensitively). All three arrays are
+        (transfers, booths): source and target hold the slots of the two
+        parties, and active is False where the transfer is skipped (outside
+        its group, or where either party has no score). Raises KeyError for
+        an unknown party and ValueError for an unknown group.
+        """
+        shape = (len(transfers), len(self.slots))
+        source_slots = np.zeros(shape, dtype=np.intp)
+        target_slots = np.zeros(shape, dtype=np.intp)
+        active = np.zeros(shape, dtype=bool)
+        labels = None
+        for j, (source, target, group) in enumerate(transfers):
+            has_source = self.slots == self.party_index[source]
+            has_target = self.slots == self.party_index[target]
+            source_slots[j] = has_source.argmax(axis=1)
+            target_slots[j] = has_target.argmax(axis=1)
+            active[j] = has_source.any(axis=1) & has_target.any(axis=1)
+            if group is not None:
+                if labels is None:
+                    labels = np.array([label.upper() for label in self.groups[grouping]])
+                in_group = labels == group.upper()
+                if not in_group.any():
+                    raise ValueError(f"no {grouping} named '{group}'")
+                active[j] &= in_group
+        return source_slots, target_slots, active
+
+class SimulationResult:
+    """Outcome of a batch of scenarios
+
+    top (scenarios, booths) holds party indexes and category (scenarios,
+    booths) indexes into CATEGORIES; a booth without scores has
+    len(parties) and len(CATEGORIES) instead. wins and category_counts are
+    the per-scenario totals over the booths with scores.
+    """
+
+    def __init__(self, parties, top, top_value, category):
+        self.parties = parties
+        self.top = top
+        self.top_value = top_value
+        self.category = category
+        # The last column counts the booths without scores; not reported
+        self.wins = _row_counts(top, len(parties) + 1)[:, :-1]
+        self.category_counts = _row_counts(category, len(CATEGORIES) + 1)[:, :-1]
+
+def _row_counts(values, size):
+    """Per-row bincount of a (rows, n) array of indexes < size"""
+    rows = len(values)
+    offsets = values.astype(np.int64) + (np.arange(rows) * size)[:, np.newaxis]
+    return np.bincount(offsets.ravel(), minlength=rows * size).reshape(rows, size)
+
+def simulate(board, amounts, transfers, chunk_size=64):
+    """Apply a batch of swing scenarios to every booth
+
+    amounts is (scenarios, transfers): how much each transfer moves in each
+    scenario (a negative amount moves score the other way); transfers comes
+    from board.transfer_slots() for the same transfers. In each booth a
+    transfer moves at most what the giving party has left after the
+    transfers before it. Returns a SimulationResult.
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    source_slots, target_slots, active = transfers
+    thresholds = np.array([threshold for _, threshold in CATEGORY_D_THRESHOLDS])
+    scores = np.maximum(board.scores, 0.0)
+    booths = len(scores)
+    rows = np.arange(booths)
+    total = scores.sum(axis=1)
+    scored = total > 0
+
+    top = np.empty((len(amounts), booths), dtype=np.int32)
+    top_value = np.empty((len(amounts), booths))
+    for start in range(0, len(amounts), chunk_size):
+        chunk = amounts[start:start + chunk_size]
+        # (scenarios, booths, slots) scores; the transfer count is small
+        value = np.repeat(scores[np.newaxis], len(chunk), axis=0)
+        for j in range(chunk.shape[1]):
+            source = value[:, rows, source_slots[j]]
+            target = value[:, rows, target_slots[j]]
+            moved = np.clip(chunk[:, j, np.newaxis] * active[j], -target, source)
+            value[:, rows, source_slots[j]] = source - moved
+            value[:, rows, target_slots[j]] = target + moved
+        best_slot = value.argmax(axis=2)
+        best = np.take_along_axis(value, best_slot[..., np.newaxis], axis=2)[..., 0]
+        # Transfers keep each booth's total, so only the top score needs renormalising
+        np.divide(best, total, out=best, where=scored)
+        best[:, ~scored] = 0.0
+        top[start:start + len(chunk)] = board.slots[rows, best_slot]
+        top_value[start:start + len(chunk)] = best
+
+    # Number of thresholds not exceeded = index into CATEGORIES
+    category = (top_value[..., np.newaxis] <= thresholds).sum(axis=-1).astype(np.int8)
+    top[:, ~scored] = len(board.parties)
+    category[:, ~scored] = len(CATEGORIES)
+    return SimulationResult(board.parties, top, top_value, category)
+
+def _parse_parts(text, spec, count):
+    parts = text.split(':')
+    if len(parts) != count or not parts[0] or not parts[1]:
+        raise argparse.ArgumentTypeError(f"expected {spec}, got '{text}'")
+    return parts
+
+def _parse_number(value, kind=float):
+    try:
+        return kind(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a valid {kind.__name__}") from None
+
+def parse_transfer(text):
+    """argparse type: 'FROM:TO:AMOUNT[@GROUP]' -> (from, to, amount, group or None)"""
+    spec, _, group = text.partition('@')
+    source, target, amount = _parse_parts(spec, 'FROM:TO:AMOUNT[@GROUP]', 3)
+    return source.upper(), target.upper(), _parse_number(amount), group or None
+
+def parse_sweep(text):
+    """argparse type: 'FROM:TO:START:STOP:STEPS' -> (from, to, start, stop, steps)"""
+    source, target, start, stop, steps = _parse_parts(text, 'FROM:TO:START:STOP:STEPS', 5)
+    steps = _parse_number(steps, int)
+    if steps < 1:
+        raise argparse.ArgumentTypeError(f"STEPS must be at least 1, got {steps}")
+    return source.upper(), target.upper(), _parse_number(start), _parse_number(stop), steps
+
+def print_result(board, result, labels):
+    baseline = simulate(board, np.zeros((1, 0)), board.transfer_slots([]))
+    base_wins = baseline.wins[0]
+    for s, label in enumerate(labels):
+        changed = int((result.top[s] != baseline.top[0]).sum())
+        leaders = np.argsort(-result.wins[s])[:5]
+        wins = ', '.join(f"{board.parties[p]}={result.wins[s][p]} ({result.wins[s][p] - base_wins[p]:+d})"
+                         for p in leaders)
+        categories = ', '.join(f"{c}={n}" for c, n in zip(CATEGORIES, result.category_counts[s]))
+        print(f"{label}: {changed} booths change hands | {wins} | {categories}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate vote swings over every booth score')
+    parser.add_argument('--swing', action='append', default=[], type=parse_transfer,
+                        metavar='FROM:TO:AMOUNT[@GROUP]',
+                        help='move AMOUNT of score from one party to another, in every booth or only in GROUP '
+                             '(all --swing options form one scenario)')
+    parser.add_argument('--sweep', type=parse_sweep, metavar='FROM:TO:START:STOP:STEPS',
+                        help='one uniform scenario per swing amount in numpy.linspace(START, STOP, STEPS)')
+    parser.add_argument('--by', choices=GROUPINGS, default='locality',
+                        help='what @GROUP in --swing refers to (default: locality)')
+    args = parser.parse_args()
+    if not args.swing and not args.sweep:
+        parser.error('give at least one --swing or a --sweep')
+
+    data, index = load_index()
+    board = BoothScores.from_dataset(load_assemblies(data, index), index)
+    print(f"Loaded {len(board.keys)} booths x {len(board.parties)} parties")
+
+    try:
+        if args.sweep:
+            source, target, start, stop, steps = args.sweep
+            transfers = board.transfer_slots([(source, target, None)])
+            amounts = np.linspace(start, stop, steps)[:, np.newaxis]
+            labels = [f"{source}->{target} {amount:+.4f}" for amount in amounts[:, 0]]
+        else:
+            transfers = board.transfer_slots(
+                [(source, target, group) for source, target, _, group in args.swing], args.by)
+            amounts = np.array([[amount for _, _, amount, _ in args.swing]])
+            labels = [' + '.join(f"{source}->{target} {amount:+g}" + (f"@{group}" if group else '')
+                                 for source, target, amount, group in args.swing)]
+    except KeyError as e:
+        parser.error(f"unknown party {e} (known: {', '.join(board.parties)})")
+    except ValueError as e:
+        parser.error(str(e))
+
+    started = time.perf_counter()
+    result = simulate(board, amounts, transfers)
+    elapsed = time.perf_counter() - started
+    print_result(board, result, labels)
+    print(f"\n{len(amounts)} scenarios in {elapsed:.3f}s ({len(amounts) / elapsed:,.0f} scenarios/s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Shared fixtures for the pipeline tests.
+
+The scripts import each other as top-level modules (they are run from the
+data directory with scripts/ on the path), so the tests do the same.
+"""
+import copy
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def booth(name, lat, lng, **fields):
+    entry = {'PS_NO_2021': name, 'LOCALITY_EXTRACTED': name.split()[-1], 'Latitude': lat, 'Longitude': lng}
+    entry.update(fields)
+    return entry
+
+SAMPLE = {
+    'AC_1_FINAL': [
+        booth('GOVT. PRIMARY SCHOOL MANNADIPET', 11.95, 79.62, POLLED_2021=800, NRC_2021=400, DMK_2021=300,
+              NRC_2021_pct=0.5, DMK_2021_pct=0.375, TOP_SCORE_PARTY='NRC', TOP_SCORE_CATEGORY='B'),
+        booth('GOVT. HIGH SCHOOL THIRUKANUR', 11.96, 79.61, POLLED_2021=600, NRC_2021=200, DMK_2021=350,
+              NRC_2021_pct=0.3333333333333333, DMK_2021_pct=0.5833333333333334,
+              TOP_SCORE_PARTY='DMK', TOP_SCORE_CATEGORY='A'),
+        booth('ANGANWADI CENTRE KATTERIKUPPAM', 11.97, 79.60, POLLED_2021=500, NRC_2021=250, DMK_2021=150,
+              NRC_2021_pct=0.5, DMK_2021_pct=0.3, TOP_SCORE_PARTY='NRC', TOP_SCORE_CATEGORY='B'),
+    ],
+    'AC_2_FINAL': [
+        booth('GOVT. MIDDLE SCHOOL THIRUBHUVANAI', 11.92, 79.65, POLLED_2021=700, NRC_2021=300, DMK_2021=300),
+        booth('GOVT. MIDDLE SCHOOL THIRUBHUVANAI', 11.92, 79.65, POLLED_2021=650, NRC_2021=330, DMK_2021=250),
+    ],
+    'NRC_LT35_ALL_ASSEMBLIES': [
+        {'AC': '2', 'PS_NAME/PS_NO': 'GOVT. MIDDLE SCHOOL THIRUBHUVANAI', 'NRC_2021_pct': 0.3},
+    ],
+}
+
+@pytest.fixture
+def sample_dataset():
+    """A small dataset in the export's shape: two assemblies and one *_LT35 list"""
+    return copy.deepcopy(SAMPLE)
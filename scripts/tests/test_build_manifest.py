@@ -0,0 +1,22 @@
+from build_manifest import code_modules
+
+def test_code_modules_follow_the_ingestion_imports():
+    modules = code_modules()
+    for name in ('process_missing_assemblies.py', 'assembly_index.py', 'assembly_specs.py', 'gazetteer.py',
+                 'scoring.py', 'workbook_reader.py'):
+        assert name in modules
+    for name in ('dataset_store.py', 'dataset_exports.py', 'build_manifest.py', 'rollups.py'):
+        assert name not in modules
+
+def test_code_modules_are_transitive(tmp_path):
+    sources = {
+        'ingest': 'import os\nfrom helper import f\nimport dataset_store\n',
+        'helper': 'def f():\n    from deep import g\n',
+        'deep': 'import numpy as np\n',
+        'dataset_store': 'import only_saving\n',
+        'only_saving': '',
+        'unused': '',
+    }
+    for name, source in sources.items():
+        (tmp_path / f'{name}.py').write_text(source)
+    assert code_modules('ingest', str(tmp_path)) == ['deep.py', 'helper.py', 'ingest.py']
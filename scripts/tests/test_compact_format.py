@@ -0,0 +1,52 @@
+import json
+import os
+
+import pytest
+
+from compact_format import (DERIVED, QUANTIZED, compare_decoded, decode_dataset, encode_dataset, export_compact,
+                            load_compact)
+
+DATASET = os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'data', 'Form20_Localities_Pct.json')
+
+def test_lossless_without_precision(sample_dataset):
+    sample_dataset['AC_1_FINAL'][1]['NRC_SCORE'] = 0.123456789
+    sample_dataset['AC_2_FINAL'][0]['Latitude'] = 'NEW_BOOTH'
+    sample_dataset['META'] = {'version': 3}
+    decoded = decode_dataset(encode_dataset(sample_dataset, precision=None))
+    assert json.dumps(decoded) == json.dumps(sample_dataset)
+
+def test_shares_are_derived_or_quantized(sample_dataset):
+    entry = sample_dataset['AC_1_FINAL'][0]
+    entry['NRC_SCORE'] = 0.123456789
+    compact = encode_dataset(sample_dataset, precision=4)
+    fields = compact['fields']
+    ids, kinds = compact['layouts'][compact['keys']['AC_1_FINAL'][0][0]]
+    kind = dict(zip((fields[i] for i in ids), kinds))
+    # 400 / 800 reproduces NRC_2021_pct exactly, so it is not stored
+    assert kind['NRC_2021_pct'] == DERIVED
+    assert kind['NRC_SCORE'] == QUANTIZED
+
+    decoded = decode_dataset(compact)['AC_1_FINAL'][0]
+    assert list(decoded) == list(entry)
+    assert decoded['NRC_2021_pct'] == 0.5
+    assert decoded['NRC_SCORE'] == 0.1235
+    assert compare_decoded(sample_dataset, decode_dataset(compact), 4) == (0, pytest.approx(0.000043211))
+
+def test_rejects_other_formats(sample_dataset):
+    compact = encode_dataset(sample_dataset)
+    compact['version'] += 1
+    with pytest.raises(ValueError):
+        decode_dataset(compact)
+
+def test_dataset_round_trip(tmp_path):
+    with open(DATASET, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    path = str(tmp_path / 'compact.json')
+    export_compact(data, path, precision=4)
+    mismatches, largest = compare_decoded(data, load_compact(path), 4)
+    assert mismatches == 0
+    assert largest <= 0.5e-4 + 1e-12
+    assert os.path.getsize(path) * 5 < os.path.getsize(DATASET)
+
+    export_compact(data, path, precision=None)
+    assert json.dumps(load_compact(path)) == json.dumps(data)
@@ -0,0 +1,10 @@
+from dashboard_payload import build_payload
+
+def test_polling_station_shape(sample_dataset):
+    station = build_payload(sample_dataset)['stations']['1'][0]
+    assert station['id'] == '1_GOVT. PRIMARY SCHOOL MANNADIPET'
+    assert (station['latitude'], station['longitude']) == (11.95, 79.62)
+    assert station['strongestParty'] == 'NRC'
+    assert station['election2021']['candidates'] == {'NRC': 0.5, 'DMK': 0.375}
+    assert station['election2021']['total_votes'] == 800
+    assert station['election2011'] == {'year': 2011, 'total_votes': 0, 'candidates': {}}
@@ -0,0 +1,108 @@
+import copy
+import json
+import os
+
+import pytest
+
+from dataset_delta import (apply_delta, apply_ops, content_digest, diff_datasets, load_chain, make_delta,
+                           record_version, update_to_head)
+
+def round_trip(old, new):
+    ops = diff_datasets(old, new)
+    assert apply_ops(copy.deepcopy(old), ops) == new
+    return ops
+
+def test_identical_datasets_have_no_ops(sample_dataset):
+    assert diff_datasets(sample_dataset, copy.deepcopy(sample_dataset)) == []
+
+def test_field_changes(sample_dataset):
+    new = copy.deepcopy(sample_dataset)
+    new['AC_1_FINAL'][1]['Latitude'] = 11.5
+    new['AC_1_FINAL'][1]['NEW_FIELD'] = 1
+    del new['AC_1_FINAL'][1]['TOP_SCORE_CATEGORY']
+    ops = round_trip(sample_dataset, new)
+    assert {(op['op'], op['path']) for op in ops} == {
+        ('replace', '/AC_1_FINAL/1/Latitude'),
+        ('add', '/AC_1_FINAL/1/NEW_FIELD'),
+        ('remove', '/AC_1_FINAL/1/TOP_SCORE_CATEGORY'),
+    }
+
+def test_int_and_float_values_differ(sample_dataset):
+    new = copy.deepcopy(sample_dataset)
+    new['AC_2_FINAL'][0]['POLLED_2021'] = 700.0
+    assert [op['path'] for op in round_trip(sample_dataset, new)] == ['/AC_2_FINAL/0/POLLED_2021']
+
+def test_inserted_and_removed_booths_do_not_shift_the_rest(sample_dataset):
+    new = copy.deepcopy(sample_dataset)
+    del new['AC_1_FINAL'][0]
+    new['AC_1_FINAL'].insert(1, dict(new['AC_1_FINAL'][0], PS_NO_2021='NEW BOOTH'))
+    ops = round_trip(sample_dataset, new)
+    assert [(op['op'], op['path']) for op in ops] == [('remove', '/AC_1_FINAL/0'), ('add', '/AC_1_FINAL/1')]
+
+def test_duplicate_booth_names_are_matched_by_occurrence(sample_dataset):
+    new = copy.deepcopy(sample_dataset)
+    new['AC_2_FINAL'][1]['DMK_2021'] = 260
+    assert [op['path'] for op in round_trip(sample_dataset, new)] == ['/AC_2_FINAL/1/DMK_2021']
+
+def test_reordered_booths_replace_the_assembly(sample_dataset):
+    new = copy.deepcopy(sample_dataset)
+    new['AC_1_FINAL'].reverse()
+    assert [(op['op'], op['path']) for op in round_trip(sample_dataset, new)] == [('replace', '/AC_1_FINAL')]
+
+def test_keys_and_pointer_escaping(sample_dataset):
+    new = copy.deepcopy(sample_dataset)
+    new['NRC_LT35_ALL_ASSEMBLIES'][0]['PS_NAME/PS_NO'] = 'RENAMED'
+    del new['AC_2_FINAL']
+    new['AC_3_FINAL'] = []
+    ops = round_trip(sample_dataset, new)
+    assert '/NRC_LT35_ALL_ASSEMBLIES/0/PS_NAME~1PS_NO' in [op['path'] for op in ops]
+
+def test_change_log(sample_dataset):
+    new = copy.deepcopy(sample_dataset)
+    new['AC_1_FINAL'][2]['Latitude'] = 12.0
+    new['AC_1_FINAL'][2]['Longitude'] = 79.0
+    del new['AC_1_FINAL'][0]
+    delta = make_delta(content_digest(sample_dataset), sample_dataset, content_digest(new), new)
+    assert delta['changes'] == [
+        {'key': 'AC_1_FINAL', 'booth': 'GOVT. PRIMARY SCHOOL MANNADIPET', 'change': 'removed'},
+        {'key': 'AC_1_FINAL', 'booth': 'ANGANWADI CENTRE KATTERIKUPPAM', 'change': 'modified',
+         'fields': ['Latitude', 'Longitude']},
+    ]
+
+def test_apply_delta_checks_the_base(sample_dataset):
+    new = copy.deepcopy(sample_dataset)
+    new['AC_1_FINAL'][0]['Latitude'] = 12.0
+    delta = make_delta(content_digest(sample_dataset), sample_dataset, content_digest(new), new)
+    with pytest.raises(ValueError):
+        apply_delta(delta, copy.deepcopy(new), content_digest(new))
+    result = apply_delta(delta, copy.deepcopy(sample_dataset), content_digest(sample_dataset))
+    assert content_digest(result) == delta['target']
+
+def test_version_chain(sample_dataset, tmp_path):
+    chain_dir = str(tmp_path / 'deltas')
+    versions = [copy.deepcopy(sample_dataset)]
+    assert record_version(versions[0], chain_dir) is None
+    assert record_version(versions[0], chain_dir) is None
+    assert load_chain(chain_dir)['deltas'] == []
+
+    for lat in (12.0, 12.5):
+        version = copy.deepcopy(versions[-1])
+        version['AC_1_FINAL'][0]['Latitude'] = lat
+        assert record_version(version, chain_dir) is not None
+        versions.append(version)
+    # Unchanged data adds no delta
+    assert record_version(copy.deepcopy(versions[-1]), chain_dir) is None
+
+    chain = load_chain(chain_dir)
+    assert chain['head']['version'] == 3
+    assert [entry['file'] for entry in chain['deltas']] == ['v0002.json', 'v0003.json']
+    assert sorted(os.listdir(chain_dir)) == ['head.json', 'index.json', 'v0002.json', 'v0003.json']
+    with open(os.path.join(chain_dir, 'head.json'), encoding='utf-8') as f:
+        assert json.load(f) == versions[-1]
+
+    for version in versions:
+        data = copy.deepcopy(version)
+        update_to_head(data, chain_dir)
+        assert data == versions[-1]
+    with pytest.raises(ValueError):
+        update_to_head({'AC_9_FINAL': []}, chain_dir)
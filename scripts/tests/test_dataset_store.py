@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from dataset_store import from_table, load_dataset, open_store, to_table, write_store
+
+def mixed_dataset():
+    return {
+        'AC_1_FINAL': [
+            {'PS_NO_2021': 'SCHOOL A', 'Latitude': 11.95, 'NRC_2021_pct': 0, 'POLLED_2021': 800, 'NOTE': 'x'},
+            {'PS_NO_2021': 'SCHOOL B', 'Latitude': None, 'NRC_2021_pct': 0.5, 'POLLED_2021': 600, 'NOTE': 3},
+        ],
+        'AC_2_FINAL': [
+            {'NRC_2021_pct': 1, 'PS_NO_2021': 'SCHOOL C', 'Latitude': 'NEW_BOOTH', 'FLAG': True},
+            {'PS_NO_2021': 'SCHOOL D', 'NRC_2021_pct': 0.0},
+        ],
+        'NRC_LT35_ALL_ASSEMBLIES': [],
+    }
+
+def test_round_trip_keeps_types_and_field_order(sample_dataset):
+    for data in (mixed_dataset(), sample_dataset):
+        # json.dumps tells 0 from 0.0 and sees key order
+        assert json.dumps(from_table(to_table(data))) == json.dumps(data)
+
+def test_mixed_numbers_stay_numeric(tmp_path):
+    path = str(tmp_path / 'store.arrow')
+    write_store(mixed_dataset(), path)
+    table = open_store(path, columns=['NRC_2021_pct'], keys=['AC_2_FINAL'])
+    assert table.column('NRC_2021_pct').to_pylist() == [1.0, 0.0]
+    assert [entry['NRC_2021_pct'] for entry in from_table(table)['AC_2_FINAL']] == [1, 0.0]
+
+def test_load_dataset_falls_back_to_the_store(tmp_path):
+    store_path = str(tmp_path / 'store.arrow')
+    write_store(mixed_dataset(), store_path)
+    loaded = load_dataset(store_path, str(tmp_path / 'missing.json'))
+    assert json.dumps(loaded) == json.dumps(mixed_dataset())
@@ -0,0 +1,137 @@
+import json
+import threading
+
+import pytest
+
+import firestore_loader
+from firestore_loader import build_writes, commit_batch, load_batches, make_batches
+
+class FakeBatch:
+    def __init__(self, client):
+        self.client = client
+        self.writes = []
+
+    def set(self, ref, fields, merge=False):
+        self.writes.append((ref, fields, merge))
+
+    def commit(self):
+        self.client.commit(self.writes)
+
+class FakeClient:
+    """Stands in for firestore.Client: documents are their paths, commits are recorded
+
+    fail maps a document path to the number of times a commit holding it
+    raises error before it goes through.
+    """
+    def __init__(self, fail=None, error=ConnectionError):
+        self.fail = dict(fail or {})
+        self.error = error
+        self.documents = {}
+        self.commits = 0
+        self.lock = threading.Lock()
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def document(self, path):
+        return path
+
+    def commit(self, writes):
+        with self.lock:
+            for path, _, _ in writes:
+                if self.fail.get(path):
+                    self.fail[path] -= 1
+                    raise self.error(f'commit failed at {path}')
+            self.commits += 1
+            for path, fields, merge in writes:
+                self.documents[path] = {**self.documents.get(path, {}), **fields} if merge else fields
+
+def test_build_writes_flat(sample_dataset):
+    writes = build_writes(sample_dataset, updated_at='2026-01-01T00:00:00.000Z')
+    assert [path for path, _, _ in writes] == [
+        'assemblies/1', 'pollingStations/1-1', 'pollingStations/1-2', 'pollingStations/1-3',
+        'assemblies/2', 'pollingStations/2-1', 'pollingStations/2-2',
+    ]
+    path, assembly, merge = writes[0]
+    assert merge
+    assert assembly == {'id': '1', 'name': 'Mannadipet', 'number': 1, 'sheetName': 'AC_1_FINAL',
+                        'updatedAt': '2026-01-01T00:00:00.000Z'}
+
+    _, station, merge = writes[1]
+    assert not merge
+    assert (station['id'], station['ac_id'], station['ps_no']) == ('1-1', '1', '1')
+    assert station['strongestParty'] == station['top_party'] == 'NRC'
+    assert station['category'] == 'B'
+    assert station['election2021']['candidates']['NRC'] == 0.5
+    assert station['election2021']['candidates']['BJP'] == 0
+    assert station['original_data'] == sample_dataset['AC_1_FINAL'][0]
+
+def test_build_writes_layouts(sample_dataset):
+    assert 'updatedAt' not in build_writes(sample_dataset)[0][1]
+    paths = [path for path, _, _ in build_writes(sample_dataset, 'hierarchical')]
+    assert paths[:2] == ['assemblies/1', 'assemblies/1/polling_stations/1-1']
+    both = build_writes(sample_dataset, 'both')
+    assert len(both) == 2 + 2 * 5
+    assert both[1][1] == both[2][1]
+
+def test_make_batches():
+    writes = list(range(1201))
+    assert [len(batch) for batch in make_batches(writes)] == [500, 500, 201]
+    assert make_batches(writes, 400)[2] == list(range(800, 1200))
+    assert make_batches([]) == []
+    for size in (0, 501):
+        with pytest.raises(ValueError):
+            make_batches(writes, size)
+
+def test_commit_batch_retries(sample_dataset):
+    writes = build_writes(sample_dataset)
+    client = FakeClient(fail={'pollingStations/1-2': 2})
+    delays = []
+    assert commit_batch(client, writes, retries=3, sleep=delays.append) == 2
+    assert client.commits == 1
+    assert len(delays) == 2 and delays[0] <= firestore_loader.BACKOFF_BASE <= delays[1]
+
+    client = FakeClient(fail={'pollingStations/1-2': 2})
+    with pytest.raises(ConnectionError):
+        commit_batch(client, writes, retries=1, sleep=delays.append)
+    assert client.commits == 0
+
+    # Errors that are not transient are not retried
+    client = FakeClient(fail={'pollingStations/1-2': 1}, error=ValueError)
+    with pytest.raises(ValueError):
+        commit_batch(client, writes, retries=3, sleep=delays.append)
+
+def test_resume_from_checkpoint(tmp_path, sample_dataset):
+    checkpoint = str(tmp_path / 'checkpoint.json')
+    batches = make_batches(build_writes(sample_dataset), 2)
+    assert len(batches) == 4
+
+    # The third batch fails outright; the first two stay recorded
+    client = FakeClient(fail={batches[2][0][0]: 1})
+    with pytest.raises(ConnectionError):
+        load_batches(client, 'demo', batches, checkpoint, jobs=1, retries=0)
+    with open(checkpoint, encoding='utf-8') as f:
+        assert len(json.load(f)['committed']) == 2
+    assert client.commits == 2
+
+    # The rerun only commits what is missing, then removes the checkpoint
+    assert load_batches(client, 'demo', batches, checkpoint, jobs=1, retries=0) == (2, 2, 0)
+    assert client.commits == 4
+    assert not (tmp_path / 'checkpoint.json').exists()
+    expected = {path: fields for batch in batches for path, fields, _ in batch}
+    assert client.documents == expected
+
+def test_checkpoint_is_per_project(tmp_path, sample_dataset):
+    checkpoint = str(tmp_path / 'checkpoint.json')
+    batches = make_batches(build_writes(sample_dataset), 2)
+    client = FakeClient(fail={batches[3][0][0]: 1})
+    with pytest.raises(ConnectionError):
+        load_batches(client, 'demo', batches, checkpoint, jobs=1, retries=0)
+    assert load_batches(FakeClient(), 'other', batches, checkpoint, jobs=1, retries=0) == (4, 0, 0)
+
+def test_parallel_load(tmp_path, sample_dataset):
+    batches = make_batches(build_writes(sample_dataset, 'both'), 1)
+    client = FakeClient()
+    done, skipped, retried = load_batches(client, 'demo', batches, str(tmp_path / 'checkpoint.json'), jobs=4)
+    assert (done, skipped, retried) == (len(batches), 0, 0)
+    assert len(client.documents) == len(batches)
@@ -0,0 +1,21 @@
+import pytest
+
+from gazetteer import extract_locality
+
+@pytest.mark.parametrize('name, locality', [
+    # Removing one pattern exposes a match for a later one
+    ('MIDDLE GOVT. SCHOOL VILLIANUR-3', 'VILLIANUR'),
+    ('HIGH GOVERNMENT SCHOOL ARIYUR', 'ARIYUR'),
+    # A later pattern matches text an earlier one left behind
+    ('ST-12PUDUCHERRY', 'ST'),
+    ('GOVT. PRIMARY SCHOOL MANNADIPET', 'MANNADIPET'),
+    ('GOVT. HIGH SCHOOL (NORTH) THIRUKANUR', 'THIRUKANUR'),
+    ('Govt. Middle School, Kurusukuppam, Puducherry-12', ', KURUSUKUPPAM,'),
+    ('COMMUNITY HALL SAVITHRI NAGAR YANAM-1', 'SAVITHRI NAGAR'),
+    ('ANGANWADI CENTRE KATTERIKUPPAM-2', 'CENTRE KATTERIKUPPAM'),
+    ('GOVT. PRIMARY SCHOOL', 'Unknown'),
+    ('', 'Unknown'),
+    (None, 'Unknown'),
+])
+def test_extract_locality(name, locality):
+    assert extract_locality(name) == locality
@@ -0,0 +1,107 @@
+import pytest
+
+from conftest import booth
+from impute_coordinates import (COORD_SOURCE, FALLBACK_STEP, PLACEHOLDER_STEP, impute_coordinates, placeholder_base,
+                                placeholder_bases)
+from process_missing_assemblies import ASSEMBLY_DEFAULTS, REGION_COORDS
+
+def placeholder(base, ps_num):
+    return base['lat'] + ps_num * PLACEHOLDER_STEP[0], base['lng'] + ps_num * PLACEHOLDER_STEP[1]
+
+def test_placeholder_base_tolerates_float_rounding():
+    base = REGION_COORDS['RAJ BHAVAN']
+    lat, lng = placeholder(base, 7)
+    bases = placeholder_bases()
+    assert placeholder_base(round(lat, 10), round(lng, 10), bases) == (base['lat'], base['lng'])
+    assert placeholder_base(lat + 1e-12, lng - 1e-12, bases) == (base['lat'], base['lng'])
+    assert placeholder_base(lat + 1e-4, lng, bases) is None
+
+def test_needs_min_neighbours_from_the_locality():
+    data = {'AC_1_FINAL': [
+        booth('SCHOOL A', 11.90, 79.70, LOCALITY_EXTRACTED='A'),
+        booth('SCHOOL A', None, None, LOCALITY_EXTRACTED='A'),
+        booth('SCHOOL B', 11.92, 79.72, LOCALITY_EXTRACTED='B'),
+        booth('SCHOOL C', 11.94, 79.74, LOCALITY_EXTRACTED='C'),
+    ]}
+    fixes, unresolved = impute_coordinates(data)
+    assert unresolved == []
+    [(ac_key, idx, reason, lat, lng, count, source)] = fixes
+    assert (ac_key, idx, reason, count, source) == ('AC_1_FINAL', 1, 'null', 3, 'assembly')
+    assert (lat, lng) == pytest.approx((11.92, 79.72))
+    assert (data['AC_1_FINAL'][1]['Latitude'], data['AC_1_FINAL'][1]['Longitude']) == (lat, lng)
+    assert data['AC_1_FINAL'][1][COORD_SOURCE] == 'assembly'
+    assert COORD_SOURCE not in data['AC_1_FINAL'][0]
+
+def test_rejects_positions_outside_the_region():
+    data = {'AC_23_FINAL': [
+        booth('SCHOOL A', 11.790, 79.78),
+        booth('SCHOOL A', 'NEW_BOOTH', 'NEW_BOOTH'),
+        booth('SCHOOL A', 11.792, 79.78),
+    ]}
+    fixes, unresolved = impute_coordinates(data)
+    assert fixes == []
+    assert unresolved == [('AC_23_FINAL', 1, "placeholder 'NEW_BOOTH'")]
+    assert data['AC_23_FINAL'][1]['Latitude'] == 'NEW_BOOTH'
+
+def test_placeholder_only_assembly_uses_other_assemblies():
+    muthialpet = [booth(f'SCHOOL {i}', 11.954 + i * 0.001, 79.835, LOCALITY_EXTRACTED='Muthialpet') for i in range(3)]
+    spread = [booth(f'SCHOOL {i}', 11.90 + i * 0.05, 79.83, LOCALITY_EXTRACTED='STREET') for i in range(2)]
+    nearby = [booth(f'SCHOOL {i}', 11.930 + i * 0.001, 79.830, LOCALITY_EXTRACTED='BEACH') for i in range(3)]
+    default = ASSEMBLY_DEFAULTS['14']
+    data = {
+        'AC_13_FINAL': muthialpet + spread + nearby,
+        'AC_14_FINAL': [
+            booth('SCHOOL X', *placeholder(default, 1), LOCALITY_EXTRACTED='NAGAR, MUTHIALPET,'),
+            booth('SCHOOL Y', *placeholder(default, 2), LOCALITY_EXTRACTED='STREET, .'),
+        ],
+    }
+    fixes, unresolved = impute_coordinates(data)
+    assert unresolved == []
+    by_idx = {idx: (lat, lng, count, source) for _, idx, _, lat, lng, count, source in fixes}
+    # Both sources are shared by the whole assembly, so booths are spread around them
+    assert by_idx[0] == pytest.approx((11.955 - FALLBACK_STEP[0] / 2, 79.835 - FALLBACK_STEP[1] / 2,
+                                       3, 'locality anchor'))
+    assert by_idx[1][2:] == (3, 'nearby assemblies')
+    assert by_idx[1][:2] == pytest.approx((11.931 + FALLBACK_STEP[0] / 2, 79.830 + FALLBACK_STEP[1] / 2))
+
+def test_fallback_booths_get_distinct_positions():
+    nearby = [booth(f'SCHOOL {i}', 11.930 + i * 0.001, 79.830, LOCALITY_EXTRACTED='BEACH') for i in range(3)]
+    default = ASSEMBLY_DEFAULTS['14']
+    data = {
+        'AC_13_FINAL': nearby,
+        'AC_14_FINAL': [booth(f'SCHOOL {i}', *placeholder(default, i)) for i in range(1, 6)],
+    }
+    fixes, unresolved = impute_coordinates(data)
+    assert unresolved == []
+    assert {source for *_, source in fixes} == {'nearby assemblies'}
+    positions = [(entry['Latitude'], entry['Longitude']) for entry in data['AC_14_FINAL']]
+    assert len(set(positions)) == 5
+    assert positions[2] == pytest.approx((11.931, 79.830))
+
+def test_imputed_booths_are_imputed_again():
+    data = {'AC_1_FINAL': [
+        booth('SCHOOL A', 11.90, 79.70),
+        booth('SCHOOL B', None, None),
+        booth('SCHOOL C', 11.92, 79.72),
+    ]}
+    fixes, _ = impute_coordinates(data)
+    assert [(idx, reason) for _, idx, reason, *_ in fixes] == [(1, 'null')]
+    assert impute_coordinates(data) == ([], [])
+
+    # A new geocoded booth moves the imputed one; the surveyed booths stay put
+    data['AC_1_FINAL'].append(booth('SCHOOL D', 11.96, 79.76))
+    fixes, _ = impute_coordinates(data)
+    [(_, idx, reason, lat, lng, count, source)] = fixes
+    assert (idx, reason, count, source) == (1, 'imputed (assembly)', 3, 'assembly')
+    assert (lat, lng) == pytest.approx(((11.90 + 11.92 + 11.96) / 3, (79.70 + 79.72 + 79.76) / 3))
+    assert data['AC_1_FINAL'][0]['Latitude'] == 11.90
+
+def test_region_without_geocoded_booths_is_unresolved():
+    default = ASSEMBLY_DEFAULTS['30']
+    data = {
+        'AC_1_FINAL': [booth('SCHOOL A', 11.95, 79.62), booth('SCHOOL B', 11.96, 79.61)],
+        'AC_30_FINAL': [booth(f'SCHOOL {i}', *placeholder(default, i)) for i in range(1, 3)],
+    }
+    fixes, unresolved = impute_coordinates(data)
+    assert fixes == []
+    assert unresolved == [('AC_30_FINAL', 0, 'offset placeholder'), ('AC_30_FINAL', 1, 'offset placeholder')]
@@ -0,0 +1,53 @@
+import json
+import os
+import stat
+
+import pytest
+
+from json_writer import atomic_open, dump_json
+
+MIXED = {
+    'AC_1_FINAL': [
+        {'PS_NO_2021': 1, 'Latitude': 11.95, 'Longitude': None, 'OK': True, 'NAME': 'Pondichéry "A"'},
+        {'EMPTY_LIST': [], 'EMPTY_DICT': {}, 'NESTED': [[1, 2], {'x': [0.1, -3e-7, 1e21]}]},
+    ],
+    'EMPTY': [],
+    'SCALAR': 'text',
+    1: 'int key',
+    2.5: 'float key',
+    True: 'bool key',
+    None: 'null key',
+    'NAN': float('nan'),
+}
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+@pytest.mark.parametrize('indent', [1, 2])
+def test_indented_output_matches_json_dump(tmp_path, sample_dataset, indent):
+    for data in (sample_dataset, MIXED, [], {}, 'text'):
+        path = tmp_path / 'out.json'
+        dump_json(data, path, indent=indent)
+        with open(tmp_path / 'expected.json', 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent)
+        assert read_bytes(path) == read_bytes(tmp_path / 'expected.json')
+
+def test_compact_output_matches_json_dumps(tmp_path, sample_dataset):
+    for data in (sample_dataset, MIXED):
+        path = tmp_path / 'out.json'
+        dump_json(data, path, compact=True)
+        assert read_bytes(path) == json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+def test_failed_write_keeps_the_previous_file(tmp_path):
+    path = tmp_path / 'out.json'
+    dump_json({'old': 1}, path)
+    os.chmod(path, 0o640)
+    with pytest.raises(TypeError):
+        dump_json({'new': object()}, path)
+    assert json.loads(read_bytes(path)) == {'old': 1}
+    assert os.listdir(tmp_path) == ['out.json']
+
+    with atomic_open(path) as f:
+        f.write('{}')
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
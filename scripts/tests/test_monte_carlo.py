@@ -0,0 +1,39 @@
+import numpy as np
+
+from models import Assembly
+from monte_carlo import AssemblyModel, build_models, sample_chunk
+
+def entry(dmk, inc):
+    """Booth with DMK and INC shares for 2011/2016/2021 (INC absent in 2011 when None)"""
+    fields = {'PS_NO_2021': 1}
+    for y, year in enumerate(['2011', '2016', '2021']):
+        fields[f'POLLED_{year}'] = 1000
+        fields[f'DMK_{year}_pct'] = dmk[y]
+        if inc[y] is not None:
+            fields[f'INC_{year}_pct'] = inc[y]
+    fields.update(DMK_SCORE=0.5, INC_SCORE=0.5, TOP_SCORE_PARTY='DMK (50.00%)')
+    return fields
+
+def test_sd_is_in_score_units():
+    assembly = Assembly.from_json('AC_1_FINAL', [entry([0.2, 0.4, 0.3], [None, 0.5, 0.6])])
+    model = AssemblyModel.from_assembly(assembly, min_sd=0.0)
+    assert model.parties == ['DMK', 'INC']
+
+    weights = np.array([0.2, 0.3, 0.5])
+    dmk, inc = np.array([0.2, 0.4, 0.3]), np.array([0.5, 0.6])
+    raw = np.array([weights @ dmk, weights[1:] @ inc])
+    np.testing.assert_allclose(model.mean[:, 0], raw / raw.sum(), rtol=1e-6)
+
+    # Share spread around the weighted average, times the score's normalising factor
+    for share, w, score_raw, sd in zip((dmk, inc), (weights, weights[1:]), raw, model.sd[:, 0]):
+        average = score_raw / w.sum()
+        share_sd = np.sqrt(w @ (share - average) ** 2 / w.sum())
+        np.testing.assert_allclose(sd, share_sd * w.sum() / raw.sum(), rtol=1e-6)
+
+def test_min_sd_and_sampling():
+    assembly = Assembly.from_json('AC_1_FINAL', [entry([0.6, 0.6, 0.6], [0.1, 0.1, 0.1])] * 2)
+    [model] = build_models([assembly], min_sd=0.01)
+    np.testing.assert_allclose(model.sd, 0.01)
+    [(booth_wins, assembly_wins)] = sample_chunk([model], draws=200, seed=1)
+    assert booth_wins[0].tolist() == [200, 200]
+    assert assembly_wins.tolist() == [200, 0]
@@ -0,0 +1,70 @@
+import json
+import os
+from collections import Counter
+
+import pytest
+
+from models import YEAR_FIELD, YEAR_TOTALS
+from rollups import build_rollups, save_rollups
+
+DATASET = os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'data', 'Form20_Localities_Pct.json')
+
+def test_assembly_rollup(sample_dataset):
+    sample_dataset['AC_1_FINAL'][0]['VOTERS_2021'] = 1000
+    rollup = build_rollups(sample_dataset)['assemblies']['AC_1_FINAL']
+    assert (rollup['number'], rollup['name'], rollup['region'], rollup['booths']) == (1, 'Mannadipet', 'Puducherry', 3)
+    assert rollup['categories'] == {'A': 1, 'B': 2}
+    assert rollup['top_parties'] == {'NRC': 2, 'DMK': 1}
+    assert rollup['years']['2021'] == {
+        'votes': {'NRC': 850, 'DMK': 800},
+        'polled': 1900,
+        # Turnout only over the booth with a VOTERS count
+        'voters': 1000,
+        'turnout': 0.8,
+        'leaders': {'NRC': 2, 'DMK': 1},
+    }
+
+def test_regions_and_total_are_merged(sample_dataset):
+    rollups = build_rollups(sample_dataset)
+    region = rollups['regions']['Puducherry']
+    assert region['assemblies'] == [1, 2]
+    assert region['booths'] == rollups['total']['booths'] == 5
+    # AC_2's first booth is a tie; the first party listed leads it
+    assert region['years']['2021']['leaders'] == {'NRC': 4, 'DMK': 1}
+    assert region['categories'] == {'A': 1, 'B': 2, 'Unknown': 2}
+    assert rollups['regions']['Karaikal']['booths'] == 0
+    assert rollups['total']['assemblies'] == 2
+
+def test_rollups_match_the_booths():
+    with open(DATASET, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    votes = {}
+    polled = Counter()
+    booths = 0
+    for key, entries in data.items():
+        if not key.startswith('AC_'):
+            continue
+        for entry in entries:
+            booths += 1
+            for name, value in entry.items():
+                match = YEAR_FIELD.match(name)
+                if not match or match['pct'] or not isinstance(value, (int, float)):
+                    continue
+                if match['party'] == 'POLLED':
+                    polled[match['year']] += value
+                elif match['party'] not in YEAR_TOTALS:
+                    votes.setdefault(match['year'], Counter())[match['party']] += value
+
+    rollups = build_rollups(data)
+    total = rollups['total']
+    assert total['booths'] == booths == sum(region['booths'] for region in rollups['regions'].values())
+    for year, totals in total['years'].items():
+        assert totals['votes'] == pytest.approx({party: n for party, n in votes[year].items()})
+        assert totals['polled'] == pytest.approx(polled[year])
+    assert sum(rollup['booths'] for rollup in rollups['assemblies'].values()) == booths
+
+def test_save_rollups(tmp_path, sample_dataset):
+    path = str(tmp_path / 'rollups.json')
+    rollups = save_rollups(sample_dataset, path)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == json.loads(json.dumps(rollups))
@@ -0,0 +1,72 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from assembly_specs import ASSEMBLY_SPECS
+from process_missing_assemblies import assembly_parties
+from scoring import MODELS, YEARS, FixedWeights, WeightScheme, categorize, score_assembly
+
+DATASET = os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'data', 'Form20_Localities_Pct.json')
+
+def test_weight_scheme_is_abstract():
+    with pytest.raises(TypeError):
+        WeightScheme()
+
+def test_default_model_weights_years_and_normalises():
+    # One booth, two parties; party 1 did not stand in 2011
+    votes = [[[60, 20, 50], [40, 80, 50]]]
+    polled = [[100, 100, 100]]
+    contested = [[True, True, True], [False, True, True]]
+    result = score_assembly(votes, polled, contested)
+
+    raw = np.array([0.2 * 0.6 + 0.3 * 0.2 + 0.5 * 0.5, 0.3 * 0.8 + 0.5 * 0.5])
+    np.testing.assert_allclose(result['shares'][0], [[0.6, 0.2, 0.5], [0.4, 0.8, 0.5]])
+    np.testing.assert_allclose(result['scores'][0], raw / raw.sum())
+    assert result['top'].tolist() == [1]
+    assert result['category'].tolist() == ['A']
+
+def test_scored_subset_and_empty_booths():
+    votes = [[[10, 10, 10], [0, 0, 0], [90, 90, 90]], [[0, 0, 0]] * 3]
+    polled = [[100, 100, 100], [0, 0, 0]]
+    contested = np.ones((3, 3), dtype=bool)
+    result = score_assembly(votes, polled, contested, scored=[2, 0])
+    np.testing.assert_allclose(result['scores'], [[0.9, 0.1], [0.0, 0.0]])
+    assert result['top'].tolist() == [0, 0]
+    assert result['category'].tolist() == ['A', 'C']
+
+def test_categories_use_strict_thresholds():
+    assert categorize(np.array([0.51, 0.50, 0.31, 0.30, 0.0])).tolist() == ['A', 'B', 'B', 'C', 'C']
+
+def test_models_agree_on_fixed_weights():
+    shares = [[[0.5, 0.5, 0.5], [0.5, 0.5, 0.5]]]
+    for name, model in MODELS.items():
+        result = score_assembly(shares, [[1, 1, 1]], np.ones((2, 3), dtype=bool), model=model)
+        np.testing.assert_allclose(result['scores'], [[0.5, 0.5]], err_msg=name)
+    assert isinstance(MODELS['default'], FixedWeights)
+
+@pytest.mark.parametrize('ac_num', sorted(ASSEMBLY_SPECS, key=int))
+def test_default_model_reproduces_published_scores(ac_num):
+    """The ingested assemblies' published scores come from the default model"""
+    with open(DATASET, encoding='utf-8') as f:
+        entries = json.load(f)[f'AC_{ac_num}_FINAL']
+    spec = ASSEMBLY_SPECS[ac_num]
+    parties = assembly_parties(spec)
+    votes = np.zeros((len(entries), len(parties), len(YEARS)))
+    polled = np.zeros((len(entries), len(YEARS)))
+    contested = np.zeros((len(parties), len(YEARS)), dtype=bool)
+    for y, year in enumerate(YEARS):
+        for party, _ in spec['years'][year]['parties']:
+            contested[parties.index(party), y] = True
+        for b, entry in enumerate(entries):
+            polled[b, y] = entry[f'POLLED_{year}']
+            for party, _ in spec['years'][year]['parties']:
+                votes[b, parties.index(party), y] = entry[f'{party}_{year}']
+
+    result = score_assembly(votes, polled, contested, scored=[parties.index(party) for party in spec['scores']])
+    published = [[entry[f'{party}_SCORE'] for party in spec['scores']] for entry in entries]
+    np.testing.assert_allclose(result['scores'], published, rtol=1e-12)
+    assert result['category'].tolist() == [entry['TOP_SCORE_CATEGORY'] for entry in entries]
+    assert [spec['scores'][top] for top in result['top']] == \
+        [entry['TOP_SCORE_PARTY'].split(' (')[0] for entry in entries]
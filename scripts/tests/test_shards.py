@@ -0,0 +1,47 @@
+import json
+import os
+
+from dashboard_payload import build_payload
+from shards import MANIFEST, bounding_box, save_shards
+
+def test_shards_hold_the_station_payload(tmp_path, sample_dataset):
+    directory = tmp_path / 'shards'
+    directory.mkdir()
+    for stale in ('AC_99_FINAL.json', '_other.json'):
+        (directory / stale).write_text('[]')
+
+    manifest = save_shards(sample_dataset, str(directory))
+    assert sorted(p.name for p in directory.iterdir()) == ['AC_1_FINAL.json', 'AC_2_FINAL.json', MANIFEST]
+    assert json.loads((directory / MANIFEST).read_text()) == manifest
+    assert manifest['booths'] == 5
+
+    payload = build_payload(sample_dataset)
+    assert [entry['id'] for entry in manifest['assemblies'].values()] == payload['assemblies']
+    for key, entry in manifest['assemblies'].items():
+        content = (directory / entry['file']).read_bytes()
+        assert json.loads(content) == payload['stations'][entry['id']]
+        assert entry['bytes'] == len(content)
+    first = manifest['assemblies']['AC_1_FINAL']
+    assert (first['number'], first['name'], first['region'], first['booths']) == (1, 'Mannadipet', 'Puducherry', 3)
+    assert first['bbox'] == [11.95, 79.60, 11.97, 79.62]
+
+def test_unchanged_shards_are_not_rewritten(tmp_path, sample_dataset):
+    directory = str(tmp_path)
+    save_shards(sample_dataset, directory)
+    paths = {name: os.path.join(directory, f'AC_{name}_FINAL.json') for name in ('1', '2')}
+    for path in paths.values():
+        os.utime(path, (0, 0))
+
+    sample_dataset['AC_2_FINAL'][0]['TOP_SCORE_PARTY'] = 'DMK'
+    manifest = save_shards(sample_dataset, directory)
+    assert os.path.getmtime(paths['1']) == 0
+    assert os.path.getmtime(paths['2']) != 0
+    with open(paths['2'], encoding='utf-8') as f:
+        assert json.load(f)[0]['strongestParty'] == 'DMK'
+    assert manifest['assemblies']['AC_2_FINAL']['sha256'] != manifest['assemblies']['AC_1_FINAL']['sha256']
+
+def test_bounding_box_skips_placeholders():
+    booths = [{'Latitude': 11.9, 'Longitude': 79.8}, {'Latitude': 'NEW_BOOTH', 'Longitude': 'NEW_BOOTH'},
+              {'Latitude': None, 'Longitude': None}, {'Latitude': 11.8, 'Longitude': 79.9}]
+    assert bounding_box(booths) == [11.8, 79.8, 11.9, 79.9]
+    assert bounding_box(booths[1:3]) is None
@@ -0,0 +1,98 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from bulk_validation import points_in_polygon
+from spatial_index import GridIndex, KDTree, box_polygon, convex_hull, point_in_polygon
+
+def random_points(rng, n, low=0.0, high=1.0):
+    return [(rng.uniform(low, high), rng.uniform(low, high)) for _ in range(n)]
+
+def star(lat, lng, outer, inner, tips):
+    """Non-convex star-shaped ring"""
+    return [(lat + (outer if i % 2 == 0 else inner) * math.cos(math.pi * i / tips),
+             lng + (outer if i % 2 == 0 else inner) * math.sin(math.pi * i / tips)) for i in range(2 * tips)]
+
+# A star with a square hole and a triangular hole
+HOLED_STAR = [
+    star(0.5, 0.5, 0.45, 0.2, 7),
+    box_polygon((0.45, 0.55), (0.45, 0.55))[0],
+    [(0.48, 0.62), (0.52, 0.62), (0.5, 0.66)],
+]
+
+def brute_nearest(points, lat, lng, k, accept):
+    distances = sorted((math.dist((lat, lng), point), item) for item, point in enumerate(points)
+                       if accept is None or accept(item))
+    return distances[:k]
+
+@pytest.mark.parametrize('k', [1, 3, 10])
+def test_kdtree_nearest_matches_brute_force(k):
+    rng = random.Random(k)
+    points = random_points(rng, 300)
+    points += points[:20]  # duplicate points
+    tree = KDTree(points)
+    for accept in (None, lambda item: item % 7 == 0, lambda item: item in (5, 300)):
+        for _ in range(50):
+            lat, lng = rng.uniform(-0.2, 1.2), rng.uniform(-0.2, 1.2)
+            found = tree.nearest(lat, lng, k, accept)
+            expected = brute_nearest(points, lat, lng, k, accept)
+            assert [distance for distance, _, _ in found] == pytest.approx([d for d, _ in expected])
+            assert all(points[item] == point for _, point, item in found)
+            assert all(accept is None or accept(item) for _, _, item in found)
+
+def test_kdtree_items_and_empty_tree():
+    tree = KDTree([(0.0, 0.0), (1.0, 1.0)], items=['a', 'b'])
+    assert tree.nearest(0.9, 0.9) == [(pytest.approx(math.hypot(0.1, 0.1)), (1.0, 1.0), 'b')]
+    assert [item for _, _, item in tree.nearest(0.9, 0.9, k=5)] == ['b', 'a']
+    assert tree.nearest(0.9, 0.9, accept=lambda item: False) == []
+    assert KDTree([]).nearest(0.0, 0.0, k=3) == []
+
+def test_points_in_polygon_matches_point_in_polygon():
+    rng = random.Random(0)
+    points = random_points(rng, 5000)
+    # Vertices and points level with them, where ray casting is easiest to get wrong
+    for ring in HOLED_STAR:
+        for lat, lng in ring:
+            points += [(lat, lng), (lat - 0.01, lng), (lat + 0.01, lng), (0.5, lng)]
+    lat, lng = (np.array(column) for column in zip(*points))
+    expected = [point_in_polygon(*point, HOLED_STAR) for point in points]
+    assert points_in_polygon(lat, lng, HOLED_STAR).tolist() == expected
+    assert any(expected) and not all(expected)
+    # Inside the star but in a hole
+    assert not point_in_polygon(0.5, 0.5, HOLED_STAR) and point_in_polygon(0.5, 0.59, HOLED_STAR)
+
+def test_grid_index_matches_brute_force():
+    rng = random.Random(1)
+    polygons = {'star': [HOLED_STAR]}
+    for i in range(8):
+        lat, lng = rng.uniform(-0.5, 1.0), rng.uniform(-0.5, 1.0)
+        polygons[f'box{i % 5}'] = polygons.get(f'box{i % 5}', []) + [
+            box_polygon((lat, lat + rng.uniform(0.05, 0.5)), (lng, lng + rng.uniform(0.05, 0.5)))]
+    index = GridIndex.from_polygons(polygons, cell_size=0.1)
+    for lat, lng in random_points(rng, 3000, -0.6, 1.6):
+        expected = [key for key, key_polygons in polygons.items()
+                    if any(point_in_polygon(lat, lng, rings) for rings in key_polygons)]
+        assert index.query(lat, lng) == expected
+
+def cross(o, a, b):
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+def test_convex_hull_encloses_every_point():
+    rng = random.Random(2)
+    for n in (3, 10, 200):
+        points = random_points(rng, n)
+        hull = convex_hull(points)
+        assert set(hull) <= set(points)
+        edges = list(zip(hull, hull[1:] + hull[:1]))
+        # Counter-clockwise and strictly convex, with every point on the inner side of every edge
+        assert all(cross(a, b, c) > 0 for (a, b), c in zip(edges, hull[2:] + hull[:2]))
+        assert all(cross(a, b, p) >= -1e-12 for a, b in edges for p in points)
+
+def test_convex_hull_degenerate_inputs():
+    assert convex_hull([]) == []
+    assert convex_hull([(1.0, 1.0), (1.0, 1.0)]) == [(1.0, 1.0)]
+    assert convex_hull([(0.0, 0.0), (1.0, 1.0), (2.0, 2.0)]) == [(0.0, 0.0), (2.0, 2.0)]
+    square = [(0.0, 0.0), (0.0, 1.0), (1.0, 1.0), (1.0, 0.0), (0.5, 0.5), (0.0, 0.5)]
+    assert convex_hull(square) == [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)]
@@ -0,0 +1,72 @@
+import argparse
+
+import numpy as np
+import pytest
+
+from swing_simulator import CATEGORIES, BoothScores, parse_sweep, parse_transfer, simulate
+
+def board():
+    # Booth 0: DMK and BJP; booth 1: DMK and INC (no BJP)
+    parties = ['DMK', 'BJP', 'INC']
+    slots = np.array([[0, 1], [0, 2]])
+    scores = np.array([[0.6, 0.4], [0.55, 0.45]])
+    groups = {'assembly': ['AC_1_FINAL', 'AC_2_FINAL'], 'locality': ['A', 'B'], 'region': ['Puducherry'] * 2}
+    return BoothScores(parties, slots, scores, [('AC_1_FINAL', 0), ('AC_2_FINAL', 0)], groups)
+
+def test_parse_transfer():
+    assert parse_transfer('dmk:bjp:0.03@Manalipet') == ('DMK', 'BJP', 0.03, 'Manalipet')
+    assert parse_transfer('DMK:BJP:-0.1') == ('DMK', 'BJP', -0.1, None)
+    for text in ('DMK:BJP', 'DMK:BJP:x', ':BJP:0.1', 'DMK:BJP:0.1:2'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_transfer(text)
+
+def test_parse_sweep():
+    assert parse_sweep('DMK:BJP:0:0.2:5') == ('DMK', 'BJP', 0.0, 0.2, 5)
+    for text in ('DMK:BJP:0:1', 'DMK:BJP:0:1:1.5', 'DMK:BJP:0:1:0'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_sweep(text)
+
+def test_transfer_skips_booths_without_both_parties():
+    scores = board()
+    transfers = scores.transfer_slots([('DMK', 'BJP', None)])
+    source, target, active = transfers
+    assert (source.tolist(), target.tolist(), active.tolist()) == ([[0, 0]], [[1, 0]], [[True, False]])
+    result = simulate(scores, [[0.0], [0.15]], transfers)
+    assert result.top.tolist() == [[0, 0], [1, 0]]
+    np.testing.assert_allclose(result.top_value, [[0.6, 0.55], [0.55, 0.55]])
+    assert [CATEGORIES[c] for c in result.category[1]] == ['A', 'A']
+
+def test_group_transfers():
+    scores = board()
+    _, target, active = scores.transfer_slots([('DMK', 'INC', 'b'), ('DMK', 'INC', None)], 'locality')
+    assert active.tolist() == [[False, True], [False, True]]
+    assert target[:, 1].tolist() == [1, 1]
+    with pytest.raises(ValueError):
+        scores.transfer_slots([('DMK', 'INC', 'nowhere')], 'locality')
+    with pytest.raises(KeyError):
+        scores.transfer_slots([('DMK', 'XYZ', None)])
+
+def test_transfer_is_capped_at_the_source_score():
+    parties = ['DMK', 'BJP', 'INC']
+    scores = BoothScores(parties, np.array([[0, 1, 2]]), np.array([[0.1, 0.45, 0.45]]), [('AC_1_FINAL', 0)],
+                         {'assembly': ['AC_1_FINAL'], 'locality': ['A'], 'region': ['Puducherry']})
+    # DMK has only 0.1 to give, and INC only 0.45 to give back; the total stays 1
+    result = simulate(scores, [[0.3], [-1.0]], scores.transfer_slots([('DMK', 'INC', None)]))
+    assert result.top.tolist() == [[2], [0]]
+    np.testing.assert_allclose(result.top_value, [[0.55], [0.55]])
+
+    # Transfers apply in order, each capped at what is left
+    result = simulate(scores, [[0.02, 0.2]], scores.transfer_slots([('DMK', 'BJP', None), ('DMK', 'INC', None)]))
+    assert result.top.tolist() == [[2]]
+    np.testing.assert_allclose(result.top_value, [[0.53]])
+
+def test_booths_without_scores_are_not_counted():
+    parties = ['DMK', 'BJP']
+    slots = np.array([[0, 1], [2, 2]])
+    scores = BoothScores(parties, slots, np.array([[0.6, 0.4], [0.0, 0.0]]), [('AC_1_FINAL', 0), ('AC_1_FINAL', 1)],
+                         {'assembly': ['AC_1_FINAL'] * 2, 'locality': ['A', 'B'], 'region': ['Puducherry'] * 2})
+    result = simulate(scores, [[0.0], [0.3]], scores.transfer_slots([('DMK', 'BJP', None)]))
+    assert result.top[:, 1].tolist() == [2, 2]
+    assert result.wins.tolist() == [[1, 0], [0, 1]]
+    assert result.category_counts.sum(axis=1).tolist() == [1, 1]
+    assert result.category_counts[0, CATEGORIES.index('A')] == 1
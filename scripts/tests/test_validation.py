@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+
+from assembly_index import AssemblyIndex
+from bulk_validation import BULK_RULES, BoothColumns, BulkScoreRule
+from data_analysis import ScoreRule, run_rules
+from dataset_store import pa, write_store
+from scoring import CATEGORY_THRESHOLDS, DEFAULT_CATEGORY
+
+DATASET = os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'data', 'Form20_Localities_Pct.json')
+
+def score_booths():
+    """One booth per score around each threshold, labelled with the category scoring gives it"""
+    booths = []
+    for _, threshold in CATEGORY_THRESHOLDS:
+        for score in (threshold - 0.01, threshold, threshold + 0.01):
+            label = next((label for label, t in CATEGORY_THRESHOLDS if score > t), DEFAULT_CATEGORY)
+            booths.append({'NRC_SCORE': score, 'TOP_SCORE_PARTY': 'NRC', 'TOP_SCORE_CATEGORY': label})
+    return booths
+
+def per_booth_issues(data, rule):
+    for ac_key, entries in data.items():
+        for idx, entry in enumerate(entries):
+            rule.check(ac_key, idx, entry)
+    return rule
+
+def bulk_issues(data, rule):
+    index = AssemblyIndex(data)
+    rule.evaluate(BoothColumns.from_index(index, rule.numeric_fields, rule.string_fields), index)
+    return rule
+
+def test_score_rules_follow_scoring_thresholds():
+    data = {'AC_1_FINAL': score_booths()}
+    assert per_booth_issues(data, ScoreRule()).category_issues == []
+    assert bulk_issues(data, BulkScoreRule()).category_issues == []
+
+def test_score_rules_agree(sample_dataset):
+    data = {'AC_1_FINAL': score_booths() + sample_dataset['AC_1_FINAL']}
+    data['AC_1_FINAL'][0]['TOP_SCORE_CATEGORY'] = 'A'
+    expected = per_booth_issues(data, ScoreRule())
+    assert expected.category_issues
+    bulk = bulk_issues(data, BulkScoreRule())
+    assert bulk.category_issues == expected.category_issues
+    assert sorted(bulk.score_issues) == sorted(expected.score_issues)
+
+@pytest.mark.parametrize('source', ['dataset', 'store'])
+def test_bulk_rules_report_what_the_per_booth_rules_do(tmp_path, source):
+    if source == 'store' and pa is None:
+        pytest.skip('pyarrow is not installed')
+    with open(DATASET, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    index = AssemblyIndex(data)
+    store_path = str(tmp_path / 'store.arrow')
+    if source == 'store':
+        write_store(data, store_path)
+
+    for bulk_rule in BULK_RULES:
+        [expected] = run_rules(index, [bulk_rule.__bases__[0]()])
+        rule = bulk_rule()
+        fields = (rule.numeric_fields, getattr(rule, 'string_fields', ()))
+        if source == 'store':
+            cols = BoothColumns.from_store(index.keys(), *fields, path=store_path)
+        else:
+            cols = BoothColumns.from_index(index, *fields)
+        rule.evaluate(cols, index)
+        expected_log, log = [], []
+        expected.report(expected_log)
+        rule.report(log)
+        assert log == expected_log, bulk_rule.__name__
+        assert rule.issue_count() == expected.issue_count()
@@ -0,0 +1,30 @@
+"""
+Streaming, read-only access to the Excel workbooks.
+
+openpyxl's default mode builds a cell object for every cell of every sheet,
+and list(ws.rows) keeps them all alive at once. These helpers open workbooks
+in read-only mode and yield plain value tuples one row at a time, so memory
+stays flat however large the workbook is.
+"""
+from contextlib import contextmanager
+
+from openpyxl import load_workbook
+
+@contextmanager
+def open_workbook(path):
+    """Open a workbook read-only (cached cell values) and close it afterwards"""
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield wb
+    finally:
+        wb.close()
+
+def header_row(ws):
+    """First row of a sheet as a tuple of values (empty tuple for an empty sheet)"""
+    for row in ws.iter_rows(max_row=1, values_only=True):
+        return row
+    return ()
+
+def data_rows(ws, header_rows=1):
+    """Iterate the rows after the header as tuples of values"""
+    return ws.iter_rows(min_row=header_rows + 1, values_only=True)
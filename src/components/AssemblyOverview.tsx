@@ -190,11 +190,7 @@ function AssemblyOverview({ selectedAssembly }: { selectedAssembly: string }) {
     const fetchData = async () => {
       try {
         // 1. Polling Stations (Local)
-        const pollingStations = processLocalPollingData(null); // Fetch all to filter later? Or fetch specific?
-        // Logic below filters: const assemblyData = pollingStations.filter(...)
-        // Let's pass null to get all, OR better, pass selectedAssembly if util supports it properly.
-        // Util supports filtering! Let's just fetch for this assembly.
-        const assemblyData = processLocalPollingData(selectedAssembly);
+        const assemblyData = await processLocalPollingData(selectedAssembly);
         console.log('Loaded data for assembly', selectedAssembly, 'booths:', assemblyData.length);
         setData(assemblyData);
         calculateStats(assemblyData, selectedYear);
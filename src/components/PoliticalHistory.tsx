@@ -128,7 +128,7 @@ export default function PoliticalHistory({ selectedAssembly, previewData }: { se
         setError(null);
 
         // 1. Load Polling Data (Local)
-        const assemblyData = processLocalPollingData(selectedAssembly);
+        const assemblyData = await processLocalPollingData(selectedAssembly);
         setData(assemblyData);
 
         // 2. Load MLAs (Firestore)
@@ -11,7 +11,7 @@ import { ASSEMBLIES } from '@/data/assemblies';
 import { ASSEMBLY_COORDINATES, getRegionCenter } from '@/data/assemblyCoordinates';
 import { db } from '@/lib/firebase/client';
 import { collection, getDocs, query, where, doc, getDoc } from 'firebase/firestore';
-import rawPollingData from '@/data/Form20_Localities_Pct.json';
+import { processLocalPollingData } from '@/utils/dataProcessing';
 
 // Dynamically import Leaflet components (client-side only)
 const MapContainer = dynamic(() => import('react-leaflet').then(mod => mod.MapContainer), { ssr: false });
@@ -94,78 +94,11 @@ const defaultConfig: PageConfig = {
 // Keys that should NOT be treated as candidate parties
 const NON_CANDIDATE_KEYS = ['VOTERS', 'NOTA', 'PS_NO', 'POLLED'];
 
-/** Safely parse a value to a number, returning 0 for non-numeric values like "NEW_BOOTH" */
-const parseNumeric = (value: unknown): number => {
-  if (typeof value === 'number' && !isNaN(value)) return value;
-  if (typeof value === 'string') {
-    const parsed = parseFloat(value);
-    return isNaN(parsed) ? 0 : parsed;
-  }
-  return 0;
-};
-
 /** Check if a key represents a real candidate (not VOTERS, NOTA, PS_NO, POLLED) */
 const isCandidateKey = (key: string): boolean => {
   return !NON_CANDIDATE_KEYS.some(nonCandidate => key.startsWith(nonCandidate));
 };
 
-const processLocalPollingData = (targetAssemblyId: string | null, jsonData: Record<string, unknown[]>): PollingStation[] => {
-  let allStations: PollingStation[] = [];
-
-  Object.keys(jsonData).forEach(key => {
-    if (key.startsWith('AC_') && key.endsWith('_FINAL')) {
-      const acId = key.replace('AC_', '').replace('_FINAL', '');
-
-      // Skip if specific assembly requested and doesn't match
-      if (targetAssemblyId && acId !== targetAssemblyId) return;
-
-      const entries = jsonData[key] as Record<string, unknown>[];
-      const stations = entries.map((station, index) => {
-        const candidates2021: Record<string, number> = {};
-        const candidates2016: Record<string, number> = {};
-        const candidates2011: Record<string, number> = {};
-
-        Object.keys(station).forEach(k => {
-          if (k.endsWith('_2021_pct')) {
-            const candidateKey = k.replace('_2021_pct', '');
-            if (isCandidateKey(candidateKey)) {
-              candidates2021[candidateKey] = parseNumeric(station[k]);
-            }
-          } else if (k.endsWith('_2016_pct')) {
-            const candidateKey = k.replace('_2016_pct', '');
-            if (isCandidateKey(candidateKey)) {
-              candidates2016[candidateKey] = parseNumeric(station[k]);
-            }
-          } else if (k.endsWith('_2011_pct')) {
-            const candidateKey = k.replace('_2011_pct', '');
-            if (isCandidateKey(candidateKey)) {
-              candidates2011[candidateKey] = parseNumeric(station[k]);
-            }
-          }
-        });
-
-        return {
-          id: `${acId}_${station.PS_NO_2021 || index}`,
-          ac_id: acId,
-          ac_name: String(station.LOCALITY_EXTRACTED ?? `AC ${acId}`),
-          ps_no: String(station.PS_NO_2021 ?? index),
-          ps_name: String(station.PS_NO_2021 ?? index),
-          locality: String(station.LOCALITY_EXTRACTED ?? ''),
-          latitude: parseNumeric(station.Latitude),
-          longitude: parseNumeric(station.Longitude),
-          category: String(station.TOP_SCORE_CATEGORY ?? ''),
-          strongestParty: String(station.TOP_SCORE_PARTY ?? ''),
-          election2021: { year: 2021, total_votes: parseNumeric(station.POLLED_2021), candidates: candidates2021 },
-          election2016: { year: 2016, total_votes: parseNumeric(station.POLLED_2016), candidates: candidates2016 },
-          election2011: { year: 2011, total_votes: parseNumeric(station.POLLED_2011), candidates: candidates2011 }
-        };
-      });
-      allStations = [...allStations, ...stations];
-    }
-  });
-  return allStations;
-};
-
 export default function RetroBoothsAnalysis({ selectedAssembly }: { selectedAssembly: string }) {
   const [data, setData] = useState<PollingStation[]>([]);
   const [allAssembliesData, setAllAssembliesData] = useState<PollingStation[]>([]);
@@ -191,8 +124,10 @@ export default function RetroBoothsAnalysis({ selectedAssembly }: { selectedAsse
     const loadData = async () => {
       try {
         // 1. Local Processing for Polling Data
-        const assemblyData = processLocalPollingData(selectedAssembly, rawPollingData);
-        const allData = processLocalPollingData(null, rawPollingData);
+        const [assemblyData, allData] = await Promise.all([
+          processLocalPollingData(selectedAssembly),
+          processLocalPollingData(null),
+        ]);
 
         setData(assemblyData);
         setAllAssembliesData(allData);
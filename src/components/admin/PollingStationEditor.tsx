@@ -8,6 +8,7 @@ import { Plus, Search, Edit2, Save, X, ArrowLeft, MapPin, Trash2, Database } fro
 import dynamic from 'next/dynamic';
 import { ASSEMBLIES } from '@/data/assemblies';
 import { db } from '@/lib/firebase/client';
+import { processLocalPollingData } from '@/utils/dataProcessing';
 
 import { useAuth } from '@/context/AuthContext';
 
@@ -119,15 +120,11 @@ export default function PollingStationEditor() {
 
         setLoading(true);
         try {
-            // Dynamically import the JSON data
-            const module = await import('@/data/Form20_Localities_Pct.json');
-            const jsonData = module.default as any;
+            // Stations of this assembly as written by the pipeline (scripts/dashboard_payload.py)
+            const stationsList = await processLocalPollingData(assemblyId);
 
-            const key = `AC_${assemblyId}_FINAL`;
-            const stationsList = jsonData[key];
-
-            if (!stationsList || !Array.isArray(stationsList)) {
-                alert(`No data found in JSON for key: ${key}`);
+            if (stationsList.length === 0) {
+                alert(`No polling station data found for Assembly ${assemblyId}`);
                 setLoading(false);
                 return;
             }
@@ -137,50 +134,18 @@ export default function PollingStationEditor() {
             let count = 0;
 
             for (let i = 0; i < stationsList.length; i++) {
-                const item = stationsList[i];
                 const psNo = (i + 1).toString();
                 const id = `${assemblyId}-${psNo}`;
 
+                // Keep this editor's document ids and numbering; the rest is the pipeline's station
                 const newStation: PollingStation = {
+                    ...stationsList[i],
                     id: id,
                     ac_id: assemblyId,
                     ac_name: getAssemblyName(assemblyId),
                     ps_no: psNo,
-                    ps_name: item.PS_NO_2021 || `Station ${psNo}`,
-                    locality: item.LOCALITY_EXTRACTED || '',
-                    latitude: item.Latitude || 0,
-                    longitude: item.Longitude || 0,
-                    category: item.TOP_SCORE_CATEGORY || 'C',
-                    strongestParty: item.TOP_SCORE_PARTY || '',
-
-                    // Add election data if needed, matching the schema
-                    election2021: {
-                        year: 2021,
-                        candidates: {
-                            BJP: item.BJP_2021_pct || 0,
-                            DMK: item.DMK_2021_pct || 0,
-                            NRC: item.NRC_2021_pct || 0,
-                            OTHERS: item.OTHERS_2021_pct || 0
-                        }
-                    },
-                    election2016: {
-                        year: 2016,
-                        candidates: {
-                            NRC: item.NRC_2016_pct || 0,
-                            DMK: item.DMK_2016_pct || 0,
-                            AIADMK: item.AIADMK_2016_pct || 0,
-                            OTHERS: item.OTHERS_2016_pct || 0
-                        }
-                    },
-                    election2011: {
-                        year: 2011,
-                        candidates: {
-                            NRC: item.NRC_2011_pct || 0,
-                            PMK: item.PMK_2011_pct || 0,
-                            IND: item.IND_2011_pct || 0,
-                            OTHERS: item.OTHERS_2011_pct || 0
-                        }
-                    }
+                    ps_name: stationsList[i].ps_name || `Station ${psNo}`,
+                    category: stationsList[i].category || 'C',
                 };
 
                 const docRef = doc(db, 'pollingStations', id);